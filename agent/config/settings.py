@@ -14,8 +14,25 @@ class OracleConfig(BaseModel):
     username: str
     password: str
     pool_size: int = 10
+    pool_min: int = 2
+    pool_increment: int = 1
+    stmtcachesize: int = 50
+    ping_interval: int = 60
+    drcp: bool = False
+    drcp_connection_class: str = "MIGRATION"
+    session_commit_every: int = 100
+    schema_index_materialized: bool = False
     vector_embedding_dimension: int = Field(default=1536, alias="vector.embedding_dimension")
     vector_distance_metric: str = Field(default="COSINE", alias="vector.distance_metric")
+    vector_index_type: str = Field(default="IVF", alias="vector.index_type")
+    vector_target_accuracy: int = Field(default=95, alias="vector.target_accuracy")
+    vector_index_parallel: int = Field(default=0, alias="vector.index_parallel")
+    vector_ivf_partitions: int = Field(default=0, alias="vector.ivf_partitions")
+    vector_hnsw_neighbors: int = Field(default=32, alias="vector.hnsw_neighbors")
+    vector_hnsw_efconstruction: int = Field(default=200, alias="vector.hnsw_efconstruction")
+    vector_quantization: str = Field(default="none", alias="vector.quantization")
+    vector_truncate_dimension: int = Field(default=0, alias="vector.truncate_dimension")
+    vector_rerank_factor: int = Field(default=8, alias="vector.rerank_factor")
 
 class SqlServerConfig(BaseModel):
     host: str
@@ -37,8 +54,11 @@ class LLMConfig(BaseModel):
     verify_ssl: bool = True
     cert_path: str = None
     model_name: str
+    small_model_name: str = None
+    large_model_name: str = None
     max_tokens: int = 4000
     temperature: float = 0.2
+    cache_prompt: bool = False
     embedding_model: str
     embedding_url: str = None
     custom_headers: Dict[str, str] = {}
@@ -54,6 +74,55 @@ class MigrationConfig(BaseModel):
     target_frontend_path: str = Field(alias="target.frontend.path")
     target_frontend_framework: str = Field(alias="target.frontend.framework")
 
+class PipelineConfig(BaseModel):
+    parse_workers: int = 0
+    parse_chunk_size: int = 64
+    dependents_depth: int = 5
+    output_batch_size: int = 64
+    table_usage_depth: int = 2
+    bulk_load: bool = False
+    report_slowest: int = 10
+    regression_threshold: float = 0.25
+    regression_min_ms: float = 1000.0
+
+class DedupConfig(BaseModel):
+    enabled: bool = True
+    num_perm: int = 64
+    bands: int = 16
+    shingle_size: int = 4
+    jaccard_threshold: float = 0.85
+    embedding_threshold: float = 0.9
+    derive_min_similarity: float = 1.0
+
+class GenerationConfig(BaseModel):
+    template_max_methods: int = 5
+    template_max_branches: int = 2
+    template_max_method_lines: int = 15
+    stored_procedure_weight: float = 6.0
+    large_model_min_score: float = 20.0
+    llm_max_tokens: int = 0
+
+class MCPConfig(BaseModel):
+    server_name: str = "migration-context"
+    transport: str = "stdio"
+    host: str = "localhost"
+    port: int = 8080
+    max_workers: int = 8
+    cache_size: int = 256
+    generation_check_interval: float = 5.0
+    schema_page_size: int = 50
+    chunk_size: int = 16384
+    neighbour_hops: int = 2
+    neighbour_limit: int = 10
+    hop_decay: float = 0.5
+
+class MetricsConfig(BaseModel):
+    host: str = "localhost"
+    port: int = 0
+    textfile: str = ""
+    summary_path: str = "logs/metrics.json"
+    write_interval: float = 15.0
+
 class Settings:
     def __init__(self, config_path: str = "config/config.yaml"):
         self.config_path = Path(config_path)
@@ -63,6 +132,11 @@ class Settings:
         self.bitbucket = self._parse_bitbucket_config()
         self.llm = self._parse_llm_config()
         self.migration = self._parse_migration_config()
+        self.mcp = self._parse_mcp_config()
+        self.pipeline = self._parse_pipeline_config()
+        self.generation = self._parse_generation_config()
+        self.dedup = self._parse_dedup_config()
+        self.metrics = self._parse_metrics_config()
     
     def _load_config(self) -> Dict[str, Any]:
         with open(self.config_path, 'r') as f:
@@ -78,8 +152,7 @@ class Settings:
         oracle_data = self.config_data['oracle']
         flattened = {
             **oracle_data,
-            'vector.embedding_dimension': oracle_data.get('vector', {}).get('embedding_dimension', 1536),
-            'vector.distance_metric': oracle_data.get('vector', {}).get('distance_metric', 'COSINE')
+            **{f'vector.{key}': value for key, value in oracle_data.get('vector', {}).items()}
         }
         return OracleConfig(**flattened)
     
@@ -107,5 +180,20 @@ class Settings:
             'target.frontend.framework': migration_data['target']['frontend']['framework']
         }
         return MigrationConfig(**flattened)
+    
+    def _parse_mcp_config(self) -> MCPConfig:
+        return MCPConfig(**self.config_data.get('mcp', {}))
+    
+    def _parse_pipeline_config(self) -> PipelineConfig:
+        return PipelineConfig(**self.config_data.get('pipeline', {}))
+    
+    def _parse_generation_config(self) -> GenerationConfig:
+        return GenerationConfig(**self.config_data.get('generation', {}))
+    
+    def _parse_dedup_config(self) -> DedupConfig:
+        return DedupConfig(**self.config_data.get('dedup', {}))
+    
+    def _parse_metrics_config(self) -> MetricsConfig:
+        return MetricsConfig(**self.config_data.get('metrics', {}))
 
 settings = Settings()
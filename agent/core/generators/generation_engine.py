@@ -0,0 +1,110 @@
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from agent.core.generators.prompt_builder import PromptBuilder
+from agent.core.mcp.resources import MigrationResources
+from agent.core.parsers.csharp_parser import CSharpParser, ParsedCSharpFile
+
+CRUD_VERBS = ('Get', 'List', 'Index', 'Details', 'Find', 'Create', 'Add', 'Post', 'Put',
+              'Update', 'Edit', 'Save', 'Delete', 'Remove')
+CRUD_METHOD_PATTERN = re.compile(r'^(?:' + '|'.join(CRUD_VERBS) + r')(?:[A-Z]\w*)?$')
+BRANCH_PATTERN = re.compile(r'\b(?:if|for|foreach|while|switch|case|catch)\b|&&|\|\||\?\?')
+STORED_PROCEDURE_PATTERN = re.compile(
+    r'\bEXEC(?:UTE)?\s+\[?\w|CommandType\.StoredProcedure|\b(?:FromSqlRaw|FromSqlInterpolated|ExecuteSqlRaw|'
+    r'ExecuteSqlInterpolated|ExecuteSqlCommand)\b|"\s*(?:\[?dbo\]?\.)?\[?(?:usp|sp)_\w+',
+    re.IGNORECASE
+)
+JAVA_FENCE = re.compile(r'```(?:java)?\s*\n(.*?)```', re.DOTALL)
+
+TIER_TEMPLATE = 'template'
+TIER_SMALL = 'small'
+TIER_LARGE = 'large'
+
+def is_crud_method(name: str) -> bool:
+    return CRUD_METHOD_PATTERN.match(name) is not None
+
+def extract_java_code(response: str) -> str:
+    blocks = JAVA_FENCE.findall(response or '')
+    return (max(blocks, key=len) if blocks else response or '').strip() + '\n'
+
+@dataclass
+class ComponentComplexity:
+    tier: str
+    score: float
+    method_count: int
+    branch_count: int
+    max_method_lines: int
+    uses_stored_procedures: bool
+    non_crud_methods: List[str] = field(default_factory=list)
+    
+    def describe(self) -> str:
+        details = [f"{self.method_count} actions", f"{self.branch_count} branches"]
+        if self.non_crud_methods:
+            details.append(f"non-CRUD: {', '.join(self.non_crud_methods[:3])}")
+        if self.uses_stored_procedures:
+            details.append("stored procedures")
+        return f"{self.tier}, score {self.score:g} ({'; '.join(details)})"
+
+class ComplexityClassifier:
+    def __init__(self, config):
+        self.config = config
+    
+    def classify(self, parsed: ParsedCSharpFile) -> ComponentComplexity:
+        lines = parsed.code.splitlines()
+        actions = [m for c in parsed.classes for m in c.methods if 'public' in m.modifiers and not m.is_constructor]
+        branch_count = 0
+        max_method_lines = 0
+        for method in actions:
+            body = '\n'.join(lines[method.start_line - 1:method.end_line])
+            branch_count += len(BRANCH_PATTERN.findall(body))
+            max_method_lines = max(max_method_lines, method.end_line - method.start_line + 1)
+        non_crud = [m.name for m in actions if not is_crud_method(m.name)]
+        uses_procedures = STORED_PROCEDURE_PATTERN.search(parsed.code) is not None
+        
+        score = (len(actions) + 2 * len(non_crud) + branch_count
+                 + max(max_method_lines - self.config.template_max_method_lines, 0) / 10
+                 + (self.config.stored_procedure_weight if uses_procedures else 0))
+        if (not non_crud and not uses_procedures and len(actions) <= self.config.template_max_methods
+                and branch_count <= self.config.template_max_branches
+                and max_method_lines <= self.config.template_max_method_lines):
+            tier = TIER_TEMPLATE
+        elif score >= self.config.large_model_min_score:
+            tier = TIER_LARGE
+        else:
+            tier = TIER_SMALL
+        return ComponentComplexity(tier, round(score, 1), len(actions), branch_count, max_method_lines,
+                                   uses_procedures, non_crud)
+
+class GenerationEngine:
+    def __init__(self, java_generator, llm_client, config, llm_config, resources: Optional[MigrationResources] = None):
+        self.java_generator = java_generator
+        self.llm_client = llm_client
+        self.config = config
+        self.models = {TIER_SMALL: llm_config.small_model_name, TIER_LARGE: llm_config.large_model_name}
+        self.prompt_builder = PromptBuilder(resources)
+        self.classifier = ComplexityClassifier(config)
+        self.parser = CSharpParser()
+        self.tier_counts: Counter = Counter()
+    
+    def generate(self, component: Dict, context: Dict) -> Tuple[str, ComponentComplexity]:
+        parsed = self.parser.parse_code(component['code_content'], component['file_path'])
+        complexity = self.classifier.classify(parsed)
+        if complexity.tier == TIER_TEMPLATE:
+            code = self.java_generator.generate_controller(component, context)
+        else:
+            code = self._generate_with_llm(component, context, complexity)
+        self.tier_counts[complexity.tier] += 1
+        return code, complexity
+    
+    def _generate_with_llm(self, component: Dict, context: Dict, complexity: ComponentComplexity) -> str:
+        notes = [f"Preserve the business logic of: {', '.join(complexity.non_crud_methods)}"] if complexity.non_crud_methods else []
+        system_prompt, prompt = self.prompt_builder.build(component, context, notes)
+        response = self.llm_client.generate_completion(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            model=self.models.get(complexity.tier),
+            max_tokens=self.config.llm_max_tokens or None
+        )
+        return extract_java_code(response)
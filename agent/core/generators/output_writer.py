@@ -0,0 +1,124 @@
+import hashlib
+import os
+import queue
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from agent.core.metrics import metrics, replacement_mode
+
+def file_hash(path: Path, expected_size: int) -> Optional[str]:
+    try:
+        if path.stat().st_size != expected_size:
+            return None
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+def write_atomic(path: Path, data: bytes):
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(temp_path, replacement_mode(path))
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+class OutputWriter:
+    def __init__(self, batch_size: int = 64, on_batch: Optional[Callable[[List[Dict]], None]] = None):
+        self.batch_size = max(batch_size, 1)
+        self.on_batch = on_batch
+        self.stats = {'written': 0, 'unchanged': 0, 'failed': 0}
+        self._queue: queue.Queue = queue.Queue()
+        self._known_dirs = set()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+    
+    def submit(self, path: Path, content: str, context: Optional[Dict] = None) -> str:
+        data = content.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        self._ensure_thread()
+        self._queue.put({'path': Path(path), 'data': data, 'content_hash': digest, 'context': context or {}})
+        metrics.set('queue_depth', self._queue.qsize(), queue='output_writer')
+        return digest
+    
+    def flush(self) -> Dict[str, int]:
+        if self._thread is not None:
+            self._queue.join()
+        return dict(self.stats)
+    
+    def close(self) -> Dict[str, int]:
+        stats = self.flush()
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        return stats
+    
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="output-writer", daemon=True)
+                self._thread.start()
+    
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    self._queue.task_done()
+                    break
+                batch.append(item)
+            metrics.set('queue_depth', self._queue.qsize(), queue='output_writer')
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                print(f"Warning: Output writer failed on a batch of {len(batch)} files: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    def _write_batch(self, batch: List[Dict]):
+        results = []
+        for item in batch:
+            result = {'path': str(item['path']), 'content_hash': item['content_hash'], 'context': item['context']}
+            started = time.perf_counter()
+            try:
+                parent = item['path'].parent
+                if parent not in self._known_dirs:
+                    parent.mkdir(parents=True, exist_ok=True)
+                    self._known_dirs.add(parent)
+                if file_hash(item['path'], len(item['data'])) == item['content_hash']:
+                    result['status'] = 'UNCHANGED'
+                else:
+                    write_atomic(item['path'], item['data'])
+                    result['status'] = 'WRITTEN'
+            except OSError as e:
+                result['status'], result['error'] = 'FAILED', str(e)
+            result['write_ms'] = (time.perf_counter() - started) * 1000
+            result['finished_at'] = datetime.now()
+            self.stats[result['status'].lower()] += 1
+            results.append(result)
+        if self.on_batch:
+            try:
+                self.on_batch(results)
+            except Exception as e:
+                print(f"Warning: Could not record {len(results)} written files: {e}")
@@ -0,0 +1,66 @@
+import json
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple, TypeVar
+
+from agent.core.mcp.resources import MigrationResources
+
+T = TypeVar('T')
+
+OUTPUT_INSTRUCTION = "Return only the complete Java source file in a single ```java block."
+
+def canonical_json(value) -> str:
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+
+def table_names(context: Dict) -> Tuple[str, ...]:
+    return tuple(sorted({t['table_name'] for t in context.get('database_schema') or []}))
+
+def prefix_key(component_type: str, context: Dict) -> Tuple[str, Tuple[str, ...]]:
+    return component_type, table_names(context)
+
+def group_by_prefix(items: Iterable[T], key: Callable[[T], Hashable]) -> List[List[T]]:
+    groups: Dict[Hashable, List[T]] = OrderedDict()
+    for item in items:
+        groups.setdefault(key(item), []).append(item)
+    return sorted(groups.values(), key=len, reverse=True)
+
+class PromptBuilder:
+    def __init__(self, resources: Optional[MigrationResources] = None):
+        self.resources = resources or MigrationResources()
+        self._system_prompts: Dict[Tuple[str, str, str], str] = {}
+        self._table_blocks: Dict[Tuple[str, ...], str] = {}
+    
+    def build(self, component: Dict, context: Dict, notes: Iterable[str] = ()) -> Tuple[str, str]:
+        system_prompt = self.system_prompt(component['component_type'], context)
+        sections = [self.table_block(context)] if context.get('database_schema') else []
+        dependencies = context.get('dependencies') or []
+        if dependencies:
+            sections.append("Dependencies:\n" + '\n'.join(f"- {d['name']} ({d['type']})" for d in dependencies))
+        sections.extend(notes)
+        sections.append(f"Source ({component['file_path']}):\n```csharp\n{component['code_content']}\n```")
+        return system_prompt, '\n\n'.join(sections)
+    
+    def system_prompt(self, component_type: str, context: Dict) -> str:
+        guidelines = canonical_json(context.get('guidelines') or {})
+        key = (component_type, context.get('package_base', ''), guidelines)
+        prompt = self._system_prompts.get(key)
+        if prompt is None:
+            prompt = '\n\n'.join([
+                self.resources.get_code_template(component_type),
+                f"Target package: {key[1]}",
+                f"Coding guidelines:\n{guidelines}",
+                OUTPUT_INSTRUCTION
+            ])
+            self._system_prompts[key] = prompt
+        return prompt
+    
+    def table_block(self, context: Dict) -> str:
+        names = table_names(context)
+        block = self._table_blocks.get(names)
+        if block is None:
+            tables = {t['table_name']: t for t in context['database_schema']}
+            block = "Database tables:\n" + '\n'.join(
+                f"{self.resources.get_database_context(tables[name])}: {canonical_json(tables[name].get('columns', []))}"
+                for name in names
+            )
+            self._table_blocks[names] = block
+        return block
@@ -1,9 +1,11 @@
 import requests
 import time
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 import fnmatch
 
+from agent.core.metrics import metrics
+
 class BitbucketClient:
     def __init__(self, workspace: str, token: str, base_url: str = "https://api.bitbucket.org/2.0"):
         self.workspace = workspace
@@ -15,12 +17,22 @@ class BitbucketClient:
             'Accept': 'application/json'
         })
     
+    def _get(self, url: str, endpoint: str, **kwargs) -> requests.Response:
+        metrics.inc('bitbucket_requests_total', endpoint=endpoint)
+        try:
+            with metrics.timer('bitbucket_request_seconds', endpoint=endpoint):
+                response = self.session.get(url, **kwargs)
+                response.raise_for_status()
+        except requests.exceptions.RequestException:
+            metrics.inc('bitbucket_errors_total', endpoint=endpoint)
+            raise
+        return response
+    
     def get_repository_tree(self, repo_slug: str, branch: str = "main", path: str = "") -> List[Dict]:
         url = f"{self.base_url}/repositories/{self.workspace}/{repo_slug}/src/{branch}/{path}"
         all_files = []
         try:
-            response = self.session.get(url)
-            response.raise_for_status()
+            response = self._get(url, 'tree')
             data = response.json()
             if 'values' in data:
                 for item in data['values']:
@@ -44,8 +56,7 @@ class BitbucketClient:
     def get_file_content(self, repo_slug: str, file_path: str, branch: str = "main") -> str:
         url = f"{self.base_url}/repositories/{self.workspace}/{repo_slug}/src/{branch}/{file_path}"
         try:
-            response = self.session.get(url)
-            response.raise_for_status()
+            response = self._get(url, 'file')
             return response.text
         except requests.exceptions.RequestException as e:
             print(f"Error fetching file {file_path}: {e}")
@@ -58,24 +69,72 @@ class BitbucketClient:
                 filtered.append(file)
         return filtered
     
-    def fetch_code_files(self, repo_slug: str, branch: str, path_pattern: str) -> List[Dict]:
-        all_files = self.get_repository_tree(repo_slug, branch)
-        matching_files = self.filter_files_by_pattern(all_files, path_pattern)
+    def get_branch_head(self, repo_slug: str, branch: str = "main") -> str:
+        url = f"{self.base_url}/repositories/{self.workspace}/{repo_slug}/refs/branches/{branch}"
+        try:
+            response = self._get(url, 'branch')
+            return response.json()['target']['hash']
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching branch {branch}: {e}")
+            raise
+    
+    def get_diffstat(self, repo_slug: str, since_commit: str, head_commit: str) -> List[Dict]:
+        url = f"{self.base_url}/repositories/{self.workspace}/{repo_slug}/diffstat/{head_commit}..{since_commit}"
+        params = {'topic': 'false', 'pagelen': 500}
+        changes = []
+        try:
+            while url:
+                response = self._get(url, 'diffstat', params=params)
+                data = response.json()
+                for item in data.get('values', []):
+                    changes.append({
+                        'status': item['status'],
+                        'old_path': (item.get('old') or {}).get('path'),
+                        'new_path': (item.get('new') or {}).get('path')
+                    })
+                url, params = data.get('next'), None
+                time.sleep(0.1)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching diffstat {since_commit}..{head_commit}: {e}")
+            raise
+        return changes
+    
+    def _fetch_contents(self, repo_slug: str, files: List[Dict], ref: str) -> List[Dict]:
         code_files = []
-        for file_meta in matching_files:
+        for file_meta in files:
             print(f"Fetching: {file_meta['path']}")
             try:
-                content = self.get_file_content(repo_slug, file_meta['path'], branch)
+                content = self.get_file_content(repo_slug, file_meta['path'], ref)
                 code_files.append({
                     'path': file_meta['path'],
                     'content': content,
-                    'size': file_meta['size']
+                    'size': file_meta.get('size') or len(content)
                 })
+                metrics.inc('bitbucket_files_fetched_total')
+                metrics.inc('bitbucket_bytes_fetched_total', len(content.encode('utf-8')))
                 time.sleep(0.1)
             except Exception as e:
                 print(f"Warning: Could not fetch {file_meta['path']}: {e}")
         return code_files
     
+    def fetch_code_files(self, repo_slug: str, branch: str, path_pattern: str, skip_paths: Optional[set] = None) -> List[Dict]:
+        all_files = self.get_repository_tree(repo_slug, branch)
+        matching_files = self.filter_files_by_pattern(all_files, path_pattern)
+        if skip_paths:
+            matching_files = [f for f in matching_files if f['path'] not in skip_paths]
+        return self._fetch_contents(repo_slug, matching_files, branch)
+    
+    def fetch_changed_code_files(self, repo_slug: str, since_commit: str, head_commit: str,
+                                 path_pattern: str) -> Tuple[List[Dict], List[str]]:
+        changed, removed = [], []
+        for change in self.get_diffstat(repo_slug, since_commit, head_commit):
+            old_path, new_path = change['old_path'], change['new_path']
+            if old_path and old_path != new_path and fnmatch.fnmatch(old_path, path_pattern):
+                removed.append(old_path)
+            if new_path and change['status'] != 'removed' and fnmatch.fnmatch(new_path, path_pattern):
+                changed.append({'path': new_path})
+        return self._fetch_contents(repo_slug, changed, head_commit), removed
+    
     def get_readme(self, repo_slug: str, branch: str = "main", readme_path: str = "README.md") -> Optional[str]:
         try:
             return self.get_file_content(repo_slug, readme_path, branch)
@@ -4,6 +4,8 @@ from typing import List, Dict, Optional, Union
 import ssl
 import certifi
 
+from agent.core.metrics import metrics
+
 class LocalLLMClient:
     def __init__(self, config):
         self.base_url = config.base_url.rstrip('/')
@@ -15,6 +17,7 @@ class LocalLLMClient:
         self.embedding_url = config.embedding_url or f"{self.base_url}/embeddings"
         self.max_tokens = config.max_tokens
         self.temperature = config.temperature
+        self.cache_prompt = config.cache_prompt
         self.verify_ssl = config.verify_ssl
         self.cert_path = config.cert_path
         self.custom_headers = config.custom_headers or {}
@@ -22,6 +25,22 @@ class LocalLLMClient:
         self._setup_authentication()
         self._setup_ssl()
     
+    def _post(self, operation: str, url: str, payload: Dict, timeout: int) -> Dict:
+        metrics.inc('llm_requests_total', operation=operation)
+        try:
+            with metrics.timer('llm_request_seconds', operation=operation):
+                response = self.session.post(url, json=payload, timeout=timeout)
+                response.raise_for_status()
+                result = response.json()
+        except requests.exceptions.RequestException:
+            metrics.inc('llm_errors_total', operation=operation)
+            raise
+        usage = result.get('usage') if isinstance(result, dict) else None
+        if usage:
+            metrics.inc('llm_tokens_total', usage.get('prompt_tokens') or 0, operation=operation, direction='in')
+            metrics.inc('llm_tokens_total', usage.get('completion_tokens') or 0, operation=operation, direction='out')
+        return result
+    
     def _setup_authentication(self):
         headers = {'Content-Type': 'application/json'}
         if self.auth_type == 'bearer':
@@ -44,7 +63,7 @@ class LocalLLMClient:
     def generate_completion(
         self, prompt: str, system_prompt: Optional[str] = None,
         max_tokens: Optional[int] = None, temperature: Optional[float] = None,
-        stream: bool = False
+        stream: bool = False, model: Optional[str] = None
     ) -> Union[str, Dict]:
         messages = []
         if system_prompt:
@@ -52,18 +71,17 @@ class LocalLLMClient:
         messages.append({"role": "user", "content": prompt})
         
         payload = {
-            "model": self.model_name,
+            "model": model or self.model_name,
             "messages": messages,
             "max_tokens": max_tokens or self.max_tokens,
             "temperature": temperature or self.temperature,
             "stream": stream
         }
+        if self.cache_prompt:
+            payload["cache_prompt"] = True
         
         try:
-            url = f"{self.base_url}/chat/completions"
-            response = self.session.post(url, json=payload, timeout=300)
-            response.raise_for_status()
-            result = response.json()
+            result = self._post('completion', f"{self.base_url}/chat/completions", payload, 300)
             if 'choices' in result and len(result['choices']) > 0:
                 return result['choices'][0]['message']['content']
             return result
@@ -75,10 +93,10 @@ class LocalLLMClient:
     
     def generate_embedding(self, text: str) -> List[float]:
         payload = {"model": self.embedding_model, "input": text}
+        metrics.inc('llm_embedding_batches_total')
+        metrics.inc('llm_embedding_inputs_total')
         try:
-            response = self.session.post(self.embedding_url, json=payload, timeout=60)
-            response.raise_for_status()
-            result = response.json()
+            result = self._post('embedding', self.embedding_url, payload, 60)
             if 'data' in result and len(result['data']) > 0:
                 return result['data'][0]['embedding']
             raise ValueError("No embedding in response")
@@ -88,10 +106,10 @@ class LocalLLMClient:
     
     def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
         payload = {"model": self.embedding_model, "input": texts}
+        metrics.inc('llm_embedding_batches_total')
+        metrics.inc('llm_embedding_inputs_total', len(texts))
         try:
-            response = self.session.post(self.embedding_url, json=payload, timeout=120)
-            response.raise_for_status()
-            result = response.json()
+            result = self._post('embedding', self.embedding_url, payload, 120)
             if 'data' in result:
                 return [item['embedding'] for item in result['data']]
             raise ValueError("No embeddings in response")
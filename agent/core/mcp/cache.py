@@ -0,0 +1,38 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+class ResourceCache:
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.generation: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, uri: str, generation: int) -> Optional[Any]:
+        with self._lock:
+            if generation != self.generation:
+                self._entries.clear()
+                self.generation = generation
+            if uri not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(uri)
+            self.hits += 1
+            return self._entries[uri]
+    
+    def put(self, uri: str, generation: int, value: Any):
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[uri] = value
+            self._entries.move_to_end(uri)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.generation = None
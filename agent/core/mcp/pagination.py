@@ -0,0 +1,97 @@
+import base64
+import json
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlencode, urlsplit, urlunsplit
+
+DEFAULT_PAGE_SIZE = 20
+DEFAULT_CHUNK_SIZE = 16384
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(position: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({'p': position}).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        return max(int(json.loads(base64.urlsafe_b64decode(padded))['p']), 0)
+    except (ValueError, KeyError, TypeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+def parse_resource_uri(uri: str) -> Tuple[str, str, Dict[str, str]]:
+    parts = urlsplit(uri)
+    path = unquote(parts.netloc + parts.path).strip('/')
+    params = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+    return parts.scheme, path, params
+
+def with_cursor(uri: str, cursor: str) -> str:
+    parts = urlsplit(uri)
+    params = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+    params['cursor'] = cursor
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(params), parts.fragment))
+
+def page_limit(params: Dict[str, str], default: int = DEFAULT_PAGE_SIZE) -> int:
+    return min(max(int(params.get('limit', default)), 1), MAX_PAGE_SIZE)
+
+def next_cursor(position: int, returned: int, limit: int, total: Optional[int] = None) -> Optional[str]:
+    if total is not None:
+        return encode_cursor(position + returned) if position + returned < total else None
+    return encode_cursor(position + returned) if returned >= limit else None
+
+def text_chunk(text: str, params: Dict[str, str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict:
+    offset = decode_cursor(params.get('cursor'))
+    chunk = text[offset:offset + chunk_size]
+    return {'content': chunk, 'offset': offset, 'total_length': len(text),
+            'next_cursor': next_cursor(offset, len(chunk), chunk_size, len(text))}
+
+class SchemaSnapshot:
+    def __init__(self, generation: int, page_size: int = 50):
+        self.generation = generation
+        self.page_size = page_size
+        self.table_count = 0
+        self.compressed_bytes = 0
+        self._pages: List[bytes] = []
+        self._table_pages: Dict[str, int] = {}
+    
+    @classmethod
+    def build(cls, tables: Iterable[Dict], generation: int, page_size: int = 50) -> "SchemaSnapshot":
+        snapshot = cls(generation, page_size)
+        batch = []
+        for table in tables:
+            batch.append(table)
+            if len(batch) == page_size:
+                snapshot._add_page(batch)
+                batch = []
+        if batch:
+            snapshot._add_page(batch)
+        return snapshot
+    
+    def _add_page(self, tables: List[Dict]):
+        page_index = len(self._pages)
+        for table in tables:
+            self._table_pages[table['table_name'].lower()] = page_index
+        payload = zlib.compress(json.dumps(tables, separators=(',', ':'), default=str).encode(), 6)
+        self._pages.append(payload)
+        self.table_count += len(tables)
+        self.compressed_bytes += len(payload)
+    
+    @property
+    def page_count(self) -> int:
+        return len(self._pages)
+    
+    def page(self, index: int) -> List[Dict]:
+        if index >= len(self._pages):
+            return []
+        return json.loads(zlib.decompress(self._pages[index]))
+    
+    def iter_pages(self, start: int = 0) -> Iterator[List[Dict]]:
+        for index in range(start, len(self._pages)):
+            yield self.page(index)
+    
+    def find_table(self, table_name: str) -> Optional[Dict]:
+        index = self._table_pages.get(table_name.lower())
+        if index is None:
+            return None
+        return next((t for t in self.page(index) if t['table_name'].lower() == table_name.lower()), None)
@@ -1,14 +1,62 @@
-from typing import List, Dict, Optional
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, List, Dict, Optional, Tuple
 from mcp.server import Server
 from mcp.types import Resource, Tool
 
+from agent.core.mcp.cache import ResourceCache
+from agent.core.mcp.pagination import (
+    DEFAULT_CHUNK_SIZE, SchemaSnapshot, decode_cursor, encode_cursor, next_cursor,
+    page_limit, parse_resource_uri, text_chunk, with_cursor
+)
+
 class MigrationMCPServer:
-    def __init__(self, vector_store, graph_store):
-        self.server = Server("migration-context")
+    def __init__(self, vector_store, graph_store, llm_client, max_workers: int = 8,
+                 embedding_cache_size: int = 1024, server_name: str = "migration-context",
+                 generation_source: Optional[Callable[[], int]] = None,
+                 cache_size: int = 256, generation_check_interval: float = 5.0,
+                 schema_store=None, schema_page_size: int = 50, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 neighbour_hops: int = 2, neighbour_limit: int = 10, hop_decay: float = 0.5):
+        self.server = Server(server_name)
         self.vector_store = vector_store
         self.graph_store = graph_store
+        self.llm_client = llm_client
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mcp-storage")
+        self._cached_embedding = lru_cache(maxsize=embedding_cache_size)(self._embed_query)
+        self.generation_source = generation_source
+        self.generation_check_interval = generation_check_interval
+        self.resource_cache = ResourceCache(cache_size)
+        self._generation = 0
+        self._generation_checked_at = 0.0
+        self.schema_store = schema_store
+        self.schema_page_size = schema_page_size
+        self.chunk_size = chunk_size
+        self.neighbour_hops = neighbour_hops
+        self.neighbour_limit = neighbour_limit
+        self.hop_decay = hop_decay
+        self._schema_snapshot: Optional[SchemaSnapshot] = None
+        self._snapshot_lock = asyncio.Lock()
         self._setup_handlers()
     
+    @classmethod
+    def from_oracle(cls, oracle_manager, llm_client, mcp_config):
+        return cls(
+            oracle_manager.vector_store, oracle_manager.graph_store, llm_client,
+            max_workers=mcp_config.max_workers, server_name=mcp_config.server_name,
+            generation_source=oracle_manager.get_ingestion_generation,
+            cache_size=mcp_config.cache_size,
+            generation_check_interval=mcp_config.generation_check_interval,
+            schema_store=oracle_manager.schema_store,
+            schema_page_size=mcp_config.schema_page_size,
+            chunk_size=mcp_config.chunk_size,
+            neighbour_hops=mcp_config.neighbour_hops,
+            neighbour_limit=mcp_config.neighbour_limit,
+            hop_decay=mcp_config.hop_decay
+        )
+    
     def _setup_handlers(self):
         @self.server.list_resources()
         async def list_resources():
@@ -32,33 +80,145 @@ class MigrationMCPServer:
         
         @self.server.read_resource()
         async def read_resource(uri):
-            if uri.startswith("code://"):
-                return await self.get_code_context(uri)
-            elif uri.startswith("docs://"):
-                return await self.get_doc_context(uri)
-            elif uri.startswith("schema://"):
-                return await self.get_schema_context(uri)
-            return None
+            return await self.read(str(uri))
+    
+    async def read(self, uri: str):
+        generation = await self._current_generation()
+        cached = self.resource_cache.get(uri, generation)
+        if cached is not None:
+            return cached
+        result = await self._read_uncached(uri)
+        if result is not None:
+            self.resource_cache.put(uri, generation, result)
+        return result
+    
+    async def stream_resource(self, uri: str):
+        page = await self.read(uri)
+        while page is not None:
+            yield page
+            cursor = page.get("next_cursor") if isinstance(page, dict) else None
+            if not cursor:
+                break
+            page = await self.read(with_cursor(uri, cursor))
+    
+    async def _read_uncached(self, uri: str):
+        if uri.startswith("code://"):
+            return await self.get_code_context(uri)
+        elif uri.startswith("docs://"):
+            return await self.get_doc_context(uri)
+        elif uri.startswith("schema://"):
+            return await self.get_schema_context(uri)
+        return None
+    
+    async def _current_generation(self) -> int:
+        if self.generation_source is None:
+            return self._generation
+        now = time.monotonic()
+        if now - self._generation_checked_at >= self.generation_check_interval:
+            self._generation_checked_at = now
+            self._generation = await self._run_blocking(self.generation_source)
+        return self._generation
+    
+    async def _run_blocking(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
     
     async def get_code_context(self, uri):
-        query = uri.replace("code://", "")
-        relevant_code = self.vector_store.search_similar_code(
-            self._get_embedding_for_query(query), k=10
+        _, query, params = parse_resource_uri(uri)
+        if query.startswith("component/"):
+            return await self.get_code_chunk(query[len("component/"):], params)
+        offset = decode_cursor(params.get("cursor"))
+        limit = page_limit(params)
+        embedding = await self._run_blocking(self._get_embedding_for_query, query)
+        results = await self._run_blocking(
+            self.vector_store.search_with_neighbourhood, embedding, limit, self.neighbour_hops,
+            None, offset, False, self.neighbour_limit, self.hop_decay
         )
-        dependencies = self.graph_store.get_dependencies(query)
-        return {"code": relevant_code, "dependencies": dependencies}
+        hits = [self._summarize_code_hit(hit) for hit in results]
+        return {"code": hits, "next_cursor": next_cursor(offset, len(hits), limit)}
+    
+    async def get_code_chunk(self, component_id: str, params: Dict):
+        offset = decode_cursor(params.get("cursor"))
+        chunk = await self._run_blocking(self.vector_store.read_code_chunk, component_id, offset, self.chunk_size)
+        if chunk is None:
+            return None
+        chunk["next_cursor"] = next_cursor(offset, len(chunk["content"]), self.chunk_size, chunk["total_length"])
+        return chunk
+    
+    def _summarize_code_hit(self, hit: Dict) -> Dict:
+        code = hit.pop("code_content", "") or ""
+        return {**hit, "preview": code[:400], "code_length": len(code),
+                "source_uri": f"code://component/{hit['id']}"}
     
     async def get_doc_context(self, uri):
-        doc_type = uri.replace("docs://", "")
-        return {"docs": f"Documentation for {doc_type}"}
+        _, doc_type, params = parse_resource_uri(uri)
+        chunk = text_chunk(f"Documentation for {doc_type}", params, self.chunk_size)
+        return {"docs": chunk.pop("content"), **chunk}
     
     async def get_schema_context(self, uri):
-        return {"schema": "SQL Server schema context"}
+        _, path, params = parse_resource_uri(uri)
+        snapshot = await self._get_schema_snapshot()
+        if "/" in path:
+            return {"table": snapshot.find_table(path.split("/", 1)[1])}
+        page_index = decode_cursor(params.get("cursor"))
+        return {
+            "tables": snapshot.page(page_index), "page": page_index,
+            "page_count": snapshot.page_count, "table_count": snapshot.table_count,
+            "next_cursor": encode_cursor(page_index + 1) if page_index + 1 < snapshot.page_count else None
+        }
+    
+    async def _get_schema_snapshot(self) -> SchemaSnapshot:
+        generation = await self._current_generation()
+        async with self._snapshot_lock:
+            if self._schema_snapshot is None or self._schema_snapshot.generation != generation:
+                self._schema_snapshot = await self._run_blocking(
+                    lambda: SchemaSnapshot.build(self.schema_store.iter_all_tables(), generation, self.schema_page_size)
+                )
+        return self._schema_snapshot
     
     def _get_embedding_for_query(self, query: str) -> List[float]:
-        return [0.0] * 1536
+        return list(self._cached_embedding(query.strip()))
+    
+    def _embed_query(self, query: str) -> Tuple[float, ...]:
+        return tuple(self.llm_client.generate_embedding(query))
     
     async def run(self):
         from mcp.server.stdio import stdio_server
-        async with stdio_server() as (read_stream, write_stream):
-            await self.server.run(read_stream, write_stream, self.server.create_initialization_options())
+        try:
+            async with stdio_server() as (read_stream, write_stream):
+                await self.server.run(read_stream, write_stream, self.server.create_initialization_options())
+        finally:
+            self.executor.shutdown(wait=False)
+    
+    def create_sse_app(self):
+        from mcp.server.sse import SseServerTransport
+        from starlette.applications import Starlette
+        from starlette.responses import Response, StreamingResponse
+        from starlette.routing import Mount, Route
+        
+        transport = SseServerTransport("/messages/")
+        
+        async def handle_sse(request):
+            async with transport.connect_sse(request.scope, request.receive, request._send) as (read_stream, write_stream):
+                await self.server.run(read_stream, write_stream, self.server.create_initialization_options())
+            return Response()
+        
+        async def handle_stream(request):
+            async def pages():
+                async for page in self.stream_resource(request.query_params["uri"]):
+                    yield json.dumps(page, default=str) + "\n"
+            return StreamingResponse(pages(), media_type="application/x-ndjson")
+        
+        return Starlette(routes=[
+            Route("/sse", endpoint=handle_sse, methods=["GET"]),
+            Route("/resources/stream", endpoint=handle_stream, methods=["GET"]),
+            Mount("/messages/", app=transport.handle_post_message)
+        ])
+    
+    async def run_sse(self, host: str, port: int):
+        import uvicorn
+        config = uvicorn.Config(self.create_sse_app(), host=host, port=port, log_level="info")
+        try:
+            await uvicorn.Server(config).serve()
+        finally:
+            self.executor.shutdown(wait=False)
@@ -0,0 +1,281 @@
+import bisect
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+STAGE_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 300.0, 900.0, 1800.0, 3600.0, 7200.0)
+
+COUNTER = 'counter'
+GAUGE = 'gauge'
+HISTOGRAM = 'histogram'
+
+METRICS = {
+    'stage_seconds': (HISTOGRAM, 'Wall time of each orchestrator stage'),
+    'stage_items_total': (COUNTER, 'Items (files, components, bundles) processed by each stage'),
+    'stage_throughput': (GAUGE, 'Items per second over the last completed run of each stage'),
+    'stage_active': (GAUGE, '1 while the stage is running'),
+    'component_seconds': (HISTOGRAM, 'Per-component processing latency'),
+    'bitbucket_requests_total': (COUNTER, 'Bitbucket API requests'),
+    'bitbucket_errors_total': (COUNTER, 'Bitbucket API requests that failed'),
+    'bitbucket_request_seconds': (HISTOGRAM, 'Bitbucket API request latency'),
+    'bitbucket_files_fetched_total': (COUNTER, 'Source files fetched from Bitbucket'),
+    'bitbucket_bytes_fetched_total': (COUNTER, 'Source bytes fetched from Bitbucket'),
+    'llm_requests_total': (COUNTER, 'LLM completion and embedding requests'),
+    'llm_errors_total': (COUNTER, 'LLM requests that failed'),
+    'llm_request_seconds': (HISTOGRAM, 'LLM request latency'),
+    'llm_tokens_total': (COUNTER, 'Tokens reported by the LLM server, by direction'),
+    'llm_embedding_batches_total': (COUNTER, 'Embedding requests sent'),
+    'llm_embedding_inputs_total': (COUNTER, 'Texts embedded'),
+    'oracle_round_trips_total': (COUNTER, 'Oracle round-trips by stage'),
+    'oracle_statements_total': (COUNTER, 'Oracle statements executed by stage'),
+    'oracle_acquire_seconds': (HISTOGRAM, 'Time spent waiting for a pooled Oracle connection'),
+    'oracle_pool_busy': (GAUGE, 'Busy Oracle pool connections at the last acquire'),
+    'queue_depth': (GAUGE, 'Items waiting in an in-process queue'),
+}
+
+PREFIX = 'migration_'
+
+def label_key(labels: Dict[str, object]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_labels(key: Tuple[Tuple[str, str], ...], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{escape_label(v)}"' for k, v in pairs) + '}'
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+    
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+    
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+        return self.max
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.values: Dict[Tuple[str, Tuple], float] = {}
+        self.histograms: Dict[Tuple[str, Tuple], Histogram] = {}
+    
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, label_key(labels))
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + value
+    
+    def set(self, name: str, value: float, **labels):
+        with self._lock:
+            self.values[(name, label_key(labels))] = value
+    
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...] = LATENCY_BUCKETS, **labels):
+        key = (name, label_key(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+    
+    @contextmanager
+    def timer(self, name: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, buckets, **labels)
+    
+    def get(self, name: str, **labels) -> float:
+        with self._lock:
+            return self.values.get((name, label_key(labels)), 0)
+    
+    def prometheus_text(self) -> str:
+        with self._lock:
+            values = sorted(self.values.items())
+            histograms = sorted((key, h.buckets, list(h.counts), h.count, h.sum) for key, h in self.histograms.items())
+        lines, described = [], set()
+        
+        def describe(name: str):
+            if name not in described:
+                described.add(name)
+                kind, help_text = METRICS.get(name, ('untyped', name))
+                lines.append(f"# HELP {PREFIX}{name} {help_text}")
+                lines.append(f"# TYPE {PREFIX}{name} {kind}")
+        
+        for (name, labels), value in values:
+            describe(name)
+            lines.append(f"{PREFIX}{name}{format_labels(labels)} {value:g}")
+        for (name, labels), buckets, counts, count, total in histograms:
+            describe(name)
+            cumulative = 0
+            for bound, bucket_count in zip(buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else f"{bound:g}"
+                lines.append(f"{PREFIX}{name}_bucket{format_labels(labels, (('le', le),))} {cumulative}")
+            lines.append(f"{PREFIX}{name}_sum{format_labels(labels)} {total:.6f}")
+            lines.append(f"{PREFIX}{name}_count{format_labels(labels)} {count}")
+        return '\n'.join(lines) + '\n'
+    
+    def summary(self) -> Dict:
+        with self._lock:
+            values = dict(self.values)
+            histograms = {key: (h.count, h.sum, h.max, h.quantile(0.5), h.quantile(0.95), h.quantile(0.99))
+                          for key, h in self.histograms.items()}
+        result: Dict[str, List[Dict]] = {}
+        for (name, labels), value in sorted(values.items()):
+            result.setdefault(name, []).append({**dict(labels), 'value': value})
+        for (name, labels), (count, total, maximum, p50, p95, p99) in sorted(histograms.items()):
+            result.setdefault(name, []).append({
+                **dict(labels), 'count': count, 'sum': round(total, 6), 'avg': round(total / count, 6) if count else 0.0,
+                'p50': round(p50, 6), 'p95': round(p95, 6), 'p99': round(p99, 6), 'max': round(maximum, 6)
+            })
+        return {'uptime_seconds': round(time.time() - self.started_at, 3), 'stages': self.stage_summary(), 'metrics': result}
+    
+    def stage_summary(self) -> List[Dict]:
+        with self._lock:
+            stages = {dict(labels)['stage']: h.sum for (name, labels), h in self.histograms.items()
+                      if name == 'stage_seconds' and 'stage' in dict(labels)}
+            items = {dict(labels).get('stage'): value for (name, labels), value in self.values.items()
+                     if name == 'stage_items_total'}
+            round_trips = {dict(labels).get('stage'): value for (name, labels), value in self.values.items()
+                           if name == 'oracle_round_trips_total'}
+        rows = []
+        for stage, seconds in sorted(stages.items(), key=lambda item: -item[1]):
+            count = items.get(stage, 0)
+            rows.append({'stage': stage, 'seconds': round(seconds, 3), 'items': count,
+                         'items_per_second': round(count / seconds, 3) if seconds else 0.0,
+                         'oracle_round_trips': round_trips.get(stage, 0)})
+        return rows
+    
+    def write_textfile(self, path: str):
+        write_atomic_text(path, self.prometheus_text())
+    
+    def write_summary(self, path: str):
+        write_atomic_text(path, json.dumps(self.summary(), indent=2, default=str))
+
+def _current_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+UMASK = _current_umask()
+
+def replacement_mode(path) -> int:
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~UMASK
+
+def write_atomic_text(path: str, text: str):
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+        os.chmod(temp_path, replacement_mode(path))
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+class MetricsExporter:
+    def __init__(self, registry: MetricsRegistry, config):
+        self.registry = registry
+        self.config = config
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        if self.config.port:
+            self._server = ThreadingHTTPServer((self.config.host, self.config.port), self._handler())
+            threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+            print(f"Serving metrics on http://{self.config.host}:{self.config.port}/metrics")
+        if self.config.textfile or self.config.summary_path:
+            self._thread = threading.Thread(target=self._write_periodically, name="metrics-writer", daemon=True)
+            self._thread.start()
+        return self
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        try:
+            self._write()
+        except OSError as e:
+            print(f"Warning: Could not write metrics: {e}")
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+    
+    def _write(self):
+        if self.config.textfile:
+            self.registry.write_textfile(self.config.textfile)
+        if self.config.summary_path:
+            self.registry.write_summary(self.config.summary_path)
+    
+    def _write_periodically(self):
+        while not self._stop.wait(self.config.write_interval):
+            try:
+                self._write()
+            except OSError as e:
+                print(f"Warning: Could not write metrics: {e}")
+    
+    def _handler(self):
+        registry = self.registry
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                if path == '/metrics':
+                    body, content_type = registry.prometheus_text(), 'text/plain; version=0.0.4'
+                elif path == '/metrics.json':
+                    body, content_type = json.dumps(registry.summary(), default=str), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return Handler
+
+metrics = MetricsRegistry()
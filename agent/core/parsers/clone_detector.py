@@ -0,0 +1,241 @@
+import hashlib
+import math
+import re
+import zlib
+from array import array
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from agent.core.parsers.csharp_parser import TOKEN_PATTERN
+
+ENTITY_SUFFIXES = ('Controller', 'Service', 'Repository', 'Manager', 'Handler')
+ENTITY_PLACEHOLDER = '\x00E'
+WORD_PARTS = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+')
+STRING_LITERAL = re.compile(r'"""[\s\S]*?"""|"(?:[^"\\\n]|\\.)*"')
+FRAMEWORK_WORDS = frozenset({
+    'Order', 'Sort', 'Page', 'Group', 'Index', 'Table', 'Column', 'Join', 'Select', 'Query', 'Key', 'Value',
+    'Entity', 'Type', 'Class', 'Object', 'Map', 'List', 'Set', 'Stream', 'Optional', 'Model', 'Request',
+    'Response', 'Status', 'Path', 'Header', 'Body', 'Param', 'Mapping', 'Transaction', 'Component', 'Bean',
+    'Case', 'Limit', 'Range', 'Lock', 'Record', 'Exception'
+})
+
+def singular(word: str) -> str:
+    if word.endswith('ies') and len(word) > 4:
+        return word[:-3] + 'y'
+    if word.endswith(('sses', 'xes', 'ches', 'shes')):
+        return word[:-2]
+    if word.endswith('s') and not word.endswith('ss') and len(word) > 3:
+        return word[:-1]
+    return word
+
+def plural(word: str) -> str:
+    if word.endswith('y') and len(word) > 1 and word[-2].lower() not in 'aeiou':
+        return word[:-1] + 'ies'
+    if word.endswith(('s', 'x', 'ch', 'sh')):
+        return word + 'es'
+    return word + 's'
+
+def entity_stem(class_name: str) -> str:
+    for suffix in ENTITY_SUFFIXES:
+        if class_name.endswith(suffix) and len(class_name) > len(suffix):
+            class_name = class_name[:-len(suffix)]
+            break
+    return singular(class_name)
+
+def name_variants(stem: str) -> List[str]:
+    variants = []
+    for form in (plural(stem), stem):
+        words = WORD_PARTS.findall(form) or [form]
+        variants.extend([
+            form, form[:1].lower() + form[1:], form.lower(), form.upper(),
+            '_'.join(w.lower() for w in words), '-'.join(w.lower() for w in words),
+            '_'.join(w.upper() for w in words)
+        ])
+    return variants
+
+def substitution_pairs(source_stem: str, target_stem: str) -> Optional[List[Tuple[str, str]]]:
+    if not source_stem or source_stem == target_stem:
+        return []
+    pairs = {}
+    for source, target in zip(name_variants(source_stem), name_variants(target_stem)):
+        if pairs.setdefault(source, target) != target:
+            return None
+    return sorted(((s, t) for s, t in pairs.items() if s != t), key=lambda pair: -len(pair[0]))
+
+def variants_pattern(variants: Iterable[str]) -> re.Pattern:
+    ordered = sorted(set(variants), key=len, reverse=True)
+    upper = '|'.join(re.escape(v) for v in ordered if v[:1].isupper())
+    lower = '|'.join(re.escape(v) for v in ordered if not v[:1].isupper())
+    alternatives = ([f"(?:{upper})"] if upper else []) + ([f"(?<![A-Za-z0-9])(?:{lower})"] if lower else [])
+    return re.compile(f"(?:{'|'.join(alternatives)})(?![a-z])")
+
+def substitution_mapping(pairs: Sequence[Sequence[str]]) -> Dict[str, str]:
+    return {source: target for source, target in pairs if '_' in source or not source.isupper()}
+
+def apply_substitutions(text: str, pairs: Sequence[Sequence[str]]) -> str:
+    mapping = substitution_mapping(pairs)
+    if not mapping:
+        return text
+    return variants_pattern(mapping).sub(lambda m: mapping[m.group(0)], text)
+
+def substitution_conflict(text: str, pairs: Sequence[Sequence[str]]) -> Optional[str]:
+    sources = [source for source, _ in pairs]
+    if not sources:
+        return None
+    shared = sorted(s for s in sources if s in FRAMEWORK_WORDS)
+    if shared:
+        return f"'{shared[0]}' is also a Java/Spring/SQL identifier"
+    pattern = variants_pattern(sources)
+    for literal in STRING_LITERAL.finditer(text):
+        if any(c.isspace() for c in literal.group(0)):
+            match = pattern.search(literal.group(0))
+            if match:
+                return f"'{match.group(0)}' appears inside the literal {literal.group(0)[:40]}"
+    return None
+
+def normalized_tokens(code: str, stem: str) -> List[str]:
+    if stem:
+        code = variants_pattern(name_variants(stem)).sub(ENTITY_PLACEHOLDER, code)
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(code):
+        kind = match.lastgroup
+        if kind is None or kind == 'comment' or kind == 'preproc':
+            continue
+        tokens.append(match.group(kind))
+    return tokens
+
+def cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+@dataclass
+class _Entry:
+    component_id: str
+    component_type: str
+    class_name: str
+    stem: str
+    signature: array
+    shape: bytes
+    embedding: Optional[array]
+
+class _UnionFind:
+    def __init__(self):
+        self.parent: Dict[str, str] = {}
+    
+    def find(self, item: str) -> str:
+        parent = self.parent.setdefault(item, item)
+        while parent != self.parent[parent]:
+            self.parent[parent] = self.parent[self.parent[parent]]
+            parent = self.parent[parent]
+        self.parent[item] = parent
+        return parent
+    
+    def union(self, a: str, b: str):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+class CloneDetector:
+    def __init__(self, num_perm: int = 64, bands: int = 16, shingle_size: int = 4,
+                 jaccard_threshold: float = 0.85, embedding_threshold: float = 0.9,
+                 derive_min_similarity: float = 1.0):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.jaccard_threshold = jaccard_threshold
+        self.embedding_threshold = embedding_threshold
+        self.derive_min_similarity = derive_min_similarity
+        self.entries: Dict[str, _Entry] = {}
+        self._buckets: Dict[Tuple, List[str]] = defaultdict(list)
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def signature(self, tokens: List[str]) -> array:
+        empty = 0xFFFFFFFF
+        signature = array('L', [empty] * self.num_perm)
+        k = self.shingle_size
+        for i in range(max(len(tokens) - k + 1, 1)):
+            h = zlib.crc32('\x1f'.join(tokens[i:i + k]).encode())
+            slot, value = h % self.num_perm, h // self.num_perm
+            if value < signature[slot]:
+                signature[slot] = value
+        filled = [i for i, v in enumerate(signature) if v != empty]
+        if filled and len(filled) < self.num_perm:
+            for i in range(self.num_perm):
+                if signature[i] == empty:
+                    donor = next(j for j in filled + [filled[0] + self.num_perm] if j > i) % self.num_perm
+                    signature[i] = signature[donor]
+        return signature
+    
+    def add(self, component_id: str, component_type: str, class_name: str, code: str,
+            embedding: Optional[Sequence[float]] = None):
+        stem = entity_stem(class_name or '')
+        tokens = normalized_tokens(code or '', stem)
+        signature = self.signature(tokens)
+        shape = hashlib.blake2b('\x1f'.join(tokens).encode(), digest_size=16).digest()
+        self.entries[component_id] = _Entry(component_id, component_type, class_name, stem, signature, shape,
+                                            array('f', embedding) if embedding is not None else None)
+        for band in range(self.bands):
+            start = band * self.rows
+            self._buckets[(component_type, band, tuple(signature[start:start + self.rows]))].append(component_id)
+    
+    def similarity(self, a: str, b: str) -> float:
+        sig_a, sig_b = self.entries[a].signature, self.entries[b].signature
+        return sum(x == y for x, y in zip(sig_a, sig_b)) / self.num_perm
+    
+    def embedding_similarity(self, a: str, b: str) -> Optional[float]:
+        emb_a, emb_b = self.entries[a].embedding, self.entries[b].embedding
+        if emb_a is None or emb_b is None:
+            return None
+        return cosine_similarity(emb_a, emb_b)
+    
+    def _is_near_duplicate(self, a: str, b: str) -> bool:
+        if self.similarity(a, b) < self.jaccard_threshold:
+            return False
+        cosine = self.embedding_similarity(a, b)
+        return cosine is None or cosine >= self.embedding_threshold
+    
+    def clusters(self) -> List[Dict]:
+        union_find = _UnionFind()
+        for ids in self._buckets.values():
+            head = ids[0]
+            for other in ids[1:]:
+                if union_find.find(head) != union_find.find(other) and self._is_near_duplicate(head, other):
+                    union_find.union(head, other)
+        members: Dict[str, List[str]] = defaultdict(list)
+        for component_id in self.entries:
+            members[union_find.find(component_id)].append(component_id)
+        records = []
+        for cluster_id, ids in members.items():
+            if len(ids) > 1:
+                records.extend(self._cluster_records(cluster_id, ids))
+        return records
+    
+    def _cluster_records(self, cluster_id: str, ids: List[str]) -> List[Dict]:
+        shapes = Counter(self.entries[i].shape for i in ids)
+        rep_shape = max(shapes, key=shapes.get)
+        representative = min((i for i in ids if self.entries[i].shape == rep_shape),
+                             key=lambda i: (-len(WORD_PARTS.findall(self.entries[i].stem)), self.entries[i].class_name, i))
+        rep = self.entries[representative]
+        records = []
+        for component_id in ids:
+            entry = self.entries[component_id]
+            similarity = self.similarity(representative, component_id)
+            substitutions = substitution_pairs(rep.stem, entry.stem)
+            derivable = component_id != representative and substitutions is not None and (
+                entry.shape == rep.shape or similarity >= self.derive_min_similarity)
+            cosine = self.embedding_similarity(representative, component_id)
+            records.append({
+                'component_id': component_id, 'cluster_id': cluster_id,
+                'representative_id': representative if derivable else component_id,
+                'similarity': round(similarity, 4),
+                'embedding_similarity': round(cosine, 4) if cosine is not None else None,
+                'substitutions': substitutions if derivable else []
+            })
+        return records
@@ -1,22 +1,201 @@
-from typing import List, Dict, Optional
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from pathlib import PurePath
+from typing import List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r'''\s*(?:
+    (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<preproc>\#[^\n]*)
+  | (?P<string>"""[\s\S]*?"""|\$?@"(?:[^"]|"")*"|@\$"(?:[^"]|"")*"|\$?"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+  | (?P<ident>@?[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<number>\d[\w.]*)
+  | (?P<op>=>|\?\?=?|::|\?\.|[{}()\[\];,<>=.:?])
+  | (?P<other>\S)
+)''', re.VERBOSE | re.DOTALL)
+
+MODIFIERS = frozenset({
+    'public', 'private', 'protected', 'internal', 'static', 'abstract', 'sealed', 'partial',
+    'virtual', 'override', 'async', 'readonly', 'extern', 'unsafe', 'new', 'const', 'volatile',
+    'required', 'file', 'fixed', 'implicit', 'explicit'
+})
+TYPE_KEYWORDS = frozenset({'class', 'struct', 'interface', 'record', 'enum'})
+PARAMETER_MODIFIERS = frozenset({'this', 'ref', 'out', 'in', 'params', 'scoped', 'readonly'})
+BUILTIN_TYPES = frozenset({
+    'bool', 'byte', 'sbyte', 'char', 'decimal', 'double', 'float', 'int', 'uint', 'nint', 'nuint',
+    'long', 'ulong', 'short', 'ushort', 'object', 'string', 'dynamic', 'var', 'void'
+})
+DEPENDENCY_SUFFIXES = ('Repository', 'Service', 'Controller')
+OPENERS = {'(': ')', '[': ']', '{': '}'}
+
+@dataclass
+class CSharpAttribute:
+    name: str
+    arguments: str = ''
+
+@dataclass
+class CSharpParameter:
+    type: str
+    name: str
+
+@dataclass
+class CSharpMethod:
+    name: str
+    return_type: str
+    parameters: List[CSharpParameter]
+    modifiers: List[str]
+    attributes: List[CSharpAttribute]
+    start_line: int
+    end_line: int
+    is_constructor: bool = False
+
+@dataclass
+class CSharpMember:
+    name: str
+    type: str
+    modifiers: List[str]
+    attributes: List[CSharpAttribute]
+
+@dataclass
+class CSharpClass:
+    name: str
+    kind: str
+    namespace: str
+    modifiers: List[str]
+    attributes: List[CSharpAttribute]
+    base_types: List[str]
+    type_parameters: List[str]
+    start_line: int
+    end_line: int = 0
+    methods: List[CSharpMethod] = field(default_factory=list)
+    properties: List[CSharpMember] = field(default_factory=list)
+    fields: List[CSharpMember] = field(default_factory=list)
+    object_creations: List[str] = field(default_factory=list)
+    parent: Optional[str] = None
+    
+    @property
+    def full_name(self) -> str:
+        local = f"{self.parent}.{self.name}" if self.parent else self.name
+        return f"{self.namespace}.{local}" if self.namespace else local
+    
+    @property
+    def is_partial(self) -> bool:
+        return 'partial' in self.modifiers
+    
+    @property
+    def constructor_parameters(self) -> List[CSharpParameter]:
+        params = []
+        for method in self.methods:
+            if method.is_constructor and 'static' not in method.modifiers:
+                params.extend(method.parameters)
+        return params
+
+@dataclass
+class ParsedCSharpFile:
+    file_path: str
+    code: str
+    type: str
+    namespace: str
+    usings: List[str]
+    classes: List[CSharpClass]
+    
+    @property
+    def primary_class(self) -> Optional[CSharpClass]:
+        if not self.classes:
+            return None
+        stem = PurePath(self.file_path).stem.split('.')[0]
+        top_level = [c for c in self.classes if c.parent is None]
+        for cls in top_level:
+            if cls.name == stem:
+                return cls
+        return next((c for c in top_level if 'public' in c.modifiers), (top_level or self.classes)[0])
+    
+    @property
+    def name(self) -> str:
+        primary = self.primary_class
+        return primary.name if primary else ''
+    
+    @property
+    def methods(self) -> List[str]:
+        return [m.name for c in self.classes for m in c.methods
+                if 'public' in m.modifiers and not m.is_constructor]
+    
+    @property
+    def properties(self) -> List[str]:
+        return [p.name for c in self.classes for p in c.properties if 'public' in p.modifiers]
+    
+    @property
+    def constructor_parameter_types(self) -> List[str]:
+        names = (simple_type_name(p.type) for c in self.classes for p in c.constructor_parameters)
+        return _unique(n for n in names if n not in BUILTIN_TYPES)
+    
+    @property
+    def dependencies(self) -> List[str]:
+        created = (simple_type_name(t) for c in self.classes for t in c.object_creations)
+        return _unique(list(self.constructor_parameter_types) +
+                       [t for t in created if t.endswith(DEPENDENCY_SUFFIXES)])
+
+def simple_type_name(type_text: str) -> str:
+    base = type_text.split('<', 1)[0].rstrip('?[]')
+    return base.rsplit('.', 1)[-1].lstrip('@')
+
+def _unique(items) -> List[str]:
+    seen = {}
+    for item in items:
+        if item:
+            seen.setdefault(item, None)
+    return list(seen)
+
+class _TokenStream:
+    __slots__ = ('kinds', 'values', 'positions', 'content', 'line_starts')
+    
+    def __init__(self, content: str):
+        kinds, values, positions = [], [], []
+        for match in TOKEN_PATTERN.finditer(content):
+            kind = match.lastgroup
+            if kind is None or kind == 'comment' or kind == 'preproc':
+                continue
+            kinds.append(kind)
+            values.append(match.group(kind))
+            positions.append(match.start(kind))
+        self.kinds = kinds
+        self.values = values
+        self.positions = positions
+        self.content = content
+        self.line_starts = None
+    
+    def line_of(self, index: int) -> int:
+        if self.line_starts is None:
+            self.line_starts = [0] + [m.end() for m in re.finditer('\n', self.content)]
+        pos = self.positions[min(index, len(self.positions) - 1)] if self.positions else 0
+        return bisect_right(self.line_starts, pos)
 
 class CSharpParser:
     def __init__(self):
         pass
     
-    def parse_code(self, content: str, file_path: str) -> Dict:
-        return {
-            'file_path': file_path,
-            'content': content,
-            'type': self._detect_type(file_path),
-            'name': self._extract_class_name(content),
-            'namespace': self._extract_namespace(content),
-            'methods': self._extract_methods(content),
-            'properties': self._extract_properties(content),
-            'dependencies': self._extract_dependencies(content)
-        }
-    
-    def _detect_type(self, file_path: str) -> str:
+    def parse_code(self, content: str, file_path: str) -> ParsedCSharpFile:
+        tokens = _TokenStream(content)
+        state = _ParseState(tokens)
+        state.parse_scope(0, len(tokens.values), namespace='', owner=None)
+        state.assign_object_creations()
+        parsed = ParsedCSharpFile(
+            file_path=file_path, code=content, type='other',
+            namespace=state.first_namespace, usings=state.usings, classes=state.classes
+        )
+        parsed.type = self._detect_type(file_path, parsed.primary_class)
+        return parsed
+    
+    def _detect_type(self, file_path: str, primary: Optional[CSharpClass] = None) -> str:
+        if primary is not None:
+            markers = [primary.name] + [simple_type_name(b) for b in primary.base_types]
+            attributes = {a.name for a in primary.attributes}
+            if any(m.endswith('Controller') or m == 'ControllerBase' for m in markers) or 'ApiController' in attributes:
+                return 'controller'
+            if primary.name.endswith('Service'):
+                return 'service'
+            if primary.name.endswith('Repository'):
+                return 'repository'
         if 'Controller' in file_path:
             return 'controller'
         elif 'Service' in file_path:
@@ -26,26 +205,312 @@ class CSharpParser:
         elif 'Model' in file_path or 'Entity' in file_path:
             return 'model'
         return 'other'
+
+class _ParseState:
+    def __init__(self, tokens: _TokenStream):
+        self.tokens = tokens
+        self.values = tokens.values
+        self.kinds = tokens.kinds
+        self.usings: List[str] = []
+        self.classes: List[CSharpClass] = []
+        self.first_namespace = ''
+        self._class_ranges: List[Tuple[int, int, CSharpClass]] = []
+    
+    def skip_balanced(self, i: int) -> int:
+        values = self.values
+        n = len(values)
+        closer = OPENERS[values[i]]
+        opener = values[i]
+        depth = 0
+        while i < n:
+            v = values[i]
+            if v == opener:
+                depth += 1
+            elif v == closer:
+                depth -= 1
+                if depth == 0:
+                    return i + 1
+            i += 1
+        return n
+    
+    def skip_angles(self, i: int) -> int:
+        values = self.values
+        n = len(values)
+        depth = 0
+        while i < n:
+            v = values[i]
+            if v == '<':
+                depth += 1
+            elif v == '>':
+                depth -= 1
+                if depth == 0:
+                    return i + 1
+            elif v in ('{', ';'):
+                return i
+            i += 1
+        return n
+    
+    def skip_statement(self, i: int, end: int) -> int:
+        values = self.values
+        while i < end:
+            v = values[i]
+            if v == ';':
+                return i + 1
+            if v in OPENERS:
+                i = self.skip_balanced(i)
+                if v == '{' and (i >= end or values[i] != ';' and values[i] != ','):
+                    return i
+                continue
+            i += 1
+        return end
+    
+    def text(self, start: int, stop: int) -> str:
+        if start >= stop:
+            return ''
+        positions = self.tokens.positions
+        raw = self.tokens.content[positions[start]:positions[stop - 1] + len(self.values[stop - 1])]
+        return re.sub(r'\s+', ' ', raw).strip()
+    
+    def read_attributes(self, i: int, end: int) -> Tuple[List[CSharpAttribute], int]:
+        attributes = []
+        values = self.values
+        while i < end and values[i] == '[':
+            close = self.skip_balanced(i)
+            j = i + 1
+            if j + 1 < close and values[j + 1] == ':' and self.kinds[j] == 'ident':
+                j += 2
+            while j < close - 1:
+                name_start = j
+                while j < close - 1 and values[j] not in ('(', ','):
+                    j += 1
+                name = ''.join(values[name_start:j])
+                arguments = ''
+                if j < close - 1 and values[j] == '(':
+                    args_end = self.skip_balanced(j)
+                    arguments = self.text(j + 1, args_end - 1)
+                    j = args_end
+                if name:
+                    attributes.append(CSharpAttribute(name[:-9] if name.endswith('Attribute') else name, arguments))
+                if j < close - 1 and values[j] == ',':
+                    j += 1
+            i = close
+        return attributes, i
+    
+    def split_top_level(self, start: int, stop: int) -> List[Tuple[int, int]]:
+        parts = []
+        depth = 0
+        part_start = start
+        values = self.values
+        for i in range(start, stop):
+            v = values[i]
+            if v in ('(', '[', '{', '<'):
+                depth += 1
+            elif v in (')', ']', '}', '>'):
+                depth -= 1
+            elif v == ',' and depth == 0:
+                parts.append((part_start, i))
+                part_start = i + 1
+        if part_start < stop:
+            parts.append((part_start, stop))
+        return parts
     
-    def _extract_class_name(self, content: str) -> str:
-        import re
-        match = re.search(r'class\s+(\w+)', content)
-        return match.group(1) if match else ''
+    def read_parameters(self, open_index: int) -> Tuple[List[CSharpParameter], int]:
+        close = self.skip_balanced(open_index)
+        parameters = []
+        for start, stop in self.split_top_level(open_index + 1, close - 1):
+            _, start = self.read_attributes(start, stop)
+            while start < stop and self.values[start] in PARAMETER_MODIFIERS:
+                start += 1
+            eq = next((k for k in range(start, stop) if self.values[k] == '='), stop)
+            if eq - start >= 2:
+                parameters.append(CSharpParameter(self.text(start, eq - 1).replace(' ', ''), self.values[eq - 1].lstrip('@')))
+        return parameters, close
     
-    def _extract_namespace(self, content: str) -> str:
-        import re
-        match = re.search(r'namespace\s+([\w.]+)', content)
-        return match.group(1) if match else ''
+    def parse_scope(self, i: int, end: int, namespace: str, owner: Optional[CSharpClass]):
+        values = self.values
+        kinds = self.kinds
+        while i < end:
+            v = values[i]
+            if v == '}' or v == ';':
+                i += 1
+                continue
+            if owner is None and v == 'using' and i + 1 < end and values[i + 1] != '(':
+                stop = self.skip_statement(i, end)
+                j = i + 1
+                if j < stop and values[j] in ('static', 'global'):
+                    j += 1
+                if j + 1 < stop and values[j + 1] == '=':
+                    j += 2
+                self.usings.append(''.join(values[j:stop - 1]))
+                i = stop
+                continue
+            if owner is None and v == 'global' and i + 1 < end and values[i + 1] == 'using':
+                i += 1
+                continue
+            if v == 'namespace':
+                j = i + 1
+                while j < end and values[j] not in ('{', ';'):
+                    j += 1
+                name = ''.join(values[i + 1:j])
+                full_name = f"{namespace}.{name}" if namespace else name
+                if not self.first_namespace:
+                    self.first_namespace = full_name
+                if j < end and values[j] == '{':
+                    close = self.skip_balanced(j)
+                    self.parse_scope(j + 1, close - 1, full_name, None)
+                    i = close
+                else:
+                    self.parse_scope(j + 1, end, full_name, None)
+                    return
+                continue
+            attributes, i = self.read_attributes(i, end)
+            modifiers = []
+            while i < end and values[i] in MODIFIERS and not (i + 1 < end and values[i + 1] in ('(', '=', ';')):
+                modifiers.append(values[i])
+                i += 1
+            if i >= end:
+                break
+            v = values[i]
+            if v in TYPE_KEYWORDS:
+                i = self.parse_type(i, end, namespace, owner, attributes, modifiers)
+            elif v == 'delegate' or owner is None:
+                i = self.skip_statement(i, end)
+            else:
+                i = self.parse_member(i, end, owner, attributes, modifiers)
     
-    def _extract_methods(self, content: str) -> List[str]:
-        import re
-        return re.findall(r'public\s+\w+\s+(\w+)\s*\(', content)
+    def parse_type(self, i: int, end: int, namespace: str, owner: Optional[CSharpClass],
+                   attributes: List[CSharpAttribute], modifiers: List[str]) -> int:
+        values = self.values
+        start = i
+        kind = values[i]
+        i += 1
+        if kind == 'record' and i < end and values[i] in ('class', 'struct'):
+            i += 1
+        name = values[i].lstrip('@') if i < end else ''
+        i += 1
+        type_parameters = []
+        if i < end and values[i] == '<':
+            close = self.skip_angles(i)
+            type_parameters = [self.text(a, b) for a, b in self.split_top_level(i + 1, close - 1)]
+            i = close
+        cls = CSharpClass(
+            name=name, kind=kind, namespace=namespace, modifiers=modifiers, attributes=attributes,
+            base_types=[], type_parameters=type_parameters, start_line=self.tokens.line_of(start),
+            parent=owner.name if owner else None
+        )
+        if i < end and values[i] == '(':
+            parameters, i = self.read_parameters(i)
+            cls.methods.append(CSharpMethod(name, '', parameters, ['public'], [], cls.start_line, cls.start_line, True))
+        if i < end and values[i] == ':':
+            j = i + 1
+            while j < end and values[j] not in ('{', ';', 'where'):
+                j = self.skip_balanced(j) if values[j] == '(' else j + 1
+            for a, b in self.split_top_level(i + 1, j):
+                base = self.text(a, b).replace(' ', '')
+                cls.base_types.append(base.split('(', 1)[0])
+            i = j
+        while i < end and values[i] not in ('{', ';'):
+            i += 1
+        self.classes.append(cls)
+        if i < end and values[i] == '{':
+            close = self.skip_balanced(i)
+            if kind != 'enum':
+                self.parse_scope(i + 1, close - 1, namespace, cls)
+            self._class_ranges.append((i, close, cls))
+            cls.end_line = self.tokens.line_of(close - 1)
+            return close
+        cls.end_line = self.tokens.line_of(i)
+        return i + 1
     
-    def _extract_properties(self, content: str) -> List[str]:
-        import re
-        return re.findall(r'public\s+\w+\s+(\w+)\s*\{', content)
+    def parse_member(self, i: int, end: int, owner: CSharpClass,
+                     attributes: List[CSharpAttribute], modifiers: List[str]) -> int:
+        values = self.values
+        kinds = self.kinds
+        start = i
+        angle = 0
+        while i < end:
+            v = values[i]
+            if v == '<':
+                angle += 1
+            elif v == '>':
+                angle -= 1
+            elif angle <= 0 and v in ('(', '{', ';', '=', '=>'):
+                break
+            elif v == '[' and angle <= 0 and i > start and values[i - 1] == 'this':
+                break
+            elif v in ('[', '(') and angle > 0:
+                i = self.skip_balanced(i)
+                continue
+            i += 1
+        if i >= end:
+            return end
+        terminator = values[i]
+        if terminator == '[':
+            return self.skip_statement(i, end)
+        header_end = i
+        name_index = header_end - 1
+        if terminator == '(' and values[name_index] == '>':
+            depth = 0
+            while name_index > start:
+                if values[name_index] == '>':
+                    depth += 1
+                elif values[name_index] == '<':
+                    depth -= 1
+                    if depth == 0:
+                        name_index -= 1
+                        break
+                name_index -= 1
+        if name_index < start or kinds[name_index] != 'ident' or 'operator' in values[start:name_index]:
+            return self.skip_statement(i, end)
+        name = values[name_index].lstrip('@')
+        member_type = self.text(start, name_index).replace(' ', '')
+        if terminator == '(':
+            is_constructor = name == owner.name and not member_type
+            parameters, i = self.read_parameters(i)
+            while i < end and values[i] not in ('{', ';', '=>'):
+                i = self.skip_balanced(i) if values[i] == '(' else i + 1
+            if i < end and values[i] == '{':
+                body_end = self.skip_balanced(i)
+            else:
+                body_end = self.skip_statement(i, end)
+            owner.methods.append(CSharpMethod(
+                name=name, return_type=member_type, parameters=parameters, modifiers=modifiers,
+                attributes=attributes, start_line=self.tokens.line_of(start),
+                end_line=self.tokens.line_of(body_end - 1), is_constructor=is_constructor
+            ))
+            return body_end
+        if terminator == '{' or terminator == '=>':
+            member = CSharpMember(name, member_type, modifiers, attributes)
+            if values[start] == 'event':
+                member.type = member.type[len('event'):]
+            owner.properties.append(member)
+            if terminator == '{':
+                i = self.skip_balanced(i)
+                if i < end and values[i] == '=':
+                    i = self.skip_statement(i, end)
+                return i
+            return self.skip_statement(i, end)
+        if member_type:
+            if values[start] == 'event':
+                member_type = member_type[len('event'):]
+            owner.fields.append(CSharpMember(name, member_type, modifiers, attributes))
+        return self.skip_statement(i, end)
     
-    def _extract_dependencies(self, content: str) -> List[str]:
-        import re
-        pattern = r'new\s+(\w+Repository|\w+Service|\w+Controller)'
-        return re.findall(pattern, content)
+    def assign_object_creations(self):
+        if not self._class_ranges:
+            return
+        ranges = sorted(self._class_ranges, key=lambda r: r[1] - r[0])
+        values = self.values
+        kinds = self.kinds
+        n = len(values)
+        for i, v in enumerate(values):
+            if v != 'new' or i + 1 >= n or kinds[i + 1] != 'ident':
+                continue
+            j = i + 1
+            while j + 2 < n and values[j + 1] == '.' and kinds[j + 2] == 'ident':
+                j += 2
+            type_name = ''.join(values[i + 1:j + 1])
+            for start, stop, cls in ranges:
+                if start < i < stop:
+                    cls.object_creations.append(type_name)
+                    break
@@ -0,0 +1,88 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from agent.core.metrics import metrics
+from agent.core.parsers.csharp_parser import CSharpParser, ParsedCSharpFile
+from agent.core.parsers.sql_parser import ParsedProcedure, SqlParser
+
+_worker_parser: Optional[CSharpParser] = None
+_worker_sql_parser: Optional[SqlParser] = None
+
+def _parse_chunk(chunk: List[Tuple[str, str]]) -> List[ParsedCSharpFile]:
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = CSharpParser()
+    results = []
+    for path, content in chunk:
+        parsed = _worker_parser.parse_code(content, path)
+        parsed.code = ''
+        results.append(parsed)
+    return results
+
+def _parse_procedure_chunk(chunk: List[Tuple[str, str, str]]) -> List[ParsedProcedure]:
+    global _worker_sql_parser
+    if _worker_sql_parser is None:
+        _worker_sql_parser = SqlParser()
+    results = []
+    for schema_name, proc_name, definition in chunk:
+        parsed = _worker_sql_parser.parse_procedure(definition, schema_name, proc_name)
+        parsed.definition = ''
+        results.append(parsed)
+    return results
+
+class ParseStage:
+    def __init__(self, workers: int = 0, chunk_size: int = 64, max_pending_chunks: int = 0):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(chunk_size, 1)
+        self.max_pending_chunks = max_pending_chunks or self.workers * 2
+    
+    def _chunks(self, items: Iterable[Tuple]) -> Iterator[List[Tuple]]:
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    
+    def iter_parsed(self, code_files: Iterable[Dict]) -> Iterator[ParsedCSharpFile]:
+        files = ((f['path'], f['content']) for f in code_files)
+        for results, chunk in self._map_chunks(_parse_chunk, files):
+            yield from self._restore(results, chunk)
+    
+    def iter_parsed_procedures(self, procedures: Iterable[Tuple[str, str, str]]) -> Iterator[ParsedProcedure]:
+        for results, chunk in self._map_chunks(_parse_procedure_chunk, procedures):
+            for parsed, (_, _, definition) in zip(results, chunk):
+                parsed.definition = definition
+                yield parsed
+    
+    def _map_chunks(self, func: Callable[[List[Tuple]], List], items: Iterable[Tuple]) -> Iterator[Tuple[List, List[Tuple]]]:
+        if self.workers == 1:
+            for chunk in self._chunks(items):
+                yield func(chunk), chunk
+            return
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            pending = {}
+            chunks = self._chunks(items)
+            exhausted = False
+            while pending or not exhausted:
+                while not exhausted and len(pending) < self.max_pending_chunks:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        exhausted = True
+                        break
+                    pending[pool.submit(func, chunk)] = chunk
+                if not pending:
+                    break
+                metrics.set('queue_depth', len(pending), queue='parse_chunks')
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = pending.pop(future)
+                    yield future.result(), chunk
+    
+    def _restore(self, results: List[ParsedCSharpFile], chunk: List[Tuple[str, str]]) -> List[ParsedCSharpFile]:
+        for parsed, (_, content) in zip(results, chunk):
+            parsed.code = content
+        return results
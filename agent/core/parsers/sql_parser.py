@@ -1,8 +1,332 @@
-from typing import List, Dict
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from agent.core.parsers.csharp_parser import TOKEN_PATTERN as CSHARP_TOKEN_PATTERN
+
+TOKEN_PATTERN = re.compile(r'''\s*(?:
+    (?P<comment>--[^\n]*|/\*.*?\*/)
+  | (?P<string>N?'(?:[^']|'')*')
+  | (?P<name>\[(?:[^\]]|\]\])*\]|"(?:[^"]|"")*")
+  | (?P<variable>@@?[A-Za-z_][\w@$#]*)
+  | (?P<temp>\#\#?[A-Za-z_][\w@$#]*)
+  | (?P<word>[A-Za-z_][\w@$#]*)
+  | (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|0x[0-9A-Fa-f]*)
+  | (?P<op>\S)
+)''', re.VERBOSE | re.DOTALL)
+
+BATCH_SEPARATOR = re.compile(r'^\s*GO\s*(?:--[^\n]*)?$', re.IGNORECASE | re.MULTILINE)
+EMBEDDED_EXEC = re.compile(r'\bEXEC(?:UTE)?\s+(?:@\w+\s*=\s*)?((?:\[?\w+\]?\.){0,2}\[?\w+\]?)', re.IGNORECASE)
+QUALIFIED_NAME = re.compile(r'^\s*((?:\[?\w+\]?\.){0,2}\[?\w+\]?)\s*$')
+
+PARAMETER_OPTIONS = frozenset({'OUT', 'OUTPUT', 'READONLY', 'VARYING', 'NULL', 'NOT'})
+HEADER_TERMINATORS = frozenset({'AS', 'WITH', 'FOR'})
+READ_KEYWORDS = frozenset({'FROM', 'JOIN', 'USING', 'APPLY'})
+WRITE_KEYWORDS = frozenset({'INSERT', 'INTO', 'UPDATE', 'MERGE', 'DELETE', 'TRUNCATE'})
+RESERVED = frozenset({
+    'ADD', 'ALL', 'ALTER', 'AND', 'ANY', 'APPLY', 'AS', 'ASC', 'BEGIN', 'BETWEEN', 'BREAK', 'BY', 'CASE',
+    'CATCH', 'CLOSE', 'COMMIT', 'CONTINUE', 'CREATE', 'CROSS', 'CURSOR', 'DEALLOCATE', 'DECLARE', 'DEFAULT',
+    'DELETE', 'DESC', 'DISTINCT', 'DROP', 'ELSE', 'END', 'EXCEPT', 'EXEC', 'EXECUTE', 'EXISTS', 'FETCH', 'FOR',
+    'FROM', 'FULL', 'GO', 'GOTO', 'GROUP', 'HAVING', 'IF', 'IN', 'INNER', 'INSERT', 'INTERSECT', 'INTO', 'IS',
+    'JOIN', 'LEFT', 'LIKE', 'MATCHED', 'MERGE', 'NOT', 'NULL', 'OF', 'ON', 'OPEN', 'OPTION', 'OR', 'ORDER',
+    'OUTER', 'OUTPUT', 'OVER', 'PIVOT', 'PRINT', 'PROC', 'PROCEDURE', 'RAISERROR', 'RETURN', 'RIGHT',
+    'ROLLBACK', 'SELECT', 'SET', 'TABLE', 'TABLESAMPLE', 'THEN', 'THROW', 'TOP', 'TRAN', 'TRANSACTION',
+    'TRUNCATE', 'TRY', 'UNION', 'UNPIVOT', 'UPDATE', 'USING', 'VALUES', 'WAITFOR', 'WHEN', 'WHERE', 'WHILE',
+    'WITH'
+})
+
+Token = Tuple[str, str]
+
+def tokenize(sql: str) -> List[Token]:
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(sql):
+        kind = match.lastgroup
+        if kind is None or kind == 'comment':
+            continue
+        value = match.group(kind)
+        if kind == 'name':
+            closing = value[-1]
+            value = value[1:-1].replace(closing * 2, closing)
+        tokens.append((kind, value))
+    return tokens
+
+def split_batches(script: str) -> List[str]:
+    return [batch for batch in BATCH_SEPARATOR.split(script) if batch.strip()]
+
+def unquote_name(name: str) -> Tuple[Optional[str], str]:
+    parts = [p.strip('[]"') for p in name.split('.')]
+    return (parts[-2] if len(parts) > 1 else None), parts[-1]
+
+def embedded_procedure_names(code: str) -> Set[Tuple[Optional[str], str]]:
+    names = set()
+    for match in CSHARP_TOKEN_PATTERN.finditer(code):
+        if match.lastgroup != 'string':
+            continue
+        literal = match.group('string').lstrip('$@').strip('"')
+        names.update(unquote_name(m.group(1)) for m in EMBEDDED_EXEC.finditer(literal))
+        bare = QUALIFIED_NAME.match(literal)
+        if bare:
+            names.add(unquote_name(bare.group(1)))
+    return names
+
+@dataclass
+class ParsedProcedure:
+    schema_name: Optional[str]
+    proc_name: str
+    definition: str = ''
+    parameters: List[Dict] = field(default_factory=list)
+    reads: List[Tuple[Optional[str], str]] = field(default_factory=list)
+    writes: List[Tuple[Optional[str], str]] = field(default_factory=list)
+    calls: List[Tuple[Optional[str], str]] = field(default_factory=list)
+    
+    @property
+    def tables(self) -> List[Dict]:
+        seen = {}
+        for schema, name in self.reads + self.writes:
+            seen.setdefault((schema, name.lower()), {'schema_name': schema, 'table_name': name})
+        return list(seen.values())
+
+class NameResolver:
+    def __init__(self, names: Iterable[Tuple[str, str]], default_schema: str = 'dbo'):
+        self.default_schema = default_schema.lower()
+        self.by_qualified: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        self.by_name: Dict[str, List[Tuple[str, str]]] = {}
+        for schema, name in names:
+            self.by_qualified[(schema.lower(), name.lower())] = (schema, name)
+            self.by_name.setdefault(name.lower(), []).append((schema, name))
+    
+    def resolve(self, schema: Optional[str], name: str) -> Optional[Tuple[str, str]]:
+        if schema:
+            return self.by_qualified.get((schema.lower(), name.lower()))
+        candidates = self.by_name.get(name.lower(), [])
+        return self.by_qualified.get((self.default_schema, name.lower())) or (candidates[0] if len(candidates) == 1 else None)
+
+class _ProcedureReader:
+    def __init__(self, tokens: List[Token]):
+        self.tokens = tokens
+        self.pos = 0
+    
+    def peek(self, offset: int = 0) -> Token:
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else ('eof', '')
+    
+    def keyword(self, offset: int = 0) -> str:
+        kind, value = self.peek(offset)
+        return value.upper() if kind == 'word' else ''
+    
+    def is_identifier(self, offset: int = 0) -> bool:
+        kind, value = self.peek(offset)
+        return kind == 'name' or (kind == 'word' and value.upper() not in RESERVED)
+    
+    def read_object_name(self) -> Optional[Tuple[Optional[str], str]]:
+        if not self.is_identifier():
+            return None
+        parts = [self.peek()[1]]
+        self.pos += 1
+        while self.peek() == ('op', '.'):
+            if self.peek(1) == ('op', '.'):
+                self.pos += 1
+                continue
+            kind, value = self.peek(1)
+            if kind not in ('word', 'name'):
+                break
+            parts.append(value)
+            self.pos += 2
+        return (parts[-2] if len(parts) > 1 else None), parts[-1]
+    
+    def read_alias(self) -> Optional[str]:
+        if self.keyword() == 'AS' and self.is_identifier(1):
+            self.pos += 2
+            return self.peek(-1)[1]
+        if self.is_identifier() and self.peek(1) != ('op', '('):
+            self.pos += 1
+            return self.peek(-1)[1]
+        return None
 
 class SqlParser:
     def parse_schema(self, schema_content: str) -> Dict:
-        return {
-            'tables': [],
-            'procedures': []
-        }
+        tables, procedures = [], []
+        for batch in split_batches(schema_content):
+            tokens = tokenize(batch)
+            keywords = [value.upper() for kind, value in tokens[:4] if kind == 'word']
+            if keywords[:1] != ['CREATE'] and keywords[:1] != ['ALTER']:
+                continue
+            if 'PROC' in keywords or 'PROCEDURE' in keywords:
+                parsed = self.parse_tokens(tokens, batch)
+                if parsed:
+                    procedures.append(parsed)
+            elif keywords[1:2] == ['TABLE']:
+                table = self._parse_create_table(tokens)
+                if table:
+                    tables.append(table)
+        return {'tables': tables, 'procedures': procedures}
+    
+    def parse_procedure(self, definition: str, schema_name: Optional[str] = None,
+                        proc_name: Optional[str] = None) -> ParsedProcedure:
+        parsed = self.parse_tokens(tokenize(definition or ''), definition or '')
+        if parsed is None:
+            parsed = ParsedProcedure(schema_name, proc_name or '', definition or '')
+        if schema_name:
+            parsed.schema_name = schema_name
+        if proc_name:
+            parsed.proc_name = proc_name
+        return parsed
+    
+    def parse_batch(self, sql: str) -> ParsedProcedure:
+        parsed = ParsedProcedure(None, '', sql)
+        self._read_body(_ProcedureReader(tokenize(sql)), parsed)
+        return parsed
+    
+    def parse_tokens(self, tokens: List[Token], definition: str = '') -> Optional[ParsedProcedure]:
+        reader = _ProcedureReader(tokens)
+        while reader.peek()[0] != 'eof' and reader.keyword() not in ('PROC', 'PROCEDURE'):
+            reader.pos += 1
+        if reader.peek()[0] == 'eof':
+            return None
+        reader.pos += 1
+        name = reader.read_object_name()
+        if name is None:
+            return None
+        if reader.peek() == ('op', ';'):
+            reader.pos += 2
+        parsed = ParsedProcedure(name[0], name[1], definition)
+        parsed.parameters = self._read_parameters(reader)
+        while reader.peek()[0] != 'eof' and reader.keyword() != 'AS':
+            reader.pos += 1
+        self._read_body(reader, parsed)
+        return parsed
+    
+    def _read_parameters(self, reader: _ProcedureReader) -> List[Dict]:
+        parameters = []
+        if reader.peek() == ('op', '('):
+            reader.pos += 1
+        while reader.peek()[0] == 'variable':
+            parameter = {'name': reader.peek()[1], 'type': '', 'default': None, 'output': False, 'readonly': False}
+            reader.pos += 1
+            if reader.keyword() == 'AS':
+                reader.pos += 1
+            type_parts, depth = [], 0
+            while reader.peek()[0] != 'eof':
+                kind, value = reader.peek()
+                if depth == 0 and (value in (',', '=', ')') or reader.keyword() in PARAMETER_OPTIONS
+                                   or reader.keyword() in HEADER_TERMINATORS):
+                    break
+                depth += (value == '(') - (value == ')') if kind == 'op' else 0
+                type_parts.append(value)
+                reader.pos += 1
+            parameter['type'] = ''.join(type_parts)
+            if reader.peek() == ('op', '='):
+                reader.pos += 1
+                sign = ''
+                if reader.peek() in (('op', '-'), ('op', '+')):
+                    sign = reader.peek()[1]
+                    reader.pos += 1
+                parameter['default'] = sign + reader.peek()[1]
+                reader.pos += 1
+            while reader.keyword() in PARAMETER_OPTIONS:
+                option = reader.keyword()
+                parameter['output'] |= option in ('OUT', 'OUTPUT')
+                parameter['readonly'] |= option == 'READONLY'
+                reader.pos += 1
+            parameters.append(parameter)
+            if reader.peek() != ('op', ','):
+                break
+            reader.pos += 1
+        return parameters
+    
+    def _read_body(self, reader: _ProcedureReader, parsed: ParsedProcedure):
+        ctes, cursors, aliases = set(), set(), {}
+        reads, writes, calls = [], [], []
+        previous = ''
+        while reader.peek()[0] != 'eof':
+            keyword = '' if reader.is_identifier() else reader.keyword()
+            if not keyword:
+                if (reader.is_identifier() and reader.keyword(1) == 'AS' and reader.peek(2) == ('op', '(')
+                        and previous in ('WITH', ',')):
+                    ctes.add(reader.peek()[1].lower())
+                previous = reader.peek()[1] if reader.peek()[0] == 'op' else ''
+                reader.pos += 1
+                continue
+            reader.pos += 1
+            if keyword == 'DECLARE' and reader.is_identifier() and reader.keyword(1) == 'CURSOR':
+                cursors.add(reader.peek()[1].lower())
+            elif keyword in ('EXEC', 'EXECUTE'):
+                if reader.peek()[0] == 'variable' and reader.peek(1) == ('op', '='):
+                    reader.pos += 2
+                name = reader.read_object_name()
+                if name:
+                    calls.append(name)
+            elif keyword in READ_KEYWORDS or keyword in WRITE_KEYWORDS:
+                target = writes if keyword in WRITE_KEYWORDS or (keyword == 'FROM' and previous == 'DELETE') else reads
+                if keyword == 'TRUNCATE' and reader.keyword() == 'TABLE':
+                    reader.pos += 1
+                self._read_table_list(reader, target, aliases, allow_list=keyword == 'FROM',
+                                      column_list=keyword in WRITE_KEYWORDS)
+            previous = keyword
+        excluded = ctes | cursors
+        
+        def resolve(names):
+            resolved = {}
+            for schema, name in names:
+                if schema is None and name.lower() in aliases:
+                    schema, name = aliases[name.lower()]
+                if schema is None and name.lower() in excluded:
+                    continue
+                resolved.setdefault((schema, name.lower()), (schema, name))
+            return list(resolved.values())
+        
+        parsed.reads, parsed.writes = resolve(reads), resolve(writes)
+        parsed.calls = list(dict.fromkeys(calls))
+    
+    def _read_table_list(self, reader: _ProcedureReader, target: List, aliases: Dict,
+                         allow_list: bool, column_list: bool):
+        while True:
+            name = reader.read_object_name()
+            if name is None:
+                return
+            if reader.peek() == ('op', '(') and not column_list:
+                return
+            target.append(name)
+            alias = reader.read_alias()
+            if alias and alias.lower() != name[1].lower():
+                aliases[alias.lower()] = name
+            if not allow_list or reader.peek() != ('op', ','):
+                return
+            reader.pos += 1
+    
+    def _parse_create_table(self, tokens: List[Token]) -> Optional[Dict]:
+        reader = _ProcedureReader(tokens)
+        reader.pos = 2
+        name = reader.read_object_name()
+        if name is None or reader.peek() != ('op', '('):
+            return None
+        reader.pos += 1
+        columns, depth, current = [], 1, []
+        while reader.peek()[0] != 'eof' and depth:
+            kind, value = reader.peek()
+            reader.pos += 1
+            if kind == 'op' and value == '(':
+                depth += 1
+            elif kind == 'op' and value == ')':
+                depth -= 1
+            if depth == 0 or (depth == 1 and value == ',' and kind == 'op'):
+                column = self._column_definition(current)
+                if column:
+                    columns.append(column)
+                current = []
+            else:
+                current.append((kind, value))
+        return {'schema': name[0] or 'dbo', 'name': name[1], 'columns': columns}
+    
+    def _column_definition(self, tokens: List[Token]) -> Optional[Dict]:
+        if len(tokens) < 2 or (tokens[0][0] == 'word' and tokens[0][1].upper() in
+                               ('CONSTRAINT', 'PRIMARY', 'UNIQUE', 'FOREIGN', 'CHECK', 'INDEX')):
+            return None
+        type_parts = [tokens[1][1]]
+        max_length = None
+        if len(tokens) > 3 and tokens[2] == ('op', '('):
+            size = tokens[3][1]
+            max_length = -1 if size.upper() == 'MAX' else int(size) if size.isdigit() else None
+        keywords = [value.upper() for kind, value in tokens if kind == 'word']
+        nullable = not any(a == 'NOT' and b == 'NULL' for a, b in zip(keywords, keywords[1:]))
+        return {'name': tokens[0][1], 'type': ''.join(type_parts), 'nullable': nullable, 'max_length': max_length}
@@ -0,0 +1,79 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from agent.core.parsers.csharp_parser import ParsedCSharpFile, BUILTIN_TYPES
+
+IMPLEMENTATION_STRENGTH = 0.8
+
+class SymbolIndex:
+    def __init__(self):
+        self.by_full_name: Dict[str, List[str]] = defaultdict(list)
+        self.by_short_name: Dict[str, Set[str]] = defaultdict(set)
+        self.kinds: Dict[str, str] = {}
+        self.implementations: Dict[str, Set[str]] = defaultdict(set)
+    
+    def add_symbol(self, full_name: str, component_id: str, kind: str = 'class'):
+        ids = self.by_full_name[full_name]
+        if component_id not in ids:
+            ids.append(component_id)
+        self.by_short_name[full_name.rsplit('.', 1)[-1]].add(full_name)
+        self.kinds.setdefault(full_name, kind)
+    
+    def add_component(self, component_id: str, parsed: ParsedCSharpFile):
+        for cls in parsed.classes:
+            self.add_symbol(cls.full_name, component_id, cls.kind)
+    
+    def resolve_type(self, type_name: str, namespace: str = '', usings: Iterable[str] = ()) -> Optional[str]:
+        name = type_name.split('<', 1)[0].rstrip('?[]').lstrip('@').replace('global::', '')
+        if not name or name in BUILTIN_TYPES:
+            return None
+        if name in self.by_full_name:
+            return name
+        scopes = []
+        parts = namespace.split('.') if namespace else []
+        while parts:
+            scopes.append('.'.join(parts))
+            parts.pop()
+        scopes.extend(usings)
+        for scope in scopes:
+            candidate = f"{scope}.{name}"
+            if candidate in self.by_full_name:
+                return candidate
+        short = name.rsplit('.', 1)[-1]
+        candidates = self.by_short_name.get(short, ())
+        if len(candidates) == 1:
+            return next(iter(candidates))
+        return None
+    
+    def component_ids(self, full_name: Optional[str]) -> List[str]:
+        return self.by_full_name.get(full_name, []) if full_name else []
+    
+    def register_implementations(self, parsed: ParsedCSharpFile):
+        for cls in parsed.classes:
+            for base in cls.base_types:
+                target = self.resolve_type(base, cls.namespace, parsed.usings)
+                if target and self.kinds.get(target) == 'interface':
+                    self.implementations[target].add(cls.full_name)
+    
+    def dependency_edges(self, component_id: str, parsed: ParsedCSharpFile) -> List[Dict]:
+        edges: Dict[Tuple[str, str], Dict] = {}
+        
+        def add(target_name: Optional[str], dependency_type: str, strength: float = 1.0):
+            for to_id in self.component_ids(target_name):
+                if to_id != component_id and (to_id, dependency_type) not in edges:
+                    edges[(to_id, dependency_type)] = {'from_id': component_id, 'to_id': to_id,
+                                                       'dependency_type': dependency_type, 'strength': strength}
+        
+        for cls in parsed.classes:
+            resolve = lambda t: self.resolve_type(t, cls.namespace, parsed.usings)
+            for base in cls.base_types:
+                target = resolve(base)
+                add(target, 'IMPLEMENTS' if self.kinds.get(target) == 'interface' else 'INHERITS')
+            for param in cls.constructor_parameters:
+                target = resolve(param.type)
+                add(target, 'INJECTS')
+                for implementation in sorted(self.implementations.get(target, ())):
+                    add(implementation, 'INJECTS', IMPLEMENTATION_STRENGTH)
+            for created in cls.object_creations:
+                add(resolve(created), 'USES')
+        return list(edges.values())
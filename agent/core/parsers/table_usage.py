@@ -0,0 +1,167 @@
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from agent.core.parsers.clone_detector import plural, singular
+from agent.core.parsers.csharp_parser import TOKEN_PATTERN, ParsedCSharpFile, simple_type_name
+from agent.core.parsers.sql_parser import NameResolver, SqlParser, embedded_procedure_names
+
+SQL_LITERAL = re.compile(r'\b(?:SELECT|INSERT|UPDATE|DELETE|MERGE|EXEC(?:UTE)?)\b', re.IGNORECASE)
+DB_SET_TYPE = re.compile(r'^(?:[\w.]+\.)?I?DbSet\s*<\s*([\w.]+)\s*>$')
+TABLE_ATTRIBUTE = re.compile(r'^\s*(?:name\s*:\s*)?"([^"]+)"(?:.*?\bSchema\s*=\s*"([^"]+)")?', re.DOTALL)
+TO_TABLE = re.compile(
+    r'Entity\s*<\s*([\w.]+)\s*>\s*\(\s*(?:\w+\s*=>\s*\{?\s*\w+\s*)?\)?\s*\.\s*ToTable\s*\(\s*"([^"]+)"'
+    r'(?:\s*,\s*(?:schema\s*:\s*)?"([^"]+)")?'
+)
+ENTITY_CONFIGURATION = re.compile(r'IEntityTypeConfiguration\s*<\s*([\w.]+)\s*>')
+CONFIGURED_TABLE = re.compile(r'\.\s*ToTable\s*\(\s*"([^"]+)"(?:\s*,\s*(?:schema\s*:\s*)?"([^"]+)")?')
+
+SOURCE_SQL = 'sql'
+SOURCE_PROCEDURE = 'procedure'
+SOURCE_DB_SET = 'dbset'
+SOURCE_ENTITY = 'entity'
+SOURCE_DEPENDENCY = 'dependency'
+SOURCE_RANK = {SOURCE_SQL: 0, SOURCE_PROCEDURE: 1, SOURCE_DB_SET: 2, SOURCE_ENTITY: 3, SOURCE_DEPENDENCY: 4}
+
+TableKey = Tuple[str, str]
+
+class _ComponentReferences:
+    __slots__ = ('identifiers', 'tables', 'procedures')
+    
+    def __init__(self):
+        self.identifiers: Set[str] = set()
+        self.tables: Dict[TableKey, str] = {}
+        self.procedures: Set[TableKey] = set()
+
+class TableUsageIndex:
+    def __init__(self, tables: Iterable[TableKey], procedure_tables: Optional[Dict[TableKey, List[Dict]]] = None,
+                 default_schema: str = 'dbo'):
+        self.tables = NameResolver(tables, default_schema)
+        self.procedures = NameResolver((procedure_tables or {}).keys(), default_schema)
+        self.procedure_tables: Dict[TableKey, List[TableKey]] = {}
+        for key, referenced in (procedure_tables or {}).items():
+            resolved = (self.tables.resolve(t['schema_name'], t['table_name']) for t in referenced)
+            self.procedure_tables[key] = list(dict.fromkeys(t for t in resolved if t))
+        self.sql_parser = SqlParser()
+        self.references: Dict[str, _ComponentReferences] = {}
+        self.entity_tables: Dict[str, Optional[TableKey]] = {}
+        self.db_sets: Dict[str, str] = {}
+        self.declared: Dict[str, Set[str]] = defaultdict(set)
+        self.db_set_owners: Set[str] = set()
+    
+    def resolve_table(self, schema: Optional[str], name: str) -> Optional[TableKey]:
+        for candidate in dict.fromkeys((name, plural(name), singular(name))):
+            table = self.tables.resolve(schema, candidate)
+            if table:
+                return table
+        return None
+    
+    def add(self, component_id: str, parsed: ParsedCSharpFile):
+        refs = _ComponentReferences()
+        for match in TOKEN_PATTERN.finditer(parsed.code):
+            kind = match.lastgroup
+            if kind == 'ident':
+                refs.identifiers.add(match.group(kind).lstrip('@'))
+            elif kind == 'string':
+                self._add_literal(refs, match.group(kind).lstrip('$@').strip('"'))
+        for cls in parsed.classes:
+            self.declared[component_id].add(cls.name)
+            attribute = next((a for a in cls.attributes if a.name == 'Table'), None)
+            mapped = TABLE_ATTRIBUTE.match(attribute.arguments) if attribute else None
+            if mapped:
+                self._map_entity(cls.name, self.resolve_table(mapped.group(2), mapped.group(1)))
+            for prop in cls.properties:
+                db_set = DB_SET_TYPE.match(prop.type.replace(' ', ''))
+                if db_set:
+                    entity = simple_type_name(db_set.group(1))
+                    self.db_sets[prop.name] = entity
+                    self.db_set_owners.add(component_id)
+                    self._map_entity(entity, self.resolve_table(None, prop.name))
+        for entity, table, schema in TO_TABLE.findall(parsed.code):
+            self._map_entity(simple_type_name(entity), self.resolve_table(schema or None, table), explicit=True)
+        configured = ENTITY_CONFIGURATION.search(parsed.code)
+        table = CONFIGURED_TABLE.search(parsed.code) if configured else None
+        if table:
+            self._map_entity(simple_type_name(configured.group(1)),
+                             self.resolve_table(table.group(2), table.group(1)), explicit=True)
+        self.references[component_id] = refs
+    
+    def _map_entity(self, entity: str, table: Optional[TableKey], explicit: bool = False):
+        if table and (explicit or not self.entity_tables.get(entity)):
+            self.entity_tables[entity] = table
+        else:
+            self.entity_tables.setdefault(entity, None)
+    
+    def _add_literal(self, refs: _ComponentReferences, literal: str):
+        procedures = set(embedded_procedure_names(f'"{literal}"'))
+        if SQL_LITERAL.search(literal):
+            parsed = self.sql_parser.parse_batch(literal)
+            for schema, name in parsed.reads + parsed.writes:
+                table = self.tables.resolve(schema, name)
+                if table:
+                    refs.tables.setdefault(table, SOURCE_SQL)
+            procedures.update(parsed.calls)
+        for schema, name in procedures:
+            procedure = self.procedures.resolve(schema, name)
+            if procedure:
+                refs.procedures.add(procedure)
+    
+    def procedure_calls(self, component_id: str) -> Set[TableKey]:
+        refs = self.references.get(component_id)
+        return refs.procedures if refs else set()
+    
+    def direct_usage(self, component_id: str) -> Dict[TableKey, str]:
+        refs = self.references[component_id]
+        usage = dict(refs.tables)
+        for procedure in refs.procedures:
+            for table in self.procedure_tables.get(procedure, []):
+                usage.setdefault(table, SOURCE_PROCEDURE)
+        for name in refs.identifiers & self.db_sets.keys():
+            table = self.entity_tables.get(self.db_sets[name])
+            if table:
+                usage.setdefault(table, SOURCE_DB_SET)
+        for name in (refs.identifiers | self.declared[component_id]) & self.entity_tables.keys():
+            table = self.entity_tables[name]
+            if table:
+                usage.setdefault(table, SOURCE_ENTITY)
+        return usage
+    
+    def _resolve_entities(self):
+        for entity, table in list(self.entity_tables.items()):
+            if table is None:
+                self.entity_tables[entity] = self.resolve_table(None, entity)
+        for names in self.declared.values():
+            for name in names - self.entity_tables.keys():
+                table = self.resolve_table(None, name)
+                if table:
+                    self.entity_tables[name] = table
+    
+    def build(self, dependencies: Dict[str, List[str]], max_depth: int = 2) -> List[Dict]:
+        self._resolve_entities()
+        direct = {component_id: self.direct_usage(component_id) for component_id in self.references}
+        rows = []
+        for component_id, usage in direct.items():
+            seen = dict.fromkeys(usage, (0, None))
+            sources = dict(usage)
+            frontier, visited = [component_id], {component_id}
+            for depth in range(1, max_depth + 1):
+                next_frontier = []
+                for node in frontier:
+                    for dependency in dependencies.get(node, []):
+                        if dependency in visited:
+                            continue
+                        visited.add(dependency)
+                        next_frontier.append(dependency)
+                        hub = dependency in self.db_set_owners
+                        for table, source in direct.get(dependency, {}).items():
+                            if hub and source in (SOURCE_DB_SET, SOURCE_ENTITY):
+                                continue
+                            if table not in seen:
+                                seen[table] = (depth, dependency)
+                                sources[table] = SOURCE_DEPENDENCY
+                frontier = next_frontier
+            for (schema, name), (depth, via) in seen.items():
+                rows.append({'component_id': component_id, 'schema_name': schema, 'table_name': name,
+                             'source': sources[(schema, name)], 'depth': depth, 'via_component_id': via})
+        rows.sort(key=lambda r: (r['component_id'], r['depth'], SOURCE_RANK[r['source']], r['table_name']))
+        return rows
@@ -0,0 +1,184 @@
+import cProfile
+import functools
+import inspect
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional
+
+MODE_TRACE = 'trace'
+MODE_CPROFILE = 'cprofile'
+MODE_SAMPLE = 'sample'
+MODES = (MODE_TRACE, MODE_CPROFILE, MODE_SAMPLE)
+
+_NULL_SPAN = nullcontext()
+
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self.events: List[Dict] = []
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+    
+    def start(self):
+        self.enabled = True
+        self._origin = time.perf_counter()
+        self.events = [{'name': 'process_name', 'ph': 'M', 'pid': self._pid, 'tid': 0, 'args': {'name': 'migration-agent'}}]
+    
+    def span(self, name: str, category: str = 'app', **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name, category, args)
+    
+    @contextmanager
+    def _span(self, name: str, category: str, args: Dict):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            event = {'name': name, 'cat': category, 'ph': 'X', 'pid': self._pid, 'tid': threading.get_ident(),
+                     'ts': round((started - self._origin) * 1e6, 1),
+                     'dur': round((time.perf_counter() - started) * 1e6, 1)}
+            if args:
+                event['args'] = args
+            self.events.append(event)
+    
+    def export(self, path: str) -> str:
+        threads = {t.ident: t.name for t in threading.enumerate()}
+        names = [{'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': tid, 'args': {'name': threads.get(tid, str(tid))}}
+                 for tid in {e['tid'] for e in self.events if e['ph'] == 'X'}]
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': self.events + names, 'displayTimeUnit': 'ms'}, f)
+        return path
+
+def traced(func, name: str, category: str):
+    if inspect.isgeneratorfunction(func):
+        @functools.wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            with tracer.span(name, category):
+                yield from func(*args, **kwargs)
+        return generator_wrapper
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with tracer.span(name, category):
+            return func(*args, **kwargs)
+    return wrapper
+
+def instrument(obj, category: str, methods: Optional[List[str]] = None):
+    if not tracer.enabled or obj is None:
+        return obj
+    label = type(obj).__name__
+    for attr in methods or [a for a in dir(type(obj)) if not a.startswith('_')]:
+        if inspect.isfunction(inspect.getattr_static(obj, attr, None)):
+            setattr(obj, attr, traced(getattr(obj, attr), f"{label}.{attr}", category))
+    return obj
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._target: Optional[int] = None
+    
+    def start(self):
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+    
+    def collapsed(self) -> str:
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+class Profiler:
+    def __init__(self):
+        self.mode: Optional[str] = None
+        self.directory = 'logs/profile'
+        self.top = 25
+        self._active_stage: Optional[str] = None
+    
+    @property
+    def enabled(self) -> bool:
+        return self.mode is not None
+    
+    def configure(self, mode: Optional[str], directory: str = 'logs/profile', top: int = 25):
+        self.mode, self.directory, self.top = mode, directory, top
+        if mode is not None:
+            tracer.start()
+    
+    @contextmanager
+    def stage(self, name: str):
+        with tracer.span(name, 'stage'):
+            if self.mode in (MODE_CPROFILE, MODE_SAMPLE) and self._active_stage is None:
+                self._active_stage = name
+                try:
+                    with self._profile(name):
+                        yield
+                finally:
+                    self._active_stage = None
+            else:
+                yield
+    
+    @contextmanager
+    def _profile(self, name: str):
+        os.makedirs(self.directory, exist_ok=True)
+        if self.mode == MODE_CPROFILE:
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+                path = os.path.join(self.directory, f"{name}.prof")
+                profile.dump_stats(path)
+                out = io.StringIO()
+                pstats.Stats(profile, stream=out).sort_stats('cumulative').print_stats(self.top)
+                print(f"  Profile for {name} written to {path}")
+                lines = [line for line in out.getvalue().splitlines() if line.strip()]
+                print('\n'.join(f"    {line}" for line in lines[-self.top - 1:]))
+        else:
+            sampler = SamplingProfiler()
+            sampler.start()
+            try:
+                yield
+            finally:
+                sampler.stop()
+                path = os.path.join(self.directory, f"{name}.folded")
+                with open(path, 'w') as f:
+                    f.write(sampler.collapsed())
+                print(f"  {sum(sampler.stacks.values())} samples for {name} written to {path} (flamegraph.pl / speedscope)")
+    
+    def finish(self) -> Optional[str]:
+        if not self.enabled:
+            return None
+        path = tracer.export(os.path.join(self.directory, f"trace-{time.strftime('%Y%m%d-%H%M%S')}.json"))
+        print(f"Trace with {len(tracer.events)} events written to {path} (open in chrome://tracing or Perfetto)")
+        return path
+
+tracer = Tracer()
+profiler = Profiler()
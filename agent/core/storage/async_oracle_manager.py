@@ -0,0 +1,87 @@
+import oracledb
+from typing import List, Dict
+from contextlib import asynccontextmanager
+
+from agent.core.storage.oracle_manager import fetch_lobs_inline, pool_params
+
+class AsyncOracleManager:
+    def __init__(self, config):
+        self.config = config
+        self.pool = self._create_pool()
+        from agent.core.storage.vector_store import AsyncOracleVectorStore
+        from agent.core.storage.graph_store import AsyncOracleGraphStore
+        from agent.core.storage.schema_store import AsyncOracleSchemaStore
+        self.vector_store = AsyncOracleVectorStore(self)
+        self.graph_store = AsyncOracleGraphStore(self)
+        self.schema_store = AsyncOracleSchemaStore(self)
+    
+    def _create_pool(self):
+        return oracledb.create_pool_async(**pool_params(self.config))
+    
+    @asynccontextmanager
+    async def get_connection(self):
+        conn = await self.pool.acquire()
+        try:
+            yield conn
+        finally:
+            await self.pool.release(conn)
+    
+    async def execute_query(self, query: str, params: Dict = None) -> List[tuple]:
+        async with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.outputtypehandler = fetch_lobs_inline
+            try:
+                await cursor.execute(query, params or {})
+                return await cursor.fetchall()
+            finally:
+                cursor.close()
+    
+    async def iter_query(self, query: str, params: Dict = None, batch_size: int = 500):
+        async with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.arraysize = batch_size
+            cursor.outputtypehandler = fetch_lobs_inline
+            try:
+                await cursor.execute(query, params or {})
+                while True:
+                    rows = await cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield row
+            finally:
+                cursor.close()
+    
+    async def execute_update(self, query: str, params: Dict = None, input_sizes: Dict = None) -> int:
+        async with self.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                if input_sizes:
+                    cursor.setinputsizes(**input_sizes)
+                await cursor.execute(query, params or {})
+                rowcount = cursor.rowcount
+                await conn.commit()
+                return rowcount
+            finally:
+                cursor.close()
+    
+    async def execute_many(self, query: str, params_list: List[Dict], input_sizes: Dict = None) -> int:
+        async with self.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                if input_sizes:
+                    cursor.setinputsizes(**input_sizes)
+                await cursor.executemany(query, params_list)
+                rowcount = cursor.rowcount
+                await conn.commit()
+                return rowcount
+            finally:
+                cursor.close()
+    
+    async def get_ingestion_generation(self) -> int:
+        results = await self.execute_query("SELECT generation FROM ingestion_state WHERE state_key = 'default'")
+        return int(results[0][0]) if results else 0
+    
+    async def close(self):
+        if self.pool:
+            await self.pool.close()
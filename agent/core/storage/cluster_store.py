@@ -0,0 +1,39 @@
+from typing import Dict, List
+
+from agent.core.storage.json_codec import decode_json, json_binds
+
+DELETE_CLUSTERS = "DELETE FROM component_clusters"
+
+INSERT_CLUSTER_MEMBER = """
+INSERT INTO component_clusters (
+    component_id, cluster_id, representative_id, similarity, embedding_similarity, substitutions
+) VALUES (
+    :component_id, :cluster_id, :representative_id, :similarity, :embedding_similarity, :substitutions
+)
+"""
+
+SELECT_CLUSTERS = """
+SELECT component_id, cluster_id, representative_id, similarity, embedding_similarity, substitutions
+FROM component_clusters
+"""
+
+SUBSTITUTION_BINDS = json_binds('substitutions')
+
+def cluster_rows(results: List[tuple]) -> Dict[str, Dict]:
+    return {r[0]: {'component_id': r[0], 'cluster_id': r[1], 'representative_id': r[2],
+                   'similarity': float(r[3]), 'embedding_similarity': float(r[4]) if r[4] is not None else None,
+                   'substitutions': decode_json(r[5], [])} for r in results}
+
+class OracleClusterStore:
+    def __init__(self, oracle_manager):
+        self.db = oracle_manager
+    
+    def replace_clusters(self, members: List[Dict]) -> int:
+        self.db.execute_update(DELETE_CLUSTERS)
+        if not members:
+            return 0
+        params_list = [{**m, 'substitutions': [list(pair) for pair in m['substitutions']]} for m in members]
+        return self.db.execute_many(INSERT_CLUSTER_MEMBER, params_list, SUBSTITUTION_BINDS)
+    
+    def get_clusters(self) -> Dict[str, Dict]:
+        return cluster_rows(self.db.execute_query(SELECT_CLUSTERS))
@@ -0,0 +1,92 @@
+import json
+import zlib
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+import oracledb
+
+from agent.core.storage.graph_store import edge_rows
+
+BUNDLE_FORMAT_VERSION = 1
+
+SELECT_CONTEXT_COMPONENTS = """
+SELECT id, component_name, component_type, namespace, file_path
+FROM code_vectors WHERE component_type = :component_type
+"""
+
+SELECT_ALL_EDGES = """
+SELECT d.from_id, c.id, c.name, c.type, c.namespace, c.file_path, d.dependency_type, d.strength
+FROM code_dependencies d JOIN code_components c ON c.id = d.to_id
+ORDER BY d.from_id, d.strength DESC
+"""
+
+MERGE_BUNDLE = """
+MERGE INTO component_context_bundles b
+USING (SELECT :component_id as component_id FROM dual) src
+ON (b.component_id = src.component_id)
+WHEN MATCHED THEN UPDATE SET generation = :generation, format_version = :format_version,
+    bundle = :bundle, bundle_bytes = :bundle_bytes, created_at = SYSTIMESTAMP
+WHEN NOT MATCHED THEN INSERT (component_id, generation, format_version, bundle, bundle_bytes)
+    VALUES (:component_id, :generation, :format_version, :bundle, :bundle_bytes)
+"""
+
+DELETE_STALE_BUNDLES = """
+DELETE FROM component_context_bundles WHERE generation <> :generation OR format_version <> :format_version
+"""
+
+SELECT_BUNDLES = """
+SELECT component_id, bundle FROM component_context_bundles
+WHERE generation = :generation AND format_version = :format_version
+"""
+
+SELECT_BUNDLE = """
+SELECT bundle FROM component_context_bundles
+WHERE component_id = :component_id AND generation = :generation AND format_version = :format_version
+"""
+
+BUNDLE_BINDS = {'bundle': oracledb.DB_TYPE_BLOB}
+
+def encode_bundle(bundle: Dict) -> bytes:
+    return zlib.compress(json.dumps(bundle, separators=(',', ':'), default=str).encode(), 6)
+
+def decode_bundle(data: bytes) -> Dict:
+    return json.loads(zlib.decompress(data))
+
+class OracleContextStore:
+    def __init__(self, oracle_manager):
+        self.db = oracle_manager
+    
+    def iter_components(self, component_type: str, batch_size: int = 500) -> Iterator[Dict]:
+        for r in self.db.iter_query(SELECT_CONTEXT_COMPONENTS, {'component_type': component_type}, batch_size):
+            yield {'id': r[0], 'component_name': r[1], 'component_type': r[2], 'namespace': r[3], 'file_path': r[4]}
+    
+    def iter_edges(self, batch_size: int = 1000) -> Iterator[Tuple[str, Dict]]:
+        for r in self.db.iter_query(SELECT_ALL_EDGES, batch_size=batch_size):
+            yield r[0], edge_rows([r[1:]])[0]
+    
+    def write_bundles(self, bundles: Iterable[Tuple[str, Dict]], generation: int, batch_size: int = 200) -> Tuple[int, int]:
+        count, total_bytes, batch = 0, 0, []
+        for component_id, bundle in bundles:
+            data = encode_bundle(bundle)
+            batch.append({'component_id': component_id, 'generation': generation, 'format_version': BUNDLE_FORMAT_VERSION,
+                          'bundle': data, 'bundle_bytes': len(data)})
+            count += 1
+            total_bytes += len(data)
+            if len(batch) >= batch_size:
+                self.db.execute_many(MERGE_BUNDLE, batch, BUNDLE_BINDS)
+                batch = []
+        if batch:
+            self.db.execute_many(MERGE_BUNDLE, batch, BUNDLE_BINDS)
+        return count, total_bytes
+    
+    def purge_stale(self, generation: int) -> int:
+        return self.db.execute_update(DELETE_STALE_BUNDLES, {'generation': generation, 'format_version': BUNDLE_FORMAT_VERSION})
+    
+    def iter_bundles(self, generation: int, batch_size: int = 200) -> Iterator[Tuple[str, Dict]]:
+        params = {'generation': generation, 'format_version': BUNDLE_FORMAT_VERSION}
+        for component_id, data in self.db.iter_query(SELECT_BUNDLES, params, batch_size):
+            yield component_id, decode_bundle(data)
+    
+    def get_bundle(self, component_id: str, generation: int) -> Optional[Dict]:
+        results = self.db.execute_query(SELECT_BUNDLE, {'component_id': component_id, 'generation': generation,
+                                                        'format_version': BUNDLE_FORMAT_VERSION})
+        return decode_bundle(results[0][0]) if results else None
@@ -1,5 +1,111 @@
 import json
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional, Set, Tuple
+
+from agent.core.storage.json_codec import json_binds
+
+MERGE_COMPONENT_NODE = """
+MERGE INTO code_components c
+USING (SELECT :id as id FROM dual) d ON (c.id = d.id)
+WHEN NOT MATCHED THEN
+    INSERT (id, name, type, namespace, file_path, metadata)
+    VALUES (:id, :name, :type, :namespace, :file_path, :metadata)
+WHEN MATCHED THEN UPDATE SET name=:name, type=:type, namespace=:namespace, file_path=:file_path, metadata=:metadata
+"""
+
+MERGE_DEPENDENCY = """
+MERGE INTO code_dependencies d
+USING (SELECT :from_id as from_id, :to_id as to_id, :dep_type as dep_type FROM dual) s
+ON (d.from_id = s.from_id AND d.to_id = s.to_id AND d.dependency_type = s.dep_type)
+WHEN NOT MATCHED THEN INSERT (from_id, to_id, dependency_type, strength, metadata)
+    VALUES (:from_id, :to_id, :dep_type, :strength, :metadata)
+WHEN MATCHED THEN UPDATE SET strength=:strength, metadata=:metadata
+"""
+
+METADATA_BINDS = json_binds('metadata')
+
+SELECT_DIRECT_DEPENDENCIES = """
+SELECT c.id, c.name, c.type, c.namespace, c.file_path, d.dependency_type, d.strength
+FROM code_components c JOIN code_dependencies d ON c.id = d.to_id
+WHERE d.from_id = :component_id ORDER BY d.strength DESC
+"""
+
+SELECT_TRANSITIVE_DEPENDENCIES = """
+WITH RECURSIVE dep_tree AS (
+    SELECT d.to_id as id, 1 as depth FROM code_dependencies d WHERE d.from_id = :component_id
+    UNION ALL
+    SELECT d.to_id, dt.depth + 1 FROM code_dependencies d JOIN dep_tree dt ON d.from_id = dt.id WHERE dt.depth < :max_depth
+)
+SELECT DISTINCT c.id, c.name, c.type, c.namespace, c.file_path, 'DEPENDS_ON' as dependency_type, 1.0 as strength
+FROM code_components c JOIN dep_tree dt ON c.id = dt.id
+"""
+
+SELECT_DEPENDENTS = """
+SELECT c.id, c.name, c.type, c.namespace, c.file_path, d.dependency_type, d.strength
+FROM code_components c JOIN code_dependencies d ON c.id = d.from_id
+WHERE d.to_id = :component_id ORDER BY d.strength DESC
+"""
+
+SELECT_TRANSITIVE_DEPENDENTS = """
+WITH dependent_tree (id, depth) AS (
+    SELECT d.from_id, 1 FROM code_dependencies d WHERE d.to_id = :component_id
+    UNION ALL
+    SELECT d.from_id, dt.depth + 1 FROM code_dependencies d JOIN dependent_tree dt ON d.to_id = dt.id WHERE dt.depth < :max_depth
+)
+SELECT DISTINCT c.id, c.name, c.type, c.namespace, c.file_path, 'DEPENDED_ON_BY' as dependency_type, 1.0 as strength
+FROM code_components c JOIN dependent_tree dt ON c.id = dt.id
+"""
+
+SELECT_DEPENDENTS_OF = """
+WITH seeds AS (
+    SELECT s.id FROM JSON_TABLE(:component_ids, '$[*]' COLUMNS (id VARCHAR2(100) PATH '$')) s
+),
+dependent_tree (id, depth) AS (
+    SELECT d.from_id, 1 FROM code_dependencies d JOIN seeds s ON d.to_id = s.id
+    UNION ALL
+    SELECT d.from_id, dt.depth + 1 FROM code_dependencies d JOIN dependent_tree dt ON d.to_id = dt.id WHERE dt.depth < :max_depth
+)
+SELECT DISTINCT id FROM dependent_tree
+"""
+
+DEPENDENTS_BATCH_SIZE = 500
+
+DELETE_OUTGOING_DEPENDENCIES = "DELETE FROM code_dependencies WHERE from_id = :component_id"
+
+DELETE_DEPENDENCIES_OF_TYPE = "DELETE FROM code_dependencies WHERE dependency_type = :dependency_type"
+
+def component_node_params(
+    component_id: str, name: str, component_type: str,
+    namespace: str = None, file_path: str = None, metadata: Dict = None
+) -> Dict:
+    return {'id': component_id, 'name': name, 'type': component_type,
+            'namespace': namespace or '', 'file_path': file_path or '',
+            'metadata': metadata or {}}
+
+def dependency_params(
+    from_id: str, to_id: str, dependency_type: str = 'DEPENDS_ON',
+    strength: float = 1.0, metadata: Dict = None
+) -> Dict:
+    return {'from_id': from_id, 'to_id': to_id, 'dep_type': dependency_type,
+            'strength': strength, 'metadata': metadata or {}}
+
+def dependencies_statement(component_id: str, max_depth: int) -> Tuple[str, Dict]:
+    if max_depth == 1:
+        return SELECT_DIRECT_DEPENDENCIES, {'component_id': component_id}
+    return SELECT_TRANSITIVE_DEPENDENCIES, {'component_id': component_id, 'max_depth': max_depth}
+
+def dependents_statement(component_id: str, max_depth: int) -> Tuple[str, Dict]:
+    if max_depth == 1:
+        return SELECT_DEPENDENTS, {'component_id': component_id}
+    return SELECT_TRANSITIVE_DEPENDENTS, {'component_id': component_id, 'max_depth': max_depth}
+
+def dependents_of_batches(component_ids: Iterable[str], max_depth: int) -> List[Dict]:
+    ids = sorted(set(component_ids))
+    return [{'component_ids': json.dumps(ids[i:i + DEPENDENTS_BATCH_SIZE]), 'max_depth': max_depth}
+            for i in range(0, len(ids), DEPENDENTS_BATCH_SIZE)]
+
+def edge_rows(results: List[tuple]) -> List[Dict]:
+    return [{'id': r[0], 'name': r[1], 'type': r[2], 'namespace': r[3], 'file_path': r[4],
+             'dependency_type': r[5], 'strength': float(r[6])} for r in results]
 
 class OracleGraphStore:
     def __init__(self, oracle_manager):
@@ -9,63 +115,106 @@ class OracleGraphStore:
         self, component_id: str, name: str, component_type: str,
         namespace: str = None, file_path: str = None, metadata: Dict = None
     ):
-        query = """
-        MERGE INTO code_components c
-        USING (SELECT :id as id FROM dual) d ON (c.id = d.id)
-        WHEN NOT MATCHED THEN
-            INSERT (id, name, type, namespace, file_path, metadata)
-            VALUES (:id, :name, :type, :namespace, :file_path, :metadata)
-        WHEN MATCHED THEN UPDATE SET name=:name, type=:type, namespace=:namespace, file_path=:file_path, metadata=:metadata
-        """
-        params = {'id': component_id, 'name': name, 'type': component_type,
-                  'namespace': namespace or '', 'file_path': file_path or '',
-                  'metadata': json.dumps(metadata or {})}
-        self.db.execute_update(query, params)
+        params = component_node_params(component_id, name, component_type, namespace, file_path, metadata)
+        self.db.execute_update(MERGE_COMPONENT_NODE, params, METADATA_BINDS)
+    
+    def create_component_nodes(self, nodes: List[Dict]) -> int:
+        if not nodes:
+            return 0
+        params_list = [component_node_params(n['id'], n['name'], n['type'], n.get('namespace'),
+                                             n.get('file_path'), n.get('metadata')) for n in nodes]
+        return self.db.execute_many(MERGE_COMPONENT_NODE, params_list, METADATA_BINDS)
     
     def create_dependency(
         self, from_id: str, to_id: str, dependency_type: str = 'DEPENDS_ON',
         strength: float = 1.0, metadata: Dict = None
     ):
-        query = """
-        MERGE INTO code_dependencies d
-        USING (SELECT :from_id as from_id, :to_id as to_id, :dep_type as dep_type FROM dual) s
-        ON (d.from_id = s.from_id AND d.to_id = s.to_id AND d.dependency_type = s.dep_type)
-        WHEN NOT MATCHED THEN INSERT (from_id, to_id, dependency_type, strength, metadata)
-            VALUES (:from_id, :to_id, :dep_type, :strength, :metadata)
-        WHEN MATCHED THEN UPDATE SET strength=:strength, metadata=:metadata
-        """
-        params = {'from_id': from_id, 'to_id': to_id, 'dep_type': dependency_type,
-                  'strength': strength, 'metadata': json.dumps(metadata or {})}
-        self.db.execute_update(query, params)
+        params = dependency_params(from_id, to_id, dependency_type, strength, metadata)
+        self.db.execute_update(MERGE_DEPENDENCY, params, METADATA_BINDS)
+    
+    def create_dependencies(self, edges: List[Dict]) -> int:
+        if not edges:
+            return 0
+        params_list = [dependency_params(e['from_id'], e['to_id'], e.get('dependency_type', 'DEPENDS_ON'),
+                                         e.get('strength', 1.0), e.get('metadata')) for e in edges]
+        return self.db.execute_many(MERGE_DEPENDENCY, params_list, METADATA_BINDS)
     
     def get_dependencies(self, component_id: str, max_depth: int = 1) -> List[Dict]:
-        if max_depth == 1:
-            query = """
-            SELECT c.id, c.name, c.type, c.namespace, c.file_path, d.dependency_type, d.strength
-            FROM code_components c JOIN code_dependencies d ON c.id = d.to_id
-            WHERE d.from_id = :component_id ORDER BY d.strength DESC
-            """
-            results = self.db.execute_query(query, {'component_id': component_id})
-        else:
-            query = f"""
-            WITH RECURSIVE dep_tree AS (
-                SELECT d.to_id as id, 1 as depth FROM code_dependencies d WHERE d.from_id = :component_id
-                UNION ALL
-                SELECT d.to_id, dt.depth + 1 FROM code_dependencies d JOIN dep_tree dt ON d.from_id = dt.id WHERE dt.depth < :max_depth
-            )
-            SELECT DISTINCT c.id, c.name, c.type, c.namespace, c.file_path, 'DEPENDS_ON' as dependency_type, 1.0 as strength
-            FROM code_components c JOIN dep_tree dt ON c.id = dt.id
-            """
-            results = self.db.execute_query(query, {'component_id': component_id, 'max_depth': max_depth})
-        return [{'id': r[0], 'name': r[1], 'type': r[2], 'namespace': r[3], 'file_path': r[4],
-                 'dependency_type': r[5], 'strength': float(r[6])} for r in results]
-    
-    def get_dependents(self, component_id: str) -> List[Dict]:
-        query = """
-        SELECT c.id, c.name, c.type, c.namespace, c.file_path, d.dependency_type, d.strength
-        FROM code_components c JOIN code_dependencies d ON c.id = d.from_id
-        WHERE d.to_id = :component_id ORDER BY d.strength DESC
-        """
-        results = self.db.execute_query(query, {'component_id': component_id})
-        return [{'id': r[0], 'name': r[1], 'type': r[2], 'namespace': r[3], 'file_path': r[4],
-                 'dependency_type': r[5], 'strength': float(r[6])} for r in results]
+        query, params = dependencies_statement(component_id, max_depth)
+        return edge_rows(self.db.execute_query(query, params))
+    
+    def get_dependents(self, component_id: str, max_depth: int = 1) -> List[Dict]:
+        query, params = dependents_statement(component_id, max_depth)
+        return edge_rows(self.db.execute_query(query, params))
+    
+    def get_dependents_of(self, component_ids: Iterable[str], max_depth: int = 1) -> Set[str]:
+        dependents = set()
+        for params in dependents_of_batches(component_ids, max_depth):
+            dependents.update(r[0] for r in self.db.execute_query(SELECT_DEPENDENTS_OF, params))
+        return dependents
+    
+    def delete_dependencies(self, component_ids: List[str]) -> int:
+        if not component_ids:
+            return 0
+        return self.db.execute_many(DELETE_OUTGOING_DEPENDENCIES, [{'component_id': c} for c in component_ids])
+    
+    def delete_dependencies_of_type(self, dependency_types: List[str]) -> int:
+        if not dependency_types:
+            return 0
+        return self.db.execute_many(DELETE_DEPENDENCIES_OF_TYPE, [{'dependency_type': t} for t in dependency_types])
+
+class AsyncOracleGraphStore:
+    def __init__(self, async_oracle_manager):
+        self.db = async_oracle_manager
+    
+    async def create_component_node(
+        self, component_id: str, name: str, component_type: str,
+        namespace: str = None, file_path: str = None, metadata: Dict = None
+    ):
+        params = component_node_params(component_id, name, component_type, namespace, file_path, metadata)
+        await self.db.execute_update(MERGE_COMPONENT_NODE, params, METADATA_BINDS)
+    
+    async def create_component_nodes(self, nodes: List[Dict]) -> int:
+        if not nodes:
+            return 0
+        params_list = [component_node_params(n['id'], n['name'], n['type'], n.get('namespace'),
+                                             n.get('file_path'), n.get('metadata')) for n in nodes]
+        return await self.db.execute_many(MERGE_COMPONENT_NODE, params_list, METADATA_BINDS)
+    
+    async def create_dependency(
+        self, from_id: str, to_id: str, dependency_type: str = 'DEPENDS_ON',
+        strength: float = 1.0, metadata: Dict = None
+    ):
+        params = dependency_params(from_id, to_id, dependency_type, strength, metadata)
+        await self.db.execute_update(MERGE_DEPENDENCY, params, METADATA_BINDS)
+    
+    async def create_dependencies(self, edges: List[Dict]) -> int:
+        if not edges:
+            return 0
+        params_list = [dependency_params(e['from_id'], e['to_id'], e.get('dependency_type', 'DEPENDS_ON'),
+                                         e.get('strength', 1.0), e.get('metadata')) for e in edges]
+        return await self.db.execute_many(MERGE_DEPENDENCY, params_list, METADATA_BINDS)
+    
+    async def get_dependencies(self, component_id: str, max_depth: int = 1) -> List[Dict]:
+        query, params = dependencies_statement(component_id, max_depth)
+        return edge_rows(await self.db.execute_query(query, params))
+    
+    async def get_dependents(self, component_id: str, max_depth: int = 1) -> List[Dict]:
+        query, params = dependents_statement(component_id, max_depth)
+        return edge_rows(await self.db.execute_query(query, params))
+    
+    async def get_dependents_of(self, component_ids: Iterable[str], max_depth: int = 1) -> Set[str]:
+        dependents = set()
+        for params in dependents_of_batches(component_ids, max_depth):
+            dependents.update(r[0] for r in await self.db.execute_query(SELECT_DEPENDENTS_OF, params))
+        return dependents
+    
+    async def delete_dependencies(self, component_ids: List[str]) -> int:
+        if not component_ids:
+            return 0
+        return await self.db.execute_many(DELETE_OUTGOING_DEPENDENCIES, [{'component_id': c} for c in component_ids])
+    
+    async def delete_dependencies_of_type(self, dependency_types: List[str]) -> int:
+        if not dependency_types:
+            return 0
+        return await self.db.execute_many(DELETE_DEPENDENCIES_OF_TYPE, [{'dependency_type': t} for t in dependency_types])
@@ -0,0 +1,67 @@
+import time
+from typing import Dict, Iterable, List
+
+VECTOR_INDEXES = {
+    'code_vec_idx': ('code_vectors', 'embedding'),
+    'schema_vec_idx': ('schema_vectors', 'embedding')
+}
+
+BULK_LOAD_TABLES = ('code_vectors', 'schema_vectors', 'code_components', 'code_dependencies',
+                    'db_schema_reference', 'stored_procedures', 'component_table_usage')
+
+SELECT_VECTOR_INDEXES = "SELECT LOWER(index_name) FROM user_indexes WHERE index_type = 'VECTOR'"
+
+GATHER_TABLE_STATS = """
+BEGIN
+    DBMS_STATS.GATHER_TABLE_STATS(ownname => USER, tabname => UPPER(:table_name), degree => :degree, cascade => TRUE);
+END;
+"""
+
+def vector_index_statement(name: str, table: str, column: str, config) -> str:
+    if config.vector_index_type.upper() == 'HNSW':
+        organization = "INMEMORY NEIGHBOR GRAPH"
+        parameters = f" PARAMETERS (TYPE HNSW, NEIGHBORS {config.vector_hnsw_neighbors}, EFCONSTRUCTION {config.vector_hnsw_efconstruction})"
+    else:
+        organization = "NEIGHBOR PARTITIONS"
+        parameters = (f" PARAMETERS (TYPE IVF, NEIGHBOR PARTITIONS {config.vector_ivf_partitions})"
+                      if config.vector_ivf_partitions else "")
+    parallel = f" PARALLEL {config.vector_index_parallel}" if config.vector_index_parallel > 1 else ""
+    return (f"CREATE VECTOR INDEX {name} ON {table}({column}) ORGANIZATION {organization} "
+            f"DISTANCE {config.vector_distance_metric} WITH TARGET ACCURACY {config.vector_target_accuracy}"
+            f"{parameters}{parallel}")
+
+class OracleIndexManager:
+    def __init__(self, oracle_manager):
+        self.db = oracle_manager
+        self.config = oracle_manager.config
+    
+    def existing_vector_indexes(self) -> set:
+        return {r[0] for r in self.db.execute_query(SELECT_VECTOR_INDEXES)}
+    
+    def missing_vector_indexes(self) -> List[str]:
+        existing = self.existing_vector_indexes()
+        return [name for name in VECTOR_INDEXES if name not in existing]
+    
+    def drop_vector_indexes(self) -> List[str]:
+        dropped = [name for name in VECTOR_INDEXES if name in self.existing_vector_indexes()]
+        for name in dropped:
+            self.db.execute_update(f"DROP INDEX {name}")
+        return dropped
+    
+    def create_vector_indexes(self) -> Dict[str, float]:
+        existing = self.existing_vector_indexes()
+        timings = {}
+        for name, (table, column) in VECTOR_INDEXES.items():
+            if name in existing:
+                continue
+            started = time.perf_counter()
+            self.db.execute_update(vector_index_statement(name, table, column, self.config))
+            timings[name] = time.perf_counter() - started
+        return timings
+    
+    def gather_statistics(self, tables: Iterable[str] = BULK_LOAD_TABLES) -> float:
+        started = time.perf_counter()
+        degree = self.config.vector_index_parallel if self.config.vector_index_parallel > 1 else None
+        for table in tables:
+            self.db.execute_update(GATHER_TABLE_STATS, {'table_name': table, 'degree': degree})
+        return time.perf_counter() - started
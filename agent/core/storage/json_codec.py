@@ -0,0 +1,14 @@
+import json
+from typing import Any, Dict
+
+import oracledb
+
+def json_binds(*names: str) -> Dict[str, Any]:
+    return {name: oracledb.DB_TYPE_JSON for name in names}
+
+def decode_json(value: Any, default: Any = None) -> Any:
+    if value is None:
+        return default
+    if isinstance(value, (str, bytes)):
+        return json.loads(value)
+    return value
@@ -2,67 +2,235 @@ import oracledb
 from typing import List, Dict, Optional, Any
 import json
 from contextlib import contextmanager
+from contextvars import ContextVar
+
+from agent.core.metrics import metrics
+from agent.core.storage.pool_telemetry import PoolTelemetry
+
+def pool_params(config) -> Dict[str, Any]:
+    dsn = f"{config.host}:{config.port}/{config.service_name}"
+    params = {
+        'user': config.username,
+        'password': config.password,
+        'dsn': dsn,
+        'min': config.pool_min, 'max': config.pool_size, 'increment': config.pool_increment,
+        'stmtcachesize': config.stmtcachesize,
+        'ping_interval': config.ping_interval
+    }
+    if config.drcp:
+        params.update({'dsn': f"{dsn}:pooled", 'cclass': config.drcp_connection_class,
+                       'purity': oracledb.PURITY_SELF})
+    return params
+
+def fetch_lobs_inline(cursor, metadata):
+    if metadata.type_code is oracledb.DB_TYPE_CLOB:
+        return cursor.var(oracledb.DB_TYPE_LONG, arraysize=cursor.arraysize)
+    if metadata.type_code is oracledb.DB_TYPE_BLOB:
+        return cursor.var(oracledb.DB_TYPE_LONG_RAW, arraysize=cursor.arraysize)
+
+def fetch_round_trips(row_count: int, arraysize: int) -> int:
+    return 1 + row_count // max(arraysize, 1)
+
+class OracleSession:
+    def __init__(self, manager, conn, commit_every: int = 0):
+        self.manager = manager
+        self.conn = conn
+        self.commit_every = commit_every
+        self._cursors: Dict[str, Any] = {}
+        self._pending = 0
+    
+    def _cursor(self, query: str):
+        cursor = self._cursors.get(query)
+        if cursor is None:
+            cursor = self.conn.cursor()
+            cursor.outputtypehandler = fetch_lobs_inline
+            cursor.prepare(query)
+            self._cursors[query] = cursor
+        else:
+            self.manager.telemetry.record_cursor_reuse()
+        return cursor
+    
+    def execute_query(self, query: str, params: Dict = None) -> List[tuple]:
+        cursor = self._cursor(query)
+        cursor.execute(None, params or {})
+        results = cursor.fetchall()
+        self.manager.telemetry.record_round_trips(fetch_round_trips(len(results), cursor.arraysize), statement=True)
+        return results
+    
+    def execute_update(self, query: str, params: Dict = None, input_sizes: Dict = None) -> int:
+        cursor = self._cursor(query)
+        if input_sizes:
+            cursor.setinputsizes(**input_sizes)
+        cursor.execute(None, params or {})
+        self.manager.telemetry.record_round_trips(statement=True)
+        self._mark_pending()
+        return cursor.rowcount
+    
+    def execute_many(self, query: str, params_list: List[Dict], input_sizes: Dict = None) -> int:
+        cursor = self._cursor(query)
+        if input_sizes:
+            cursor.setinputsizes(**input_sizes)
+        cursor.executemany(None, params_list)
+        self.manager.telemetry.record_round_trips(statement=True)
+        self._mark_pending()
+        return cursor.rowcount
+    
+    def _mark_pending(self):
+        self._pending += 1
+        if self.commit_every and self._pending >= self.commit_every:
+            self.commit()
+    
+    def commit(self):
+        if self._pending:
+            self.conn.commit()
+            self.manager.telemetry.record_round_trips()
+            self._pending = 0
+    
+    def close(self):
+        for cursor in self._cursors.values():
+            cursor.close()
+        self._cursors.clear()
 
 class OracleManager:
     def __init__(self, config):
         self.config = config
+        self.telemetry = PoolTelemetry()
+        self._session: ContextVar[Optional[OracleSession]] = ContextVar(f'oracle_session_{id(self)}', default=None)
         self.pool = self._create_pool()
         from agent.core.storage.vector_store import OracleVectorStore
         from agent.core.storage.graph_store import OracleGraphStore
         from agent.core.storage.schema_store import OracleSchemaStore
+        from agent.core.storage.run_ledger import OracleRunLedger
+        from agent.core.storage.cluster_store import OracleClusterStore
+        from agent.core.storage.context_store import OracleContextStore
+        from agent.core.storage.usage_store import OracleUsageStore
+        from agent.core.storage.index_manager import OracleIndexManager
+        from agent.core.storage.run_report import OracleRunReport
         self.vector_store = OracleVectorStore(self)
         self.graph_store = OracleGraphStore(self)
         self.schema_store = OracleSchemaStore(self)
+        self.run_ledger = OracleRunLedger(self)
+        self.cluster_store = OracleClusterStore(self)
+        self.context_store = OracleContextStore(self)
+        self.usage_store = OracleUsageStore(self)
+        self.index_manager = OracleIndexManager(self)
+        self.run_report = OracleRunReport(self)
     
     def _create_pool(self):
-        pool = oracledb.create_pool(
-            user=self.config.username,
-            password=self.config.password,
-            dsn=f"{self.config.host}:{self.config.port}/{self.config.service_name}",
-            min=2, max=self.config.pool_size, increment=1
-        )
+        pool = oracledb.create_pool(**pool_params(self.config))
         return pool
     
     @contextmanager
     def get_connection(self):
-        conn = self.pool.acquire()
+        conn = self.telemetry.timed_acquire(self.pool.acquire)
+        metrics.set('oracle_pool_busy', self.pool.busy)
         try:
             yield conn
         finally:
             self.pool.release(conn)
     
+    @contextmanager
+    def session(self, commit_every: int = 0):
+        active = self._session.get()
+        if active is not None:
+            yield active
+            return
+        with self.get_connection() as conn:
+            session = OracleSession(self, conn, commit_every)
+            token = self._session.set(session)
+            try:
+                yield session
+                session.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                self._session.reset(token)
+                session.close()
+    
+    def stage(self, name: str):
+        return self.telemetry.stage(name)
+    
+    def pool_stats(self) -> Dict:
+        return self.telemetry.snapshot(self.pool)
+    
     def execute_query(self, query: str, params: Dict = None) -> List[tuple]:
+        session = self._session.get()
+        if session is not None:
+            return session.execute_query(query, params)
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.outputtypehandler = fetch_lobs_inline
             if params:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
             results = cursor.fetchall()
+            self.telemetry.record_round_trips(fetch_round_trips(len(results), cursor.arraysize), statement=True)
             cursor.close()
             return results
     
-    def execute_update(self, query: str, params: Dict = None) -> int:
+    def iter_query(self, query: str, params: Dict = None, batch_size: int = 500):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.arraysize = batch_size
+            cursor.outputtypehandler = fetch_lobs_inline
+            cursor.execute(query, params or {})
+            self.telemetry.record_round_trips(statement=True)
+            try:
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    self.telemetry.record_round_trips()
+                    if not rows:
+                        break
+                    yield from rows
+            finally:
+                cursor.close()
+    
+    def execute_update(self, query: str, params: Dict = None, input_sizes: Dict = None) -> int:
+        session = self._session.get()
+        if session is not None:
+            return session.execute_update(query, params, input_sizes)
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            if input_sizes:
+                cursor.setinputsizes(**input_sizes)
             if params:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
             rowcount = cursor.rowcount
             conn.commit()
+            self.telemetry.record_round_trips(2, statement=True)
             cursor.close()
             return rowcount
     
-    def execute_many(self, query: str, params_list: List[Dict]) -> int:
+    def execute_many(self, query: str, params_list: List[Dict], input_sizes: Dict = None) -> int:
+        session = self._session.get()
+        if session is not None:
+            return session.execute_many(query, params_list, input_sizes)
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            if input_sizes:
+                cursor.setinputsizes(**input_sizes)
             cursor.executemany(query, params_list)
             rowcount = cursor.rowcount
             conn.commit()
+            self.telemetry.record_round_trips(2, statement=True)
             cursor.close()
             return rowcount
     
+    def get_ingestion_generation(self) -> int:
+        results = self.execute_query("SELECT generation FROM ingestion_state WHERE state_key = 'default'")
+        return int(results[0][0]) if results else 0
+    
+    def bump_ingestion_generation(self) -> int:
+        self.execute_update("""
+            UPDATE ingestion_state SET generation = generation + 1, updated_at = SYSTIMESTAMP
+            WHERE state_key = 'default'
+        """)
+        return self.get_ingestion_generation()
+    
     def close(self):
         if self.pool:
             self.pool.close()
@@ -0,0 +1,71 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict
+
+from agent.core.metrics import metrics
+
+current_stage: ContextVar[str] = ContextVar('oracle_stage', default='default')
+
+class PoolTelemetry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.acquire_count = 0
+        self.acquire_wait_total = 0.0
+        self.acquire_wait_max = 0.0
+        self.round_trips: Dict[str, int] = defaultdict(int)
+        self.statements: Dict[str, int] = defaultdict(int)
+        self.cursor_reuses = 0
+    
+    @contextmanager
+    def stage(self, name: str):
+        token = current_stage.set(name)
+        try:
+            yield
+        finally:
+            current_stage.reset(token)
+    
+    def record_acquire(self, wait_seconds: float):
+        with self._lock:
+            self.acquire_count += 1
+            self.acquire_wait_total += wait_seconds
+            self.acquire_wait_max = max(self.acquire_wait_max, wait_seconds)
+        metrics.observe('oracle_acquire_seconds', wait_seconds)
+    
+    def record_round_trips(self, count: int = 1, statement: bool = False):
+        stage = current_stage.get()
+        with self._lock:
+            self.round_trips[stage] += count
+            if statement:
+                self.statements[stage] += 1
+        metrics.inc('oracle_round_trips_total', count, stage=stage)
+        if statement:
+            metrics.inc('oracle_statements_total', stage=stage)
+    
+    def record_cursor_reuse(self):
+        with self._lock:
+            self.cursor_reuses += 1
+    
+    def timed_acquire(self, acquire):
+        started = time.perf_counter()
+        conn = acquire()
+        self.record_acquire(time.perf_counter() - started)
+        return conn
+    
+    def snapshot(self, pool=None) -> Dict:
+        with self._lock:
+            stats = {
+                'acquire_count': self.acquire_count,
+                'acquire_wait_total_ms': round(self.acquire_wait_total * 1000, 2),
+                'acquire_wait_avg_ms': round(self.acquire_wait_total * 1000 / self.acquire_count, 3) if self.acquire_count else 0.0,
+                'acquire_wait_max_ms': round(self.acquire_wait_max * 1000, 2),
+                'round_trips_by_stage': dict(self.round_trips),
+                'statements_by_stage': dict(self.statements),
+                'cursor_reuses': self.cursor_reuses
+            }
+        if pool is not None:
+            stats.update({'pool_open': pool.opened, 'pool_busy': pool.busy,
+                          'pool_min': pool.min, 'pool_max': pool.max})
+        return stats
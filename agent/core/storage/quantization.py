@@ -0,0 +1,78 @@
+import math
+from array import array
+from typing import Optional, Sequence
+
+QUANTIZATION_NONE = 'none'
+QUANTIZATION_INT8 = 'int8'
+QUANTIZATION_BINARY = 'binary'
+QUANTIZATIONS = (QUANTIZATION_NONE, QUANTIZATION_INT8, QUANTIZATION_BINARY)
+
+def normalize(embedding: Sequence[float]) -> array:
+    norm = math.sqrt(sum(x * x for x in embedding))
+    return array('f', (x / norm for x in embedding) if norm else embedding)
+
+def truncate(embedding: Sequence[float], dimension: int) -> array:
+    if not dimension or dimension >= len(embedding):
+        return array('f', embedding)
+    return normalize(embedding[:dimension])
+
+def quantize_int8(embedding: Sequence[float]) -> array:
+    peak = max((abs(x) for x in embedding), default=0.0)
+    scale = 127.0 / peak if peak else 0.0
+    return array('b', (int(round(x * scale)) for x in embedding))
+
+def quantize_binary(embedding: Sequence[float]) -> array:
+    packed = array('B', bytes((len(embedding) + 7) // 8))
+    for i, x in enumerate(embedding):
+        if x > 0:
+            packed[i >> 3] |= 0x80 >> (i & 7)
+    return packed
+
+def cosine_distance(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a) * sum(y * y for y in b))
+    return 1.0 - dot / norm if norm else 1.0
+
+def hamming_distance(a: bytes, b: bytes) -> int:
+    return (int.from_bytes(a, 'big') ^ int.from_bytes(b, 'big')).bit_count()
+
+class EmbeddingCodec:
+    def __init__(self, quantization: str = QUANTIZATION_NONE, truncate_dimension: int = 0, rerank_factor: int = 8):
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization '{quantization}', expected one of {', '.join(QUANTIZATIONS)}")
+        self.quantization = quantization
+        self.truncate_dimension = truncate_dimension
+        self.rerank_factor = max(rerank_factor, 1)
+    
+    @classmethod
+    def from_config(cls, config) -> 'EmbeddingCodec':
+        return cls(config.vector_quantization.lower(), config.vector_truncate_dimension, config.vector_rerank_factor)
+    
+    @property
+    def quantized(self) -> bool:
+        return self.quantization != QUANTIZATION_NONE
+    
+    @property
+    def coarse_metric(self) -> str:
+        return 'HAMMING' if self.quantization == QUANTIZATION_BINARY else 'COSINE'
+    
+    @property
+    def coarse_format(self) -> str:
+        return self.quantization.upper()
+    
+    def coarse_dimension(self, dimension: int) -> int:
+        return min(self.truncate_dimension or dimension, dimension)
+    
+    def full(self, embedding: Sequence[float]) -> array:
+        return array('f', embedding)
+    
+    def coarse(self, embedding: Sequence[float]) -> Optional[array]:
+        if not self.quantized:
+            return None
+        reduced = truncate(embedding, self.truncate_dimension)
+        if self.quantization == QUANTIZATION_INT8:
+            return quantize_int8(reduced)
+        return quantize_binary(reduced)
+    
+    def candidates(self, top_k: int) -> int:
+        return top_k * self.rerank_factor
@@ -0,0 +1,116 @@
+import uuid
+from typing import Dict, Optional, Set
+
+from agent.core.storage.json_codec import decode_json, json_binds
+
+INSERT_RUN = "INSERT INTO migration_runs (run_id, status, started_at) VALUES (:run_id, 'RUNNING', SYSTIMESTAMP)"
+
+SELECT_RESUMABLE_RUN = """
+SELECT run_id FROM migration_runs WHERE status <> 'COMPLETED'
+ORDER BY started_at DESC FETCH FIRST 1 ROWS ONLY
+"""
+
+UPDATE_RUN_STATUS = """
+UPDATE migration_runs SET status = :status,
+    finished_at = CASE WHEN :status = 'RUNNING' THEN NULL ELSE SYSTIMESTAMP END
+WHERE run_id = :run_id
+"""
+
+MERGE_STAGE = """
+MERGE INTO migration_run_stages s
+USING (SELECT :run_id as run_id, :stage_name as stage_name FROM dual) src
+ON (s.run_id = src.run_id AND s.stage_name = src.stage_name)
+WHEN NOT MATCHED THEN INSERT (run_id, stage_name, status, started_at)
+    VALUES (:run_id, :stage_name, :status, SYSTIMESTAMP)
+WHEN MATCHED THEN UPDATE SET status = :status,
+    started_at = CASE WHEN :status = 'RUNNING' THEN SYSTIMESTAMP ELSE s.started_at END,
+    completed_at = CASE WHEN :status = 'COMPLETED' THEN SYSTIMESTAMP ELSE NULL END
+"""
+
+UPDATE_RUN_SOURCE = """
+UPDATE migration_runs SET repo_slug = :repo_slug, branch = :branch,
+    source_commit = :source_commit, base_commit = :base_commit
+WHERE run_id = :run_id
+"""
+
+SELECT_RUN_SOURCE = "SELECT source_commit, base_commit, metadata FROM migration_runs WHERE run_id = :run_id"
+
+SELECT_LAST_MIGRATED_COMMIT = """
+SELECT source_commit FROM migration_runs
+WHERE repo_slug = :repo_slug AND branch = :branch AND status = 'COMPLETED' AND source_commit IS NOT NULL
+ORDER BY finished_at DESC FETCH FIRST 1 ROWS ONLY
+"""
+
+UPDATE_RUN_METADATA = "UPDATE migration_runs SET metadata = :metadata WHERE run_id = :run_id"
+
+METADATA_BINDS = json_binds('metadata')
+
+SELECT_LATEST_GENERATED_CODE = """
+SELECT generated_code FROM migration_logs
+WHERE component_id = :component_id AND migration_status = 'SUCCESS' AND generated_code IS NOT NULL
+ORDER BY log_id DESC FETCH FIRST 1 ROWS ONLY
+"""
+
+SELECT_COMPLETED_STAGES = """
+SELECT stage_name FROM migration_run_stages WHERE run_id = :run_id AND status = 'COMPLETED'
+"""
+
+SELECT_SUCCESSFUL_COMPONENTS = """
+SELECT DISTINCT component_id FROM migration_logs WHERE run_id = :run_id AND migration_status = 'SUCCESS'
+"""
+
+class OracleRunLedger:
+    def __init__(self, oracle_manager):
+        self.db = oracle_manager
+    
+    def start_run(self) -> str:
+        run_id = uuid.uuid4().hex
+        self.db.execute_update(INSERT_RUN, {'run_id': run_id})
+        return run_id
+    
+    def resumable_run(self) -> Optional[str]:
+        results = self.db.execute_query(SELECT_RESUMABLE_RUN)
+        return results[0][0] if results else None
+    
+    def resume_run(self, run_id: str):
+        self.db.execute_update(UPDATE_RUN_STATUS, {'run_id': run_id, 'status': 'RUNNING'})
+    
+    def finish_run(self, run_id: str, status: str = 'COMPLETED'):
+        self.db.execute_update(UPDATE_RUN_STATUS, {'run_id': run_id, 'status': status})
+    
+    def start_stage(self, run_id: str, stage_name: str):
+        self.db.execute_update(MERGE_STAGE, {'run_id': run_id, 'stage_name': stage_name, 'status': 'RUNNING'})
+    
+    def complete_stage(self, run_id: str, stage_name: str):
+        self.db.execute_update(MERGE_STAGE, {'run_id': run_id, 'stage_name': stage_name, 'status': 'COMPLETED'})
+    
+    def fail_stage(self, run_id: str, stage_name: str):
+        self.db.execute_update(MERGE_STAGE, {'run_id': run_id, 'stage_name': stage_name, 'status': 'FAILED'})
+    
+    def completed_stages(self, run_id: str) -> Set[str]:
+        return {r[0] for r in self.db.execute_query(SELECT_COMPLETED_STAGES, {'run_id': run_id})}
+    
+    def successful_components(self, run_id: str) -> Set[str]:
+        return {r[0] for r in self.db.execute_query(SELECT_SUCCESSFUL_COMPONENTS, {'run_id': run_id})}
+    
+    def record_source(self, run_id: str, repo_slug: str, branch: str, source_commit: str, base_commit: Optional[str] = None):
+        self.db.execute_update(UPDATE_RUN_SOURCE, {'run_id': run_id, 'repo_slug': repo_slug, 'branch': branch,
+                                                   'source_commit': source_commit, 'base_commit': base_commit})
+    
+    def run_source(self, run_id: str) -> Optional[Dict]:
+        results = self.db.execute_query(SELECT_RUN_SOURCE, {'run_id': run_id})
+        if not results or results[0][0] is None:
+            return None
+        r = results[0]
+        return {'source_commit': r[0], 'base_commit': r[1], 'metadata': decode_json(r[2], {})}
+    
+    def last_migrated_commit(self, repo_slug: str, branch: str) -> Optional[str]:
+        results = self.db.execute_query(SELECT_LAST_MIGRATED_COMMIT, {'repo_slug': repo_slug, 'branch': branch})
+        return results[0][0] if results else None
+    
+    def update_metadata(self, run_id: str, metadata: Dict):
+        self.db.execute_update(UPDATE_RUN_METADATA, {'run_id': run_id, 'metadata': metadata}, METADATA_BINDS)
+    
+    def latest_generated_code(self, component_id: str) -> Optional[str]:
+        results = self.db.execute_query(SELECT_LATEST_GENERATED_CODE, {'component_id': component_id})
+        return results[0][0] if results else None
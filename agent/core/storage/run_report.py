@@ -0,0 +1,117 @@
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import oracledb
+
+PHASES = ('context', 'generation', 'write')
+
+TIMING_BINDS = {'start_time': oracledb.DB_TYPE_TIMESTAMP, 'end_time': oracledb.DB_TYPE_TIMESTAMP}
+
+SELECT_LATEST_RUN = "SELECT run_id FROM migration_runs ORDER BY started_at DESC FETCH FIRST 1 ROWS ONLY"
+
+SELECT_PREVIOUS_RUN = """
+SELECT r.run_id FROM migration_runs r
+WHERE r.status = 'COMPLETED' AND r.run_id <> :run_id
+  AND r.started_at < (SELECT started_at FROM migration_runs WHERE run_id = :run_id)
+  AND EXISTS (SELECT 1 FROM v_component_timings t WHERE t.run_id = r.run_id)
+ORDER BY r.started_at DESC FETCH FIRST 1 ROWS ONLY
+"""
+
+SELECT_TYPE_PERCENTILES = """
+SELECT component_type, components, p50_ms, p95_ms, p99_ms, avg_ms, max_ms,
+       avg_context_ms, avg_generation_ms, avg_write_ms
+FROM v_run_timing_percentiles WHERE run_id = :run_id ORDER BY component_type
+"""
+
+SELECT_SLOWEST_COMPONENTS = """
+SELECT t.component_id, c.name, t.component_type, t.migration_status, t.generation_tier,
+       t.duration_ms, t.context_ms, t.generation_ms, t.write_ms
+FROM v_component_timings t LEFT JOIN code_components c ON c.id = t.component_id
+WHERE t.run_id = :run_id
+ORDER BY t.duration_ms DESC FETCH FIRST :limit ROWS ONLY
+"""
+
+SELECT_REGRESSIONS = """
+SELECT cur.component_id, c.name, cur.component_type, base.duration_ms, cur.duration_ms,
+       cur.generation_tier, base.generation_tier
+FROM v_component_timings cur
+JOIN v_component_timings base ON base.component_id = cur.component_id
+LEFT JOIN code_components c ON c.id = cur.component_id
+WHERE cur.run_id = :run_id AND base.run_id = :baseline_run_id
+  AND cur.migration_status = 'SUCCESS' AND base.migration_status = 'SUCCESS'
+  AND cur.duration_ms > base.duration_ms * (1 + :threshold)
+  AND cur.duration_ms - base.duration_ms >= :min_ms
+ORDER BY cur.duration_ms - base.duration_ms DESC FETCH FIRST :limit ROWS ONLY
+"""
+
+class ComponentTiming:
+    def __init__(self):
+        self.start_time = datetime.now()
+        self.phases: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.tier: Optional[str] = None
+    
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] += (time.perf_counter() - started) * 1000
+    
+    def log_params(self, end_time: Optional[datetime] = None, write_ms: float = 0.0) -> Dict:
+        end_time = end_time or datetime.now()
+        return {'start_time': self.start_time, 'end_time': end_time,
+                'duration_ms': round((end_time - self.start_time).total_seconds() * 1000, 3),
+                'context_ms': round(self.phases['context'], 3), 'generation_ms': round(self.phases['generation'], 3),
+                'write_ms': round(self.phases['write'] + write_ms, 3), 'tier': self.tier}
+
+def percentile_rows(results: List[tuple]) -> List[Dict]:
+    return [{'component_type': r[0], 'components': r[1], 'p50_ms': float(r[2]), 'p95_ms': float(r[3]),
+             'p99_ms': float(r[4]), 'avg_ms': float(r[5]), 'max_ms': float(r[6]),
+             'avg_context_ms': float(r[7] or 0), 'avg_generation_ms': float(r[8] or 0),
+             'avg_write_ms': float(r[9] or 0)} for r in results]
+
+class OracleRunReport:
+    def __init__(self, oracle_manager):
+        self.db = oracle_manager
+    
+    def latest_run(self) -> Optional[str]:
+        results = self.db.execute_query(SELECT_LATEST_RUN)
+        return results[0][0] if results else None
+    
+    def previous_run(self, run_id: str) -> Optional[str]:
+        results = self.db.execute_query(SELECT_PREVIOUS_RUN, {'run_id': run_id})
+        return results[0][0] if results else None
+    
+    def type_percentiles(self, run_id: str) -> List[Dict]:
+        return percentile_rows(self.db.execute_query(SELECT_TYPE_PERCENTILES, {'run_id': run_id}))
+    
+    def slowest_components(self, run_id: str, limit: int = 10) -> List[Dict]:
+        results = self.db.execute_query(SELECT_SLOWEST_COMPONENTS, {'run_id': run_id, 'limit': limit})
+        return [{'component_id': r[0], 'name': r[1] or r[0], 'component_type': r[2], 'status': r[3], 'tier': r[4],
+                 'duration_ms': float(r[5]), 'context_ms': float(r[6] or 0), 'generation_ms': float(r[7] or 0),
+                 'write_ms': float(r[8] or 0)} for r in results]
+    
+    def regressions(self, run_id: str, baseline_run_id: str, threshold: float = 0.25,
+                    min_ms: float = 1000.0, limit: int = 10) -> List[Dict]:
+        results = self.db.execute_query(SELECT_REGRESSIONS, {
+            'run_id': run_id, 'baseline_run_id': baseline_run_id, 'threshold': threshold,
+            'min_ms': min_ms, 'limit': limit
+        })
+        return [{'component_id': r[0], 'name': r[1] or r[0], 'component_type': r[2], 'baseline_ms': float(r[3]),
+                 'duration_ms': float(r[4]), 'tier': r[5], 'baseline_tier': r[6]} for r in results]
+    
+    def type_regressions(self, run_id: str, baseline_run_id: str, threshold: float = 0.25) -> List[Dict]:
+        baseline = {row['component_type']: row for row in self.type_percentiles(baseline_run_id)}
+        rows = []
+        for row in self.type_percentiles(run_id):
+            base = baseline.get(row['component_type'])
+            if base is None:
+                continue
+            for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+                if base[key] and row[key] > base[key] * (1 + threshold):
+                    rows.append({'component_type': row['component_type'], 'metric': key,
+                                 'baseline_ms': base[key], 'duration_ms': row[key]})
+        return rows
@@ -0,0 +1,137 @@
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+IDENTIFIER_PARTS = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+')
+
+TABLE_NAME_WEIGHT = 4.0
+TABLE_TOKEN_WEIGHT = 3.0
+COLUMN_NAME_WEIGHT = 2.0
+COLUMN_TOKEN_WEIGHT = 1.0
+
+PREFIX_MIN_LENGTH = 2
+TRIGRAM_MIN_SIMILARITY = 0.4
+
+def split_identifier(identifier: str) -> List[str]:
+    parts = []
+    for chunk in re.split(r'[^A-Za-z0-9]+', identifier or ''):
+        parts.extend(p.lower() for p in IDENTIFIER_PARTS.findall(chunk))
+    return parts
+
+def identifier_terms(identifier: str) -> Set[str]:
+    normalized = re.sub(r'[^a-z0-9]', '', (identifier or '').lower())
+    terms = set(split_identifier(identifier))
+    if normalized:
+        terms.add(normalized)
+    terms.update([t[:-1] for t in terms if len(t) > 3 and t.endswith('s') and not t.endswith('ss')])
+    return terms
+
+def trigrams(term: str) -> Set[str]:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class SchemaSearchIndex:
+    def __init__(self):
+        self.tables: Dict[Tuple[str, str], Dict] = {}
+        self._postings: Dict[str, Dict[Tuple[str, str], Tuple[float, Optional[str]]]] = defaultdict(dict)
+        self._prefixes: Dict[str, Set[str]] = defaultdict(set)
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)
+        self._doc_terms: Dict[Tuple[str, str], Set[str]] = {}
+    
+    def __len__(self) -> int:
+        return len(self.tables)
+    
+    def add_table(self, schema_name: str, table_name: str, columns: List[Dict]):
+        key = (schema_name or '', table_name)
+        self.remove_table(*key)
+        self.tables[key] = {'schema_name': schema_name, 'table_name': table_name, 'columns': columns}
+        self._doc_terms[key] = set()
+        for term, weight, column in self.table_terms(table_name, columns):
+            self._add_posting(term, key, weight, column)
+    
+    def remove_table(self, schema_name: str, table_name: str):
+        key = (schema_name or '', table_name)
+        for term in self._doc_terms.pop(key, ()):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(key, None)
+            if not postings:
+                del self._postings[term]
+                self._unlink_term(term)
+        self.tables.pop(key, None)
+    
+    @staticmethod
+    def table_terms(table_name: str, columns: List[Dict]) -> Iterable[Tuple[str, float, Optional[str]]]:
+        normalized = re.sub(r'[^a-z0-9]', '', table_name.lower())
+        for term in identifier_terms(table_name):
+            yield term, TABLE_NAME_WEIGHT if term == normalized else TABLE_TOKEN_WEIGHT, None
+        for column in columns or []:
+            name = column.get('name', '')
+            normalized = re.sub(r'[^a-z0-9]', '', name.lower())
+            for term in identifier_terms(name):
+                yield term, COLUMN_NAME_WEIGHT if term == normalized else COLUMN_TOKEN_WEIGHT, name
+    
+    def _add_posting(self, term: str, key: Tuple[str, str], weight: float, column: Optional[str]):
+        postings = self._postings[term]
+        if not postings:
+            self._link_term(term)
+        current = postings.get(key)
+        if current is None or weight > current[0]:
+            postings[key] = (weight, column)
+        self._doc_terms[key].add(term)
+    
+    def _link_term(self, term: str):
+        for i in range(PREFIX_MIN_LENGTH, len(term) + 1):
+            self._prefixes[term[:i]].add(term)
+        for gram in trigrams(term):
+            self._trigrams[gram].add(term)
+    
+    def _unlink_term(self, term: str):
+        for i in range(PREFIX_MIN_LENGTH, len(term) + 1):
+            terms = self._prefixes.get(term[:i])
+            if terms is not None:
+                terms.discard(term)
+                if not terms:
+                    del self._prefixes[term[:i]]
+        for gram in trigrams(term):
+            terms = self._trigrams.get(gram)
+            if terms is not None:
+                terms.discard(term)
+                if not terms:
+                    del self._trigrams[gram]
+    
+    def _match_terms(self, query_term: str) -> Dict[str, float]:
+        matches = {}
+        if query_term in self._postings:
+            matches[query_term] = 1.0
+        for term in self._prefixes.get(query_term, ()):
+            if term not in matches:
+                matches[term] = 0.7 * len(query_term) / len(term)
+        if matches or len(query_term) < 3:
+            return matches
+        query_grams = trigrams(query_term)
+        shared = defaultdict(int)
+        for gram in query_grams:
+            for term in self._trigrams.get(gram, ()):
+                shared[term] += 1
+        for term, count in shared.items():
+            similarity = count / (len(query_grams) + len(trigrams(term)) - count)
+            if similarity >= TRIGRAM_MIN_SIMILARITY:
+                matches[term] = 0.5 * similarity
+        return matches
+    
+    def search(self, keyword: str, limit: Optional[int] = None) -> List[Dict]:
+        scores: Dict[Tuple[str, str], float] = defaultdict(float)
+        matched_columns: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
+        for query_term in identifier_terms(keyword):
+            for term, term_score in self._match_terms(query_term).items():
+                for key, (weight, column) in self._postings[term].items():
+                    scores[key] += term_score * weight
+                    if column:
+                        matched_columns[key].add(column)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0][1]))
+        if limit:
+            ranked = ranked[:limit]
+        return [{**self.tables[key], 'score': round(score, 4),
+                 'matched_columns': sorted(matched_columns.get(key, ()))} for key, score in ranked]
@@ -1,67 +1,233 @@
-import json
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+
+import oracledb
+
+from agent.core.storage.json_codec import decode_json, json_binds
+from agent.core.storage.schema_index import SchemaSearchIndex, identifier_terms
+
+MERGE_TABLE_SCHEMA = """
+MERGE INTO db_schema_reference s
+USING (SELECT :schema_name as schema_name, :table_name as table_name FROM dual) src
+ON (s.schema_name = src.schema_name AND s.table_name = src.table_name)
+WHEN NOT MATCHED THEN INSERT (schema_name, table_name, column_definitions, indexes, relationships)
+    VALUES (:schema_name, :table_name, :columns, :indexes, :relationships)
+WHEN MATCHED THEN UPDATE SET column_definitions=:columns, indexes=:indexes, relationships=:relationships
+"""
+
+MERGE_STORED_PROCEDURE = """
+MERGE INTO stored_procedures p
+USING (SELECT :schema_name as schema_name, :proc_name as proc_name FROM dual) src
+ON (p.schema_name = src.schema_name AND p.proc_name = src.proc_name)
+WHEN NOT MATCHED THEN INSERT (schema_name, proc_name, parameters, referenced_tables, definition)
+    VALUES (:schema_name, :proc_name, :parameters, :tables, :definition)
+WHEN MATCHED THEN UPDATE SET parameters=:parameters, referenced_tables=:tables, definition=:definition
+"""
+
+TABLE_SCHEMA_BINDS = json_binds('columns', 'indexes', 'relationships')
+
+STORED_PROCEDURE_BINDS = {**json_binds('parameters', 'tables'), 'definition': oracledb.DB_TYPE_CLOB}
+
+SELECT_TABLE_SCHEMA = """
+SELECT schema_name, table_name, column_definitions, indexes, relationships
+FROM db_schema_reference WHERE table_name = :table_name
+"""
+
+SELECT_STORED_PROCEDURE = """
+SELECT schema_name, proc_name, parameters, definition, referenced_tables
+FROM stored_procedures WHERE proc_name = :proc_name
+"""
+
+SELECT_ALL_PROCEDURES = "SELECT schema_name, proc_name, parameters, definition, referenced_tables FROM stored_procedures"
+
+SELECT_ALL_TABLES = """
+SELECT schema_name, table_name, column_definitions, indexes, relationships
+FROM db_schema_reference ORDER BY schema_name, table_name
+"""
+
+SELECT_TABLE_COLUMNS = "SELECT schema_name, table_name, column_definitions FROM db_schema_reference"
+
+DELETE_TABLE_TERMS = "DELETE FROM schema_search_terms WHERE schema_name = :schema_name AND table_name = :table_name"
+
+INSERT_TABLE_TERM = """
+INSERT INTO schema_search_terms (term, schema_name, table_name, column_name, weight)
+VALUES (:term, :schema_name, :table_name, :column_name, :weight)
+"""
+
+def table_schema_params(schema_name: str, table_name: str, columns: List[Dict],
+                        indexes: List[Dict] = None, relationships: List[Dict] = None) -> Dict:
+    return {'schema_name': schema_name, 'table_name': table_name,
+            'columns': columns, 'indexes': indexes or [],
+            'relationships': relationships or []}
+
+def stored_procedure_params(schema_name: str, proc_name: str, parameters: List[Dict], definition: str,
+                            tables: List[Dict] = None) -> Dict:
+    return {'schema_name': schema_name, 'proc_name': proc_name,
+            'parameters': parameters or [], 'tables': tables or [], 'definition': definition}
+
+def table_schema_row(r: tuple) -> Dict:
+    return {'schema_name': r[0], 'table_name': r[1],
+            'columns': decode_json(r[2], []), 'indexes': decode_json(r[3], []),
+            'relationships': decode_json(r[4], [])}
+
+def stored_procedure_row(r: tuple) -> Dict:
+    return {'schema_name': r[0], 'proc_name': r[1],
+            'parameters': decode_json(r[2], []), 'definition': r[3], 'tables': decode_json(r[4], [])}
+
+def table_term_rows(schema_name: str, table_name: str, columns: List[Dict]) -> List[Dict]:
+    best = {}
+    for term, weight, column in SchemaSearchIndex.table_terms(table_name, columns):
+        if term not in best or weight > best[term][0]:
+            best[term] = (weight, column)
+    return [{'term': term, 'schema_name': schema_name, 'table_name': table_name,
+             'column_name': column, 'weight': weight} for term, (weight, column) in best.items()]
+
+def materialized_search_statement(keyword: str, limit: int) -> Optional[Tuple[str, Dict]]:
+    terms = sorted(identifier_terms(keyword))
+    if not terms:
+        return None
+    term_binds = {f'term{i}': term for i, term in enumerate(terms)}
+    term_filter = " OR ".join(f"t.term LIKE :{name} || '%'" for name in term_binds)
+    exact_terms = ", ".join(f":{name}" for name in term_binds)
+    query = f"""
+    SELECT s.schema_name, s.table_name, s.column_definitions, m.score
+    FROM (
+        SELECT t.schema_name, t.table_name, SUM(t.weight * CASE WHEN t.term IN ({exact_terms}) THEN 1.0 ELSE 0.7 END) as score
+        FROM schema_search_terms t WHERE {term_filter}
+        GROUP BY t.schema_name, t.table_name
+        ORDER BY score DESC FETCH FIRST :limit ROWS ONLY
+    ) m JOIN db_schema_reference s ON s.schema_name = m.schema_name AND s.table_name = m.table_name
+    ORDER BY m.score DESC, s.table_name
+    """
+    return query, {**term_binds, 'limit': limit}
+
+def materialized_search_rows(results: List[tuple]) -> List[Dict]:
+    return [{'schema_name': r[0], 'table_name': r[1], 'columns': decode_json(r[2], []),
+             'score': round(float(r[3]), 4)} for r in results]
 
 class OracleSchemaStore:
     def __init__(self, oracle_manager):
         self.db = oracle_manager
+        self.materialize_index = getattr(oracle_manager.config, 'schema_index_materialized', False)
+        self.search_index = SchemaSearchIndex()
+        self._index_loaded = False
     
     def add_table_schema(self, schema_name: str, table_name: str,
                          columns: List[Dict], indexes: List[Dict] = None,
                          relationships: List[Dict] = None):
-        query = """
-        MERGE INTO db_schema_reference s
-        USING (SELECT :schema_name as schema_name, :table_name as table_name FROM dual) src
-        ON (s.schema_name = src.schema_name AND s.table_name = src.table_name)
-        WHEN NOT MATCHED THEN INSERT (schema_name, table_name, column_definitions, indexes, relationships)
-            VALUES (:schema_name, :table_name, :columns, :indexes, :relationships)
-        WHEN MATCHED THEN UPDATE SET column_definitions=:columns, indexes=:indexes, relationships=:relationships
-        """
-        params = {'schema_name': schema_name, 'table_name': table_name,
-                  'columns': json.dumps(columns), 'indexes': json.dumps(indexes or []),
-                  'relationships': json.dumps(relationships or [])}
-        self.db.execute_update(query, params)
+        params = table_schema_params(schema_name, table_name, columns, indexes, relationships)
+        self.db.execute_update(MERGE_TABLE_SCHEMA, params, TABLE_SCHEMA_BINDS)
+        if self._index_loaded:
+            self.search_index.add_table(schema_name, table_name, columns)
+        if self.materialize_index:
+            self._materialize_table_terms(schema_name, table_name, columns)
     
     def add_stored_procedure(self, schema_name: str, proc_name: str,
-                             parameters: List[Dict], definition: str):
-        query = """
-        MERGE INTO stored_procedures p
-        USING (SELECT :schema_name as schema_name, :proc_name as proc_name FROM dual) src
-        ON (p.schema_name = src.schema_name AND p.proc_name = src.proc_name)
-        WHEN NOT MATCHED THEN INSERT (schema_name, proc_name, parameters, definition)
-            VALUES (:schema_name, :proc_name, :parameters, :definition)
-        WHEN MATCHED THEN UPDATE SET parameters=:parameters, definition=:definition
-        """
-        params = {'schema_name': schema_name, 'proc_name': proc_name,
-                  'parameters': json.dumps(parameters), 'definition': definition}
-        self.db.execute_update(query, params)
+                             parameters: List[Dict], definition: str, tables: List[Dict] = None):
+        params = stored_procedure_params(schema_name, proc_name, parameters, definition, tables)
+        self.db.execute_update(MERGE_STORED_PROCEDURE, params, STORED_PROCEDURE_BINDS)
+    
+    def add_stored_procedures(self, procedures: List[Dict]) -> int:
+        if not procedures:
+            return 0
+        params_list = [stored_procedure_params(p['schema_name'], p['proc_name'], p.get('parameters'),
+                                               p['definition'], p.get('tables')) for p in procedures]
+        return self.db.execute_many(MERGE_STORED_PROCEDURE, params_list, STORED_PROCEDURE_BINDS)
     
     def get_table_schema(self, table_name: str) -> Optional[Dict]:
-        query = """
-        SELECT schema_name, table_name, column_definitions, indexes, relationships
-        FROM db_schema_reference WHERE table_name = :table_name
-        """
-        results = self.db.execute_query(query, {'table_name': table_name})
-        if results:
-            r = results[0]
-            return {'schema_name': r[0], 'table_name': r[1],
-                    'columns': json.loads(r[2]), 'indexes': json.loads(r[3]) if r[3] else [],
-                    'relationships': json.loads(r[4]) if r[4] else []}
-        return None
+        results = self.db.execute_query(SELECT_TABLE_SCHEMA, {'table_name': table_name})
+        return table_schema_row(results[0]) if results else None
     
     def get_stored_procedure(self, proc_name: str) -> Optional[Dict]:
-        query = "SELECT schema_name, proc_name, parameters, definition FROM stored_procedures WHERE proc_name = :proc_name"
-        results = self.db.execute_query(query, {'proc_name': proc_name})
-        if results:
-            r = results[0]
-            return {'schema_name': r[0], 'proc_name': r[1],
-                    'parameters': json.loads(r[2]), 'definition': r[3]}
-        return None
+        results = self.db.execute_query(SELECT_STORED_PROCEDURE, {'proc_name': proc_name})
+        return stored_procedure_row(results[0]) if results else None
+    
+    def iter_all_tables(self, batch_size: int = 500):
+        for r in self.db.iter_query(SELECT_ALL_TABLES, batch_size=batch_size):
+            yield table_schema_row(r)
+    
+    def iter_all_procedures(self, batch_size: int = 200):
+        for r in self.db.iter_query(SELECT_ALL_PROCEDURES, batch_size=batch_size):
+            yield stored_procedure_row(r)
+    
+    def search_tables_by_keyword(self, keyword: str, limit: int = 20) -> List[Dict]:
+        if self.materialize_index:
+            statement = materialized_search_statement(keyword, limit)
+            return materialized_search_rows(self.db.execute_query(*statement)) if statement else []
+        self._ensure_index_loaded()
+        return self.search_index.search(keyword, limit)
+    
+    def _ensure_index_loaded(self):
+        if self._index_loaded:
+            return
+        for r in self.db.execute_query(SELECT_TABLE_COLUMNS):
+            self.search_index.add_table(r[0], r[1], decode_json(r[2], []))
+        self._index_loaded = True
+    
+    def _materialize_table_terms(self, schema_name: str, table_name: str, columns: List[Dict]):
+        self.db.execute_update(DELETE_TABLE_TERMS, {'schema_name': schema_name, 'table_name': table_name})
+        rows = table_term_rows(schema_name, table_name, columns)
+        if rows:
+            self.db.execute_many(INSERT_TABLE_TERM, rows)
+    
+    def rebuild_materialized_index(self):
+        self.db.execute_update("DELETE FROM schema_search_terms")
+        for r in self.db.execute_query(SELECT_TABLE_COLUMNS):
+            self._materialize_table_terms(r[0], r[1], decode_json(r[2], []))
+
+class AsyncOracleSchemaStore:
+    def __init__(self, async_oracle_manager):
+        self.db = async_oracle_manager
+        self.materialize_index = getattr(async_oracle_manager.config, 'schema_index_materialized', False)
+        self.search_index = SchemaSearchIndex()
+        self._index_loaded = False
+    
+    async def add_table_schema(self, schema_name: str, table_name: str,
+                               columns: List[Dict], indexes: List[Dict] = None,
+                               relationships: List[Dict] = None):
+        params = table_schema_params(schema_name, table_name, columns, indexes, relationships)
+        await self.db.execute_update(MERGE_TABLE_SCHEMA, params, TABLE_SCHEMA_BINDS)
+        if self._index_loaded:
+            self.search_index.add_table(schema_name, table_name, columns)
+        if self.materialize_index:
+            await self.db.execute_update(DELETE_TABLE_TERMS, {'schema_name': schema_name, 'table_name': table_name})
+            rows = table_term_rows(schema_name, table_name, columns)
+            if rows:
+                await self.db.execute_many(INSERT_TABLE_TERM, rows)
+    
+    async def add_stored_procedure(self, schema_name: str, proc_name: str,
+                                   parameters: List[Dict], definition: str, tables: List[Dict] = None):
+        params = stored_procedure_params(schema_name, proc_name, parameters, definition, tables)
+        await self.db.execute_update(MERGE_STORED_PROCEDURE, params, STORED_PROCEDURE_BINDS)
+    
+    async def add_stored_procedures(self, procedures: List[Dict]) -> int:
+        if not procedures:
+            return 0
+        params_list = [stored_procedure_params(p['schema_name'], p['proc_name'], p.get('parameters'),
+                                               p['definition'], p.get('tables')) for p in procedures]
+        return await self.db.execute_many(MERGE_STORED_PROCEDURE, params_list, STORED_PROCEDURE_BINDS)
+    
+    async def get_table_schema(self, table_name: str) -> Optional[Dict]:
+        results = await self.db.execute_query(SELECT_TABLE_SCHEMA, {'table_name': table_name})
+        return table_schema_row(results[0]) if results else None
+    
+    async def get_stored_procedure(self, proc_name: str) -> Optional[Dict]:
+        results = await self.db.execute_query(SELECT_STORED_PROCEDURE, {'proc_name': proc_name})
+        return stored_procedure_row(results[0]) if results else None
+    
+    async def iter_all_tables(self, batch_size: int = 500):
+        async for r in self.db.iter_query(SELECT_ALL_TABLES, batch_size=batch_size):
+            yield table_schema_row(r)
+    
+    async def iter_all_procedures(self, batch_size: int = 200):
+        async for r in self.db.iter_query(SELECT_ALL_PROCEDURES, batch_size=batch_size):
+            yield stored_procedure_row(r)
     
-    def search_tables_by_keyword(self, keyword: str) -> List[Dict]:
-        query = """
-        SELECT schema_name, table_name, column_definitions FROM db_schema_reference
-        WHERE UPPER(table_name) LIKE UPPER('%' || :keyword || '%')
-           OR JSON_EXISTS(column_definitions, '$[*].name ? (@ like_regex $pattern flag "i")' PASSING :keyword AS "pattern")
-        """
-        results = self.db.execute_query(query, {'keyword': keyword})
-        return [{'schema_name': r[0], 'table_name': r[1], 'columns': json.loads(r[2])} for r in results]
+    async def search_tables_by_keyword(self, keyword: str, limit: int = 20) -> List[Dict]:
+        if self.materialize_index:
+            statement = materialized_search_statement(keyword, limit)
+            return materialized_search_rows(await self.db.execute_query(*statement)) if statement else []
+        if not self._index_loaded:
+            for r in await self.db.execute_query(SELECT_TABLE_COLUMNS):
+                self.search_index.add_table(r[0], r[1], decode_json(r[2], []))
+            self._index_loaded = True
+        return self.search_index.search(keyword, limit)
@@ -0,0 +1,42 @@
+from typing import Dict, Iterator, List
+
+from agent.core.storage.schema_store import table_schema_row
+
+DELETE_TABLE_USAGE = "DELETE FROM component_table_usage"
+
+INSERT_TABLE_USAGE = """
+INSERT INTO component_table_usage (component_id, schema_name, table_name, source, depth, via_component_id)
+VALUES (:component_id, :schema_name, :table_name, :source, :depth, :via_component_id)
+"""
+
+SELECT_COMPONENT_TABLES = """
+SELECT s.schema_name, s.table_name, s.column_definitions, s.indexes, s.relationships
+FROM component_table_usage u
+JOIN db_schema_reference s ON s.schema_name = u.schema_name AND s.table_name = u.table_name
+WHERE u.component_id = :component_id AND u.depth <= :max_depth
+ORDER BY u.depth, u.table_name
+"""
+
+SELECT_TABLE_USAGE = """
+SELECT component_id, schema_name, table_name, source, depth
+FROM component_table_usage WHERE depth <= :max_depth
+ORDER BY component_id, depth, table_name
+"""
+
+class OracleUsageStore:
+    def __init__(self, oracle_manager):
+        self.db = oracle_manager
+    
+    def replace_usage(self, rows: List[Dict], batch_size: int = 1000) -> int:
+        self.db.execute_update(DELETE_TABLE_USAGE)
+        for start in range(0, len(rows), batch_size):
+            self.db.execute_many(INSERT_TABLE_USAGE, rows[start:start + batch_size])
+        return len(rows)
+    
+    def get_component_tables(self, component_id: str, max_depth: int = 2) -> List[Dict]:
+        results = self.db.execute_query(SELECT_COMPONENT_TABLES, {'component_id': component_id, 'max_depth': max_depth})
+        return [table_schema_row(r) for r in results]
+    
+    def iter_usage(self, max_depth: int = 2, batch_size: int = 1000) -> Iterator[Dict]:
+        for r in self.db.iter_query(SELECT_TABLE_USAGE, {'max_depth': max_depth}, batch_size):
+            yield {'component_id': r[0], 'schema_name': r[1], 'table_name': r[2], 'source': r[3], 'depth': int(r[4])}
@@ -1,63 +1,359 @@
-import json
+from typing import List, Dict, Optional, Set, Tuple
+
+import oracledb
+
+from agent.core.storage.json_codec import decode_json, json_binds
+from agent.core.storage.quantization import EmbeddingCodec
+
+INSERT_CODE_VECTOR = """
+MERGE INTO code_vectors v
+USING (SELECT :id as id FROM dual) src
+ON (v.id = src.id)
+WHEN MATCHED THEN UPDATE SET
+    file_path = :file_path, component_type = :component_type, component_name = :component_name,
+    namespace = :namespace, code_content = :code_content, embedding = :embedding,
+    embedding_q = :embedding_q, metadata = :metadata, updated_at = SYSTIMESTAMP
+WHEN NOT MATCHED THEN INSERT (
+    id, file_path, component_type, component_name,
+    namespace, code_content, embedding, embedding_q, metadata
+) VALUES (
+    :id, :file_path, :component_type, :component_name,
+    :namespace, :code_content, :embedding, :embedding_q, :metadata
+)
+"""
+
+METADATA_BINDS = {**json_binds('metadata'), 'embedding_q': oracledb.DB_TYPE_VECTOR}
+
+COMPONENT_COLUMNS = "id, file_path, component_type, component_name, namespace, code_content"
+
+QUALIFIED_COMPONENT_COLUMNS = ', '.join(f"v.{column}" for column in COMPONENT_COLUMNS.split(', '))
+
+def component_by_id_query(include_metadata: bool = True) -> str:
+    metadata_column = ", metadata" if include_metadata else ""
+    return f"SELECT {COMPONENT_COLUMNS}{metadata_column} FROM code_vectors WHERE id = :id"
+
+SELECT_CODE_CONTENT = "SELECT code_content FROM code_vectors WHERE id = :id"
+
+SELECT_STORED_CODE = "SELECT file_path, code_content FROM code_vectors"
+
+SELECT_STORED_CODE_PATHS = "SELECT v.file_path FROM code_vectors v JOIN code_components c ON c.id = v.id"
+
+SELECT_STALE_CODES = """
+SELECT id, embedding FROM code_vectors
+WHERE embedding IS NOT NULL
+  AND (embedding_q IS NULL OR VECTOR_DIMENSION_FORMAT(embedding_q) <> :coarse_format
+       OR VECTOR_DIMENSION_COUNT(embedding_q) <> :coarse_dimension)
+"""
+
+UPDATE_CODE_Q = "UPDATE code_vectors SET embedding_q = :embedding_q WHERE id = :id"
+
+CODE_Q_BINDS = {'embedding_q': oracledb.DB_TYPE_VECTOR}
+
+SELECT_CLONE_SOURCES = "SELECT id, component_type, component_name, code_content, embedding FROM code_vectors"
+
+DELETE_CODE_VECTOR = "DELETE FROM code_vectors WHERE id = :id"
+
+def stale_code_params(codec: EmbeddingCodec, dimension: int) -> Dict:
+    return {'coarse_format': codec.coarse_format, 'coarse_dimension': codec.coarse_dimension(dimension)}
+
+def to_vector_literal(embedding: List[float]) -> str:
+    return f"[{','.join(map(str, embedding))}]"
+
+def code_vector_params(
+    component_id: str, file_path: str, component_type: str,
+    component_name: str, namespace: str, code_content: str,
+    embedding: List[float], metadata: Dict = None, codec: Optional[EmbeddingCodec] = None
+) -> Dict:
+    codec = codec or EmbeddingCodec()
+    return {
+        'id': component_id, 'file_path': file_path,
+        'component_type': component_type, 'component_name': component_name,
+        'namespace': namespace or '', 'code_content': code_content,
+        'embedding': to_vector_literal(codec.full(embedding)), 'embedding_q': codec.coarse(embedding),
+        'metadata': metadata or {}
+    }
+
+def nearest_code_parts(
+    query_embedding: List[float], top_k: int, component_type: Optional[str], offset: int,
+    include_metadata: bool = True, codec: Optional[EmbeddingCodec] = None
+) -> Tuple[str, str, Dict]:
+    codec = codec or EmbeddingCodec()
+    params = {'query_vector': to_vector_literal(codec.full(query_embedding)), 'top_k': top_k, 'offset': offset}
+    where_clause = ""
+    if component_type:
+        where_clause = "WHERE component_type = :component_type"
+        params['component_type'] = component_type
+    metadata_column = "metadata" if include_metadata else "NULL"
+    if codec.quantized:
+        params['query_q'] = codec.coarse(query_embedding)
+        params['candidates'] = codec.candidates(offset + top_k)
+        candidates = f"""
+    candidates AS (
+        SELECT id FROM code_vectors {where_clause}
+        ORDER BY VECTOR_DISTANCE(embedding_q, :query_q, {codec.coarse_metric})
+        FETCH FIRST :candidates ROWS ONLY
+    )"""
+        select = f"""
+    SELECT {QUALIFIED_COMPONENT_COLUMNS},
+           {metadata_column}, VECTOR_DISTANCE(v.embedding, :query_vector, COSINE) as distance
+    FROM code_vectors v JOIN candidates c ON c.id = v.id
+    ORDER BY distance
+    OFFSET :offset ROWS FETCH NEXT :top_k ROWS ONLY
+    """
+        return candidates, select, params
+    select = f"""
+    SELECT {COMPONENT_COLUMNS},
+           {metadata_column}, VECTOR_DISTANCE(embedding, :query_vector, COSINE) as distance
+    FROM code_vectors {where_clause}
+    ORDER BY VECTOR_DISTANCE(embedding, :query_vector, COSINE)
+    OFFSET :offset ROWS FETCH NEXT :top_k ROWS ONLY
+    """
+    return "", select, params
+
+def similar_code_statement(
+    query_embedding: List[float], top_k: int, component_type: Optional[str], offset: int,
+    include_metadata: bool = True, codec: Optional[EmbeddingCodec] = None
+) -> Tuple[str, Dict]:
+    candidates, select, params = nearest_code_parts(query_embedding, top_k, component_type, offset,
+                                                    include_metadata, codec)
+    return (f"WITH{candidates}{select}" if candidates else select), params
+
+def similar_code_rows(results: List[tuple], include_metadata: bool = True) -> List[Dict]:
+    rows = []
+    for r in results:
+        row = {'id': r[0], 'file_path': r[1], 'component_type': r[2],
+               'component_name': r[3], 'namespace': r[4], 'code_content': r[5],
+               'distance': float(r[7])}
+        if include_metadata:
+            row['metadata'] = decode_json(r[6], {})
+        rows.append(row)
+    return rows
+
+NEIGHBOURHOOD_COLUMNS = "id, file_path, component_type, component_name, namespace, code_content, metadata, distance"
+
+def neighbourhood_statement(
+    query_embedding: List[float], top_k: int, hops: int, component_type: Optional[str] = None,
+    offset: int = 0, include_metadata: bool = True, codec: Optional[EmbeddingCodec] = None,
+    hop_decay: float = 0.5
+) -> Tuple[str, Dict]:
+    candidates, select, params = nearest_code_parts(query_embedding, top_k, component_type, offset,
+                                                    include_metadata, codec)
+    params['hop_decay'] = hop_decay
+    query = f"""
+    WITH{candidates + ',' if candidates else ''}
+    hits ({NEIGHBOURHOOD_COLUMNS}) AS ({select}),
+    expansion AS (
+        SELECT g.hit_id, g.neighbour_id, MIN(g.hops) as hops, MAX(g.strength) as strength
+        FROM GRAPH_TABLE (code_dependency_graph
+            MATCH (a IS component) -[e IS depends_on]->{{1,{max(int(hops), 1)}}} (b IS component)
+            COLUMNS (a.id as hit_id, b.id as neighbour_id,
+                     COUNT(e.dependency_type) as hops, MIN(e.strength) as strength)
+        ) g
+        WHERE g.hit_id IN (SELECT id FROM hits) AND g.neighbour_id NOT IN (SELECT id FROM hits)
+        GROUP BY g.hit_id, g.neighbour_id
+    ),
+    scored AS (
+        SELECT x.hit_id, x.neighbour_id, x.hops, x.strength,
+               (1 - h.distance) * x.strength * POWER(:hop_decay, x.hops - 1) as score
+        FROM expansion x JOIN hits h ON h.id = x.hit_id
+    ),
+    ranked AS (
+        SELECT s.*, ROW_NUMBER() OVER (PARTITION BY s.neighbour_id ORDER BY s.score DESC, s.hops) as rn
+        FROM scored s
+    )
+    SELECT 'hit', h.id, h.id, h.file_path, h.component_type, h.component_name, h.namespace,
+           h.code_content, h.metadata, h.distance, 0, 1, 1 - h.distance
+    FROM hits h
+    UNION ALL
+    SELECT 'neighbour', c.id, r.hit_id, c.file_path, c.type, c.name, c.namespace,
+           NULL, NULL, NULL, r.hops, r.strength, r.score
+    FROM ranked r JOIN code_components c ON c.id = r.neighbour_id
+    WHERE r.rn = 1
+    """
+    return query, params
+
+def neighbourhood_rows(results: List[tuple], include_metadata: bool = True,
+                       neighbour_limit: Optional[int] = None) -> List[Dict]:
+    hits: Dict[str, Dict] = {}
+    neighbours: List[tuple] = []
+    for r in results:
+        if r[0] == 'hit':
+            hit = {'id': r[1], 'file_path': r[3], 'component_type': r[4],
+                   'component_name': r[5], 'namespace': r[6], 'code_content': r[7],
+                   'distance': float(r[9]), 'score': float(r[12]), 'neighbours': []}
+            if include_metadata:
+                hit['metadata'] = decode_json(r[8], {})
+            hits[r[1]] = hit
+        else:
+            neighbours.append(r)
+    for r in sorted(neighbours, key=lambda r: (-float(r[12]), int(r[10]), r[1])):
+        hit = hits.get(r[2])
+        if hit is not None and (neighbour_limit is None or len(hit['neighbours']) < neighbour_limit):
+            hit['neighbours'].append({'id': r[1], 'file_path': r[3], 'type': r[4], 'name': r[5],
+                                      'namespace': r[6], 'hops': int(r[10]), 'strength': float(r[11]),
+                                      'score': round(float(r[12]), 6)})
+    return sorted(hits.values(), key=lambda hit: hit['distance'])
+
+def component_row(results: List[tuple], include_metadata: bool = True) -> Optional[Dict]:
+    if results:
+        r = results[0]
+        row = {'id': r[0], 'file_path': r[1], 'component_type': r[2],
+               'component_name': r[3], 'namespace': r[4], 'code_content': r[5]}
+        if include_metadata:
+            row['metadata'] = decode_json(r[6], {})
+        return row
+    return None
 
 class OracleVectorStore:
     def __init__(self, oracle_manager):
         self.db = oracle_manager
         self.embedding_dim = oracle_manager.config.vector_embedding_dimension
+        self.codec = EmbeddingCodec.from_config(oracle_manager.config)
     
     def add_code_vector(
         self, component_id: str, file_path: str, component_type: str,
         component_name: str, namespace: str, code_content: str,
         embedding: List[float], metadata: Dict = None
     ):
-        query = """
-        INSERT INTO code_vectors (
-            id, file_path, component_type, component_name,
-            namespace, code_content, embedding, metadata
-        ) VALUES (
-            :id, :file_path, :component_type, :component_name,
-            :namespace, :code_content, :embedding, :metadata
-        )
-        """
-        vector_str = f"[{','.join(map(str, embedding))}]"
-        params = {
-            'id': component_id, 'file_path': file_path,
-            'component_type': component_type, 'component_name': component_name,
-            'namespace': namespace or '', 'code_content': code_content,
-            'embedding': vector_str, 'metadata': json.dumps(metadata or {})
-        }
-        self.db.execute_update(query, params)
+        params = code_vector_params(component_id, file_path, component_type, component_name,
+                                    namespace, code_content, embedding, metadata, self.codec)
+        self.db.execute_update(INSERT_CODE_VECTOR, params, METADATA_BINDS)
     
     def search_similar_code(
         self, query_embedding: List[float], top_k: int = 5,
-        component_type: Optional[str] = None
+        component_type: Optional[str] = None, offset: int = 0, include_metadata: bool = True
     ) -> List[Dict]:
-        vector_str = f"[{','.join(map(str, query_embedding))}]"
-        where_clause = f"WHERE component_type = '{component_type}'" if component_type else ""
-        query = f"""
-        SELECT id, file_path, component_type, component_name, namespace,
-               code_content, metadata, VECTOR_DISTANCE(embedding, :query_vector, COSINE) as distance
-        FROM code_vectors {where_clause}
-        ORDER BY VECTOR_DISTANCE(embedding, :query_vector, COSINE)
-        FETCH FIRST :top_k ROWS ONLY
-        """
-        results = self.db.execute_query(query, {'query_vector': vector_str, 'top_k': top_k})
-        return [
-            {'id': r[0], 'file_path': r[1], 'component_type': r[2],
-             'component_name': r[3], 'namespace': r[4], 'code_content': r[5],
-             'metadata': json.loads(r[6]) if r[6] else {}, 'distance': float(r[7])}
-            for r in results
-        ]
-    
-    def get_component_by_id(self, component_id: str) -> Optional[Dict]:
-        query = """
-        SELECT id, file_path, component_type, component_name, namespace, code_content, metadata
-        FROM code_vectors WHERE id = :id
-        """
-        results = self.db.execute_query(query, {'id': component_id})
-        if results:
-            r = results[0]
-            return {'id': r[0], 'file_path': r[1], 'component_type': r[2],
-                    'component_name': r[3], 'namespace': r[4], 'code_content': r[5],
-                    'metadata': json.loads(r[6]) if r[6] else {}}
-        return None
+        query, params = similar_code_statement(query_embedding, top_k, component_type, offset, include_metadata, self.codec)
+        return similar_code_rows(self.db.execute_query(query, params), include_metadata)
+    
+    def search_with_neighbourhood(
+        self, query_embedding: List[float], top_k: int = 5, hops: int = 2,
+        component_type: Optional[str] = None, offset: int = 0, include_metadata: bool = True,
+        neighbour_limit: Optional[int] = None, hop_decay: float = 0.5
+    ) -> List[Dict]:
+        query, params = neighbourhood_statement(query_embedding, top_k, hops, component_type, offset,
+                                                include_metadata, self.codec, hop_decay)
+        return neighbourhood_rows(self.db.execute_query(query, params), include_metadata, neighbour_limit)
+    
+    def get_component_by_id(self, component_id: str, include_metadata: bool = True) -> Optional[Dict]:
+        results = self.db.execute_query(component_by_id_query(include_metadata), {'id': component_id})
+        return component_row(results, include_metadata)
+    
+    def read_code_chunk(self, component_id: str, offset: int, length: int) -> Optional[Dict]:
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(SELECT_CODE_CONTENT, {'id': component_id})
+            row = cursor.fetchone()
+            if row is None:
+                cursor.close()
+                return None
+            lob = row[0]
+            total_length = lob.size()
+            content = lob.read(offset + 1, length) if offset < total_length else ''
+            cursor.close()
+            return {'content': content, 'offset': offset, 'total_length': total_length}
+    
+    def iter_stored_code(self, batch_size: int = 100):
+        for file_path, code_content in self.db.iter_query(SELECT_STORED_CODE, batch_size=batch_size):
+            yield {'path': file_path, 'content': code_content, 'size': len(code_content)}
+    
+    def stored_code_paths(self) -> Set[str]:
+        return {r[0] for r in self.db.execute_query(SELECT_STORED_CODE_PATHS)}
+    
+    def backfill_quantized_codes(self, batch_size: int = 500) -> int:
+        if not self.codec.quantized:
+            return 0
+        updated, batch = 0, []
+        params = stale_code_params(self.codec, self.embedding_dim)
+        for component_id, embedding in self.db.iter_query(SELECT_STALE_CODES, params, batch_size=batch_size):
+            batch.append({'id': component_id, 'embedding_q': self.codec.coarse(embedding)})
+            if len(batch) >= batch_size:
+                updated += self.db.execute_many(UPDATE_CODE_Q, batch, CODE_Q_BINDS)
+                batch = []
+        if batch:
+            updated += self.db.execute_many(UPDATE_CODE_Q, batch, CODE_Q_BINDS)
+        return updated
+    
+    def delete_code_vectors(self, component_ids: List[str]) -> int:
+        if not component_ids:
+            return 0
+        return self.db.execute_many(DELETE_CODE_VECTOR, [{'id': c} for c in component_ids])
+    
+    def iter_clone_sources(self, batch_size: int = 100):
+        for r in self.db.iter_query(SELECT_CLONE_SOURCES, batch_size=batch_size):
+            yield {'id': r[0], 'component_type': r[1], 'component_name': r[2], 'code_content': r[3], 'embedding': r[4]}
+
+class AsyncOracleVectorStore:
+    def __init__(self, async_oracle_manager):
+        self.db = async_oracle_manager
+        self.embedding_dim = async_oracle_manager.config.vector_embedding_dimension
+        self.codec = EmbeddingCodec.from_config(async_oracle_manager.config)
+    
+    async def add_code_vector(
+        self, component_id: str, file_path: str, component_type: str,
+        component_name: str, namespace: str, code_content: str,
+        embedding: List[float], metadata: Dict = None
+    ):
+        params = code_vector_params(component_id, file_path, component_type, component_name,
+                                    namespace, code_content, embedding, metadata, self.codec)
+        await self.db.execute_update(INSERT_CODE_VECTOR, params, METADATA_BINDS)
+    
+    async def search_similar_code(
+        self, query_embedding: List[float], top_k: int = 5,
+        component_type: Optional[str] = None, offset: int = 0, include_metadata: bool = True
+    ) -> List[Dict]:
+        query, params = similar_code_statement(query_embedding, top_k, component_type, offset, include_metadata, self.codec)
+        return similar_code_rows(await self.db.execute_query(query, params), include_metadata)
+    
+    async def search_with_neighbourhood(
+        self, query_embedding: List[float], top_k: int = 5, hops: int = 2,
+        component_type: Optional[str] = None, offset: int = 0, include_metadata: bool = True,
+        neighbour_limit: Optional[int] = None, hop_decay: float = 0.5
+    ) -> List[Dict]:
+        query, params = neighbourhood_statement(query_embedding, top_k, hops, component_type, offset,
+                                                include_metadata, self.codec, hop_decay)
+        return neighbourhood_rows(await self.db.execute_query(query, params), include_metadata, neighbour_limit)
+    
+    async def get_component_by_id(self, component_id: str, include_metadata: bool = True) -> Optional[Dict]:
+        results = await self.db.execute_query(component_by_id_query(include_metadata), {'id': component_id})
+        return component_row(results, include_metadata)
+    
+    async def read_code_chunk(self, component_id: str, offset: int, length: int) -> Optional[Dict]:
+        async with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            await cursor.execute(SELECT_CODE_CONTENT, {'id': component_id})
+            row = await cursor.fetchone()
+            if row is None:
+                cursor.close()
+                return None
+            lob = row[0]
+            total_length = await lob.size()
+            content = await lob.read(offset + 1, length) if offset < total_length else ''
+            cursor.close()
+            return {'content': content, 'offset': offset, 'total_length': total_length}
+    
+    async def iter_stored_code(self, batch_size: int = 100):
+        async for file_path, code_content in self.db.iter_query(SELECT_STORED_CODE, batch_size=batch_size):
+            yield {'path': file_path, 'content': code_content, 'size': len(code_content)}
+    
+    async def stored_code_paths(self) -> Set[str]:
+        return {r[0] for r in await self.db.execute_query(SELECT_STORED_CODE_PATHS)}
+    
+    async def backfill_quantized_codes(self, batch_size: int = 500) -> int:
+        if not self.codec.quantized:
+            return 0
+        updated, batch = 0, []
+        params = stale_code_params(self.codec, self.embedding_dim)
+        async for component_id, embedding in self.db.iter_query(SELECT_STALE_CODES, params, batch_size=batch_size):
+            batch.append({'id': component_id, 'embedding_q': self.codec.coarse(embedding)})
+            if len(batch) >= batch_size:
+                updated += await self.db.execute_many(UPDATE_CODE_Q, batch, CODE_Q_BINDS)
+                batch = []
+        if batch:
+            updated += await self.db.execute_many(UPDATE_CODE_Q, batch, CODE_Q_BINDS)
+        return updated
+    
+    async def delete_code_vectors(self, component_ids: List[str]) -> int:
+        if not component_ids:
+            return 0
+        return await self.db.execute_many(DELETE_CODE_VECTOR, [{'id': c} for c in component_ids])
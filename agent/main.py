@@ -8,27 +8,66 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from agent.orchestrator import MigrationOrchestrator
 from agent.config.settings import settings
+from agent.core.profiling import MODES, MODE_TRACE, profiler
 
 def main():
     parser = argparse.ArgumentParser(description='ASP.NET to Java/Angular Migration Agent')
     parser.add_argument('--test-connection', action='store_true', help='Test connections')
     parser.add_argument('--component', type=str, help='Migrate specific component')
     parser.add_argument('--type', type=str, choices=['controller', 'service', 'model', 'all'], default='all')
+    parser.add_argument('--resume', action='store_true', help='Resume the last interrupted run, skipping completed stages and components')
+    parser.add_argument('--incremental', action='store_true', help='Only re-migrate components changed since the last migrated commit, plus their dependents')
+    parser.add_argument('--bulk-load', action='store_true', help='Drop vector indexes during ingestion and rebuild them afterwards')
+    parser.add_argument('--report', nargs='?', const='', metavar='RUN_ID',
+                        help='Print component timing percentiles, slowest components and regressions for a run (default: latest)')
+    parser.add_argument('--baseline', type=str, metavar='RUN_ID', help='Run to compare against in --report (default: previous completed run)')
+    parser.add_argument('--profile', nargs='?', const=MODE_TRACE, choices=MODES,
+                        help='Write a Chrome-trace timeline of stages and client/store calls; '
+                             'cprofile or sample also profiles each stage')
+    parser.add_argument('--profile-dir', type=str, default='logs/profile', help='Directory for --profile output')
+    parser.add_argument('--serve-mcp', action='store_true', help='Run the MCP context server')
+    parser.add_argument('--transport', type=str, choices=['stdio', 'sse'], help='MCP transport (defaults to mcp.transport)')
     args = parser.parse_args()
     
     if args.test_connection:
         test_connections()
         return
     
+    if args.serve_mcp:
+        serve_mcp(args.transport or settings.mcp.transport)
+        return
+    
+    profiler.configure(args.profile, args.profile_dir)
     orchestrator = MigrationOrchestrator()
     try:
-        if args.component:
+        if args.report is not None:
+            orchestrator.print_performance_report(args.report or None, args.baseline)
+        elif args.component:
             print(f"Migrating component: {args.component}")
             orchestrator._migrate_controller(orchestrator._generate_id(args.component))
         else:
-            orchestrator.run_migration()
+            orchestrator.run_migration(resume=args.resume, incremental=args.incremental, bulk_load=args.bulk_load)
     finally:
         orchestrator.close()
+        profiler.finish()
+
+def serve_mcp(transport: str):
+    import asyncio
+    from agent.core.integrations.llm_client import LocalLLMClient
+    from agent.core.mcp.server import MigrationMCPServer
+    from agent.core.storage.oracle_manager import OracleManager
+    
+    oracle = OracleManager(settings.oracle)
+    mcp_config = settings.mcp.model_copy(update={'max_workers': min(settings.mcp.max_workers, settings.oracle.pool_size)})
+    server = MigrationMCPServer.from_oracle(oracle, LocalLLMClient(settings.llm), mcp_config)
+    try:
+        if transport == 'sse':
+            print(f"Serving MCP over SSE on http://{settings.mcp.host}:{settings.mcp.port}/sse")
+            asyncio.run(server.run_sse(settings.mcp.host, settings.mcp.port))
+        else:
+            asyncio.run(server.run())
+    finally:
+        oracle.close()
 
 def test_connections():
     print("Testing connections...")
@@ -1,19 +1,69 @@
 import os
+import re
 import hashlib
+import itertools
+import time
+from contextlib import contextmanager
+from collections import defaultdict
 from typing import Dict, List, Optional
 from pathlib import Path
 
 from agent.config.settings import settings
 from agent.core.integrations.bitbucket_client import BitbucketClient
 from agent.core.integrations.llm_client import LocalLLMClient
+from agent.core.metrics import STAGE_BUCKETS, MetricsExporter, metrics
+from agent.core.profiling import instrument, profiler, tracer
 from agent.core.storage.oracle_manager import OracleManager
+from agent.core.storage.pool_telemetry import current_stage
+from agent.core.storage.run_report import TIMING_BINDS, ComponentTiming
 from agent.core.parsers.csharp_parser import CSharpParser
+from agent.core.parsers.parse_stage import ParseStage
+from agent.core.parsers.symbol_index import SymbolIndex
+from agent.core.parsers.clone_detector import CloneDetector, apply_substitutions, substitution_conflict
+from agent.core.parsers.sql_parser import NameResolver
+from agent.core.parsers.table_usage import TableUsageIndex
 from agent.core.parsers.guideline_parser import GuidelineParser
 from agent.core.generators.java_generator import JavaGenerator
 from agent.core.generators.angular_generator import AngularGenerator
+from agent.core.generators.output_writer import OutputWriter
+from agent.core.generators.generation_engine import GenerationEngine
+from agent.core.generators.prompt_builder import group_by_prefix, prefix_key
 import pyodbc
 import json
 
+JAVA_CLASS_NAME = re.compile(r'public\s+class\s+(\w+)')
+PROCEDURE_EDGE_TYPES = ('READS', 'WRITES', 'CALLS')
+PROCEDURE_BATCH_SIZE = 200
+TRACED_ORACLE_METHODS = ['execute_query', 'execute_update', 'execute_many', 'iter_query', 'commit']
+TRACED_STORES = ('vector_store', 'graph_store', 'schema_store', 'run_ledger', 'cluster_store', 'context_store',
+                 'usage_store', 'index_manager', 'run_report')
+
+SELECT_PROCEDURE_MODULES = """
+SELECT s.name, p.name, m.definition
+FROM sys.procedures p
+JOIN sys.schemas s ON s.schema_id = p.schema_id
+JOIN sys.sql_modules m ON m.object_id = p.object_id
+ORDER BY s.name, p.name
+"""
+
+INSERT_MIGRATION_LOG = """
+INSERT INTO migration_logs (component_id, component_type, migration_status, start_time, end_time,
+    duration_ms, context_ms, generation_ms, write_ms, generation_tier,
+    generated_code, error_message, output_path, content_hash, derived_from, run_id)
+VALUES (:id, :type, :status, :start_time, :end_time, :duration_ms, :context_ms, :generation_ms, :write_ms, :tier,
+    :code, :error, :output_path, :content_hash, :derived_from, :run_id)
+"""
+
+MERGE_FILE_MAPPING = """
+MERGE INTO file_mappings m
+USING (SELECT :new_file_path as new_file_path FROM dual) src
+ON (m.new_file_path = src.new_file_path)
+WHEN MATCHED THEN UPDATE SET old_file_path = :old_file_path, component_type = :component_type,
+    migration_status = :status, content_hash = :content_hash, updated_at = SYSTIMESTAMP
+WHEN NOT MATCHED THEN INSERT (old_file_path, new_file_path, component_type, migration_status, content_hash)
+    VALUES (:old_file_path, :new_file_path, :component_type, :status, :content_hash)
+"""
+
 class MigrationOrchestrator:
     def __init__(self):
         self.bitbucket = BitbucketClient(
@@ -23,55 +73,270 @@ class MigrationOrchestrator:
         self.llm = LocalLLMClient(settings.llm)
         self.oracle = OracleManager(settings.oracle)
         self.parser = CSharpParser()
+        self.parse_stage = ParseStage(settings.pipeline.parse_workers, settings.pipeline.parse_chunk_size)
         self.guideline_parser = GuidelineParser()
         self.java_generator = JavaGenerator(settings.migration.target_backend_package)
         self.angular_generator = AngularGenerator(settings.migration.target_frontend_path)
+        self.generation_engine = GenerationEngine(self.java_generator, self.llm, settings.generation, settings.llm)
+        self.output_writer = OutputWriter(settings.pipeline.output_batch_size, on_batch=self._record_outputs)
         self.guidelines = None
         self.schema_context = None
+        self.run_id = None
+        self.resuming = False
+        self.completed_stages = set()
+        self.source_commit = None
+        self.base_commit = None
+        self.affected_components = None
+        self._instrument()
+    
+    def _instrument(self):
+        if not tracer.enabled:
+            return
+        instrument(self.bitbucket, 'bitbucket')
+        instrument(self.llm, 'llm')
+        instrument(self.oracle, 'oracle', TRACED_ORACLE_METHODS)
+        for name in TRACED_STORES:
+            instrument(getattr(self.oracle, name), 'store')
+        instrument(self.generation_engine, 'generation', ['generate'])
+        instrument(self.output_writer, 'output', ['submit', 'flush'])
     
-    def run_migration(self):
+    def run_migration(self, resume: bool = False, incremental: bool = False, bulk_load: bool = False):
         print("=" * 60)
         print("MIGRATION AGENT - Starting")
         print("=" * 60)
         
-        print("\n[1/6] Fetching code from Bitbucket...")
-        code_files = self._fetch_old_code()
-        print(f"✓ Fetched {len(code_files)} files")
-        
-        print("\n[2/6] Parsing code and storing in Oracle...")
-        self._parse_and_store_code(code_files)
-        print(f"✓ Stored {len(code_files)} components")
-        
-        print("\n[3/6] Extracting SQL Server schema...")
-        self._extract_sql_server_schema()
-        print("✓ Schema extracted and stored as context")
-        
-        print("\n[4/6] Parsing coding guidelines...")
-        self._parse_guidelines()
-        print("✓ Guidelines loaded")
-        
-        print("\n[5/6] Migrating components...")
-        self._migrate_all_components()
-        print("✓ Components migrated")
-        
-        print("\n[6/6] Generating migration report...")
-        self._generate_report()
+        self._start_run(resume)
+        exporter = MetricsExporter(metrics, settings.metrics).start()
+        try:
+            self._resolve_source_revision(incremental)
+            with self._bulk_load(bulk_load or settings.pipeline.bulk_load):
+                self._run_stage('ingest', self._ingest_code)
+                
+                print("\n[3/8] Extracting SQL Server schema...")
+                if self._run_stage('schema', self._ingest_schema):
+                    print(f"✓ Schema extracted and stored as context (ingestion generation {self.oracle.get_ingestion_generation()})")
+            self._backfill_quantized_codes()
+            
+            print("\n[4/8] Clustering near-duplicate components...")
+            if settings.dedup.enabled:
+                self._run_stage('dedup', self._cluster_components)
+            else:
+                print("↷ Skipping dedup: disabled")
+            
+            print("\n[5/8] Parsing coding guidelines...")
+            self._parse_guidelines()
+            print("✓ Guidelines loaded")
+            
+            print("\n[6/8] Materializing component context bundles...")
+            self._run_stage('context', self._materialize_contexts)
+            
+            print("\n[7/8] Migrating components...")
+            if self._run_stage('migrate', self._migrate_all_components):
+                print("✓ Components migrated")
+            
+            print("\n[8/8] Generating migration report...")
+            with self._stage('report'):
+                self._generate_report()
+        except BaseException:
+            self.oracle.run_ledger.finish_run(self.run_id, 'FAILED')
+            print(f"\nRun {self.run_id} failed; continue it with --resume")
+            raise
+        finally:
+            exporter.stop()
+        self.oracle.run_ledger.finish_run(self.run_id, 'COMPLETED')
         
         print("\n" + "=" * 60)
         print("MIGRATION COMPLETE")
         print("=" * 60)
     
-    def _fetch_old_code(self) -> List[Dict]:
+    def _start_run(self, resume: bool):
+        ledger = self.oracle.run_ledger
+        run_id = ledger.resumable_run() if resume else None
+        if run_id:
+            ledger.resume_run(run_id)
+            self.run_id, self.resuming = run_id, True
+            self.completed_stages = ledger.completed_stages(run_id)
+            print(f"Resuming run {run_id} (completed stages: {', '.join(sorted(self.completed_stages)) or 'none'})")
+        else:
+            if resume:
+                print("No interrupted run found; starting a new run")
+            self.run_id = ledger.start_run()
+            print(f"Run {self.run_id}")
+    
+    def _resolve_source_revision(self, incremental: bool):
+        repo_slug, branch = settings.migration.source_repo_slug, settings.migration.source_branch
+        ledger = self.oracle.run_ledger
+        source = ledger.run_source(self.run_id) if self.resuming else None
+        if source is None:
+            base_commit = ledger.last_migrated_commit(repo_slug, branch) if incremental else None
+            if incremental and base_commit is None:
+                print("No previously migrated commit recorded; running a full migration")
+            source = {'source_commit': self.bitbucket.get_branch_head(repo_slug, branch),
+                      'base_commit': base_commit, 'metadata': {}}
+            ledger.record_source(self.run_id, repo_slug, branch, source['source_commit'], base_commit)
+        self.source_commit, self.base_commit = source['source_commit'], source['base_commit']
+        if 'affected_components' in source['metadata']:
+            self.affected_components = set(source['metadata']['affected_components'])
+        if self.base_commit:
+            print(f"Incremental run {self.base_commit[:12]}..{self.source_commit[:12]}")
+    
+    @contextmanager
+    def _bulk_load(self, enabled: bool):
+        indexes = self.oracle.index_manager
+        if {'ingest', 'schema'} <= self.completed_stages:
+            missing = indexes.missing_vector_indexes()
+            if missing:
+                print(f"Vector indexes {', '.join(missing)} are missing after a completed ingestion; rebuilding")
+                self._rebuild_vector_indexes(indexes)
+            yield
+            return
+        if not enabled or self.base_commit:
+            yield
+            return
+        dropped = indexes.drop_vector_indexes()
+        print(f"Bulk-load mode: dropped vector indexes {', '.join(dropped) or '(none present)'}")
+        try:
+            yield
+        except BaseException:
+            print("Bulk-load mode: ingestion did not finish, vector indexes are still dropped; "
+                  "run with --resume --bulk-load to complete ingestion and rebuild them")
+            raise
+        self._rebuild_vector_indexes(indexes)
+    
+    def _backfill_quantized_codes(self):
+        store = self.oracle.vector_store
+        if not store.codec.quantized:
+            return
+        with self._stage('quantize'), self.oracle.session(settings.oracle.session_commit_every):
+            updated = store.backfill_quantized_codes()
+        if updated:
+            print(f"✓ Backfilled {store.codec.quantization} codes for {updated} stored code vectors")
+    
+    def _rebuild_vector_indexes(self, indexes):
+        with self._stage('index_rebuild'):
+            timings = indexes.create_vector_indexes()
+            for name, seconds in timings.items():
+                print(f"  Rebuilt {name} ({settings.oracle.vector_index_type}) in {seconds:.1f}s")
+            print(f"  Gathered optimizer statistics in {indexes.gather_statistics():.1f}s")
+    
+    @contextmanager
+    def _stage(self, name: str):
+        metrics.set('stage_active', 1, stage=name)
+        started = time.perf_counter()
+        try:
+            with profiler.stage(name), self.oracle.stage(name):
+                yield
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.set('stage_active', 0, stage=name)
+            metrics.observe('stage_seconds', elapsed, STAGE_BUCKETS, stage=name)
+            metrics.set('stage_throughput', metrics.get('stage_items_total', stage=name) / elapsed if elapsed else 0.0, stage=name)
+    
+    def _count_items(self, count: int = 1):
+        metrics.inc('stage_items_total', count, stage=current_stage.get())
+    
+    def _run_stage(self, name: str, func) -> bool:
+        if name in self.completed_stages:
+            print(f"↷ Skipping {name}: completed in run {self.run_id}")
+            return False
+        self.oracle.run_ledger.start_stage(self.run_id, name)
+        try:
+            with self._stage(name):
+                func()
+        except BaseException:
+            try:
+                self.oracle.run_ledger.fail_stage(self.run_id, name)
+            except Exception as e:
+                print(f"Warning: Could not record failure of stage {name}: {e}")
+            raise
+        self.oracle.run_ledger.complete_stage(self.run_id, name)
+        self.completed_stages.add(name)
+        return True
+    
+    def _ingest_code(self):
+        if self.base_commit:
+            self._ingest_changes()
+            return
+        stored_paths = set()
+        if self.resuming:
+            stored_paths = self.oracle.vector_store.stored_code_paths()
+        print("\n[1/8] Fetching code from Bitbucket...")
+        with self._stage('fetch'):
+            code_files = self._fetch_old_code(stored_paths)
+            self._count_items(len(code_files))
+        print(f"✓ Fetched {len(code_files)} files" + (f" ({len(stored_paths)} already stored)" if stored_paths else ""))
+        
+        print("\n[2/8] Parsing code and storing in Oracle...")
+        with self.oracle.session(settings.oracle.session_commit_every):
+            self._parse_and_store_code(code_files, reparse_stored=bool(stored_paths))
+        print(f"✓ Stored {len(code_files)} components")
+    
+    def _ingest_changes(self):
+        print(f"\n[1/8] Fetching changes {self.base_commit[:12]}..{self.source_commit[:12]} from Bitbucket...")
+        code_files, removed_paths = [], []
+        if self.base_commit != self.source_commit:
+            with self._stage('fetch'):
+                code_files, removed_paths = self.bitbucket.fetch_changed_code_files(
+                    settings.migration.source_repo_slug, self.base_commit, self.source_commit,
+                    settings.migration.source_path_pattern
+                )
+                self._count_items(len(code_files))
+        print(f"✓ Fetched {len(code_files)} changed files, {len(removed_paths)} removed")
+        
+        print("\n[2/8] Re-ingesting changed components and their dependents...")
+        changed_ids = [self._generate_id(f['path']) for f in code_files]
+        removed_ids = [self._generate_id(path) for path in removed_paths]
+        affected = self._collect_dependents(changed_ids + removed_ids)
+        if affected:
+            with self.oracle.session(settings.oracle.session_commit_every):
+                self.oracle.vector_store.delete_code_vectors(removed_ids)
+                self.oracle.graph_store.delete_dependencies(sorted(affected))
+                self._parse_and_store_code(code_files, reparse_stored=True, exclude_paths=set(removed_paths),
+                                           edge_ids=affected)
+            affected |= self._collect_dependents(changed_ids)
+        affected.difference_update(removed_ids)
+        self.affected_components = affected
+        self.oracle.run_ledger.update_metadata(self.run_id, {
+            'changed_files': len(code_files), 'removed_files': len(removed_paths),
+            'affected_components': sorted(affected)
+        })
+        print(f"✓ Re-ingested {len(code_files)} components; {len(affected)} components to migrate")
+    
+    def _collect_dependents(self, component_ids: List[str]) -> set:
+        dependents = self.oracle.graph_store.get_dependents_of(component_ids, settings.pipeline.dependents_depth)
+        return set(component_ids) | dependents
+    
+    def _ingest_schema(self):
+        with self.oracle.session(settings.oracle.session_commit_every):
+            self._extract_sql_server_schema()
+        self.oracle.bump_ingestion_generation()
+    
+    def _fetch_old_code(self, skip_paths: Optional[set] = None) -> List[Dict]:
         return self.bitbucket.fetch_code_files(
             repo_slug=settings.migration.source_repo_slug,
-            branch=settings.migration.source_branch,
-            path_pattern=settings.migration.source_path_pattern
+            branch=self.source_commit or settings.migration.source_branch,
+            path_pattern=settings.migration.source_path_pattern,
+            skip_paths=skip_paths
         )
     
-    def _parse_and_store_code(self, code_files: List[Dict]):
-        for file_data in code_files:
-            component = self.parser.parse_code(file_data['content'], file_data['path'])
-            component_id = self._generate_id(file_data['path'])
+    def _parse_and_store_code(self, code_files: List[Dict], reparse_stored: bool = False, exclude_paths: set = frozenset(),
+                              edge_ids: Optional[set] = None):
+        symbols = SymbolIndex()
+        parsed_components = []
+        fetched_paths = {f['path'] for f in code_files}
+        sources = code_files
+        if reparse_stored:
+            stored = (f for f in self.oracle.vector_store.iter_stored_code()
+                      if f['path'] not in fetched_paths and f['path'] not in exclude_paths)
+            sources = itertools.chain(code_files, stored)
+        for component in self.parse_stage.iter_parsed(sources):
+            component_id = self._generate_id(component.file_path)
+            if component.file_path not in fetched_paths:
+                symbols.add_component(component_id, component)
+                component.code = ''
+                parsed_components.append((component_id, component))
+                continue
+            started = time.perf_counter()
             embedding = self.llm.generate_embedding(component.code)
             
             self.oracle.vector_store.add_code_vector(
@@ -82,17 +347,33 @@ class MigrationOrchestrator:
                 namespace=component.namespace,
                 code_content=component.code,
                 embedding=embedding,
-                metadata={'methods': component.methods, 'properties': component.properties, 'dependencies': component.dependencies}
+                metadata={'methods': component.methods, 'properties': component.properties, 'dependencies': component.dependencies,
+                          'classes': [c.full_name for c in component.classes], 'usings': component.usings}
             )
             
             self.oracle.graph_store.create_component_node(
                 component_id=component_id, name=component.name,
-                component_type=component.type, namespace=component.namespace, file_path=component.file_path
+                component_type=component.type, namespace=component.namespace, file_path=component.file_path,
+                metadata={'classes': [{'name': c.full_name, 'kind': c.kind} for c in component.classes]}
             )
             
-            for dep in component.dependencies:
-                dep_id = self._generate_id(dep)
-                self.oracle.graph_store.create_dependency(from_id=component_id, to_id=dep_id, dependency_type='USES')
+            symbols.add_component(component_id, component)
+            component.code = ''
+            parsed_components.append((component_id, component))
+            metrics.observe('component_seconds', time.perf_counter() - started, stage='ingest', type=component.type)
+            self._count_items()
+        
+        self._store_dependency_edges(symbols, parsed_components, edge_ids)
+    
+    def _store_dependency_edges(self, symbols: SymbolIndex, parsed_components: List, edge_ids: Optional[set] = None):
+        for _, component in parsed_components:
+            symbols.register_implementations(component)
+        edges = []
+        for component_id, component in parsed_components:
+            if edge_ids is None or component_id in edge_ids:
+                edges.extend(symbols.dependency_edges(component_id, component))
+        self.oracle.graph_store.create_dependencies(edges)
+        print(f"  Resolved {len(edges)} dependency edges across {len(symbols.by_full_name)} symbols")
     
     def _extract_sql_server_schema(self):
         conn_str = (
@@ -123,12 +404,69 @@ class MigrationOrchestrator:
         for table_key, table_data in tables.items():
             self.oracle.schema_store.add_table_schema(table_data['schema'], table_data['name'], table_data['columns'])
         
-        cursor.execute("SELECT ROUTINE_SCHEMA, ROUTINE_NAME, ROUTINE_DEFINITION FROM INFORMATION_SCHEMA.ROUTINES WHERE ROUTINE_TYPE = 'PROCEDURE'")
-        for row in cursor.fetchall():
-            self.oracle.schema_store.add_stored_procedure(row[0], row[1], [], row[2])
+        cursor.execute(SELECT_PROCEDURE_MODULES)
+        rows = (row for batch in iter(lambda: cursor.fetchmany(PROCEDURE_BATCH_SIZE), []) for row in batch)
+        procedures, batch = [], []
+        for parsed in self.parse_stage.iter_parsed_procedures((r[0], r[1], r[2]) for r in rows):
+            batch.append({'schema_name': parsed.schema_name, 'proc_name': parsed.proc_name, 'parameters': parsed.parameters,
+                          'tables': parsed.tables, 'definition': parsed.definition})
+            parsed.definition = ''
+            procedures.append(parsed)
+            if len(batch) >= PROCEDURE_BATCH_SIZE:
+                self.oracle.schema_store.add_stored_procedures(batch)
+                batch = []
+        self.oracle.schema_store.add_stored_procedures(batch)
         
         conn.close()
         self.schema_context = tables
+        self._count_items(len(tables) + len(procedures))
+        self._store_procedure_graph(tables, procedures)
+        self._index_table_usage(tables, procedures)
+    
+    def _schema_node_id(self, kind: str, schema: str, name: str) -> str:
+        return self._generate_id(f"sqlserver://{kind}/{schema}.{name}".lower())
+    
+    def _store_procedure_graph(self, tables: Dict, procedures: List):
+        node_id = self._schema_node_id
+        resolve_table = NameResolver((t['schema'], t['name']) for t in tables.values()).resolve
+        resolve_procedure = NameResolver((p.schema_name, p.proc_name) for p in procedures).resolve
+        nodes = [{'id': node_id('table', t['schema'], t['name']), 'name': t['name'], 'type': 'table', 'namespace': t['schema']}
+                 for t in tables.values()]
+        nodes.extend({'id': node_id('procedure', p.schema_name, p.proc_name), 'name': p.proc_name, 'type': 'procedure',
+                      'namespace': p.schema_name, 'metadata': {'parameters': p.parameters}} for p in procedures)
+        edges = []
+        for procedure in procedures:
+            proc_id = node_id('procedure', procedure.schema_name, procedure.proc_name)
+            for dependency_type, references, resolve, kind in (('READS', procedure.reads, resolve_table, 'table'),
+                                                               ('WRITES', procedure.writes, resolve_table, 'table'),
+                                                               ('CALLS', procedure.calls, resolve_procedure, 'procedure')):
+                for reference in references:
+                    target = resolve(*reference)
+                    if target:
+                        edges.append({'from_id': proc_id, 'to_id': node_id(kind, *target), 'dependency_type': dependency_type})
+        
+        graph_store = self.oracle.graph_store
+        graph_store.create_component_nodes(nodes)
+        graph_store.delete_dependencies_of_type(list(PROCEDURE_EDGE_TYPES))
+        edges = list({(e['from_id'], e['to_id'], e['dependency_type']): e for e in edges}.values())
+        graph_store.create_dependencies(edges)
+        print(f"  Parsed {len(procedures)} stored procedures; stored {len(nodes)} schema nodes and {len(edges)} procedure edges")
+    
+    def _index_table_usage(self, tables: Dict, procedures: List):
+        index = TableUsageIndex(((t['schema'], t['name']) for t in tables.values()),
+                                {(p.schema_name, p.proc_name): p.tables for p in procedures})
+        for component in self.parse_stage.iter_parsed(self.oracle.vector_store.iter_stored_code()):
+            index.add(self._generate_id(component.file_path), component)
+        dependencies = defaultdict(list)
+        for from_id, edge in self.oracle.context_store.iter_edges():
+            dependencies[from_id].append(edge['id'])
+        rows = index.build(dependencies, settings.pipeline.table_usage_depth)
+        self.oracle.usage_store.replace_usage(rows)
+        calls = [{'from_id': component_id, 'to_id': self._schema_node_id('procedure', *procedure), 'dependency_type': 'CALLS'}
+                 for component_id in index.references for procedure in index.procedure_calls(component_id)]
+        self.oracle.graph_store.create_dependencies(calls)
+        print(f"  Indexed {len(rows)} component-table usages and {len(calls)} procedure calls "
+              f"across {len(index.references)} components")
     
     def _parse_guidelines(self):
         backend_readme_path = os.path.join(settings.migration.target_backend_path, "README.md")
@@ -146,46 +484,197 @@ class MigrationOrchestrator:
         
         self.guidelines = {'backend': backend_guidelines, 'frontend': frontend_guidelines}
     
+    def _cluster_components(self):
+        config = settings.dedup
+        detector = CloneDetector(config.num_perm, config.bands, config.shingle_size, config.jaccard_threshold,
+                                 config.embedding_threshold, config.derive_min_similarity)
+        for source in self.oracle.vector_store.iter_clone_sources():
+            detector.add(source['id'], source['component_type'], source['component_name'],
+                         source['code_content'], source['embedding'])
+        members = detector.clusters()
+        self._count_items(len(detector))
+        self.oracle.cluster_store.replace_clusters(members)
+        derivable = sum(1 for m in members if m['representative_id'] != m['component_id'])
+        print(f"✓ {len({m['cluster_id'] for m in members})} near-duplicate clusters across {len(detector)} components; "
+              f"{derivable} can be derived by substitution")
+    
     def _migrate_all_components(self):
-        controllers = self.oracle.db.execute_query("SELECT id, component_name, file_path FROM code_vectors WHERE component_type = 'controller'")
+        migrated = self.oracle.run_ledger.successful_components(self.run_id) if self.resuming else set()
+        if migrated:
+            print(f"  Skipping {len(migrated)} components already migrated in run {self.run_id}")
+        clusters = self.oracle.cluster_store.get_clusters() if settings.dedup.enabled else {}
+        controllers = self.oracle.execute_query("SELECT id, component_name, file_path FROM code_vectors WHERE component_type = 'controller'")
+        bundles = dict(self.oracle.context_store.iter_bundles(self.oracle.get_ingestion_generation()))
+        pending, derived = [], []
         for row in controllers:
             component_id, name, file_path = row
-            print(f"  Migrating controller: {name}")
+            if component_id in migrated:
+                continue
+            if self.affected_components is not None and component_id not in self.affected_components:
+                continue
+            item = {'id': component_id, 'name': name, 'file_path': file_path}
+            cluster = clusters.get(component_id)
+            if cluster and cluster['representative_id'] != component_id:
+                derived.append({**item, 'cluster': cluster})
+                continue
+            item['context'] = bundles.get(component_id) or self._build_migration_context(component_id)
+            pending.append(item)
+        groups = group_by_prefix(pending, key=lambda item: prefix_key('controller', item['context']))
+        print(f"  Scheduled {len(pending)} controllers in {len(groups)} shared-prefix groups, "
+              f"{len(derived)} derived from near-duplicates")
+        representatives = {item['cluster']['representative_id'] for item in derived}
+        generated = {}
+        for item in itertools.chain.from_iterable(groups):
+            print(f"  Migrating controller: {item['name']}")
+            started, status, timing = time.perf_counter(), 'SUCCESS', ComponentTiming()
             try:
-                self._migrate_controller(component_id)
-                print(f"  ✓ {name}")
+                with tracer.span(item['name'], 'component'):
+                    java_code = self._migrate_controller(item['id'], item['context'], timing)
+                if item['id'] in representatives:
+                    generated[item['id']] = java_code
+                print(f"  ✓ {item['name']}")
             except Exception as e:
-                print(f"  ✗ {name}: {e}")
-    
-    def _migrate_controller(self, component_id: str):
-        component = self.oracle.vector_store.get_component_by_id(component_id)
-        if not component:
-            raise ValueError(f"Component {component_id} not found")
-        
-        deps = self.oracle.graph_store.get_dependencies(component_id)
-        context = self._build_migration_context(component, deps)
-        java_code = self._generate_java_controller(component, context)
-        self._save_generated_code('controller', component['component_name'], java_code)
-        
-        self.oracle.db.execute_update("""
-            INSERT INTO migration_logs (component_id, component_type, migration_status, start_time, end_time, generated_code)
-            VALUES (:id, :type, :status, SYSTIMESTAMP, SYSTIMESTAMP, :code)
-        """, {'id': component_id, 'type': 'controller', 'status': 'SUCCESS', 'code': java_code})
-    
-    def _build_migration_context(self, component: Dict, dependencies: List[Dict]) -> Dict:
-        related_tables = []
-        for dep in dependencies:
-            if 'Repository' in dep['name']:
-                entity = dep['name'].replace('Repository', '')
-                table_schema = self.oracle.schema_store.get_table_schema(entity)
-                if table_schema:
-                    related_tables.append(table_schema)
+                status = 'FAILED'
+                print(f"  ✗ {item['name']}: {e}")
+                self._log_migration(item['id'], 'controller', 'FAILED', error_message=str(e), timing=timing)
+            metrics.observe('component_seconds', time.perf_counter() - started, stage='migrate', type='controller', status=status)
+            self._count_items()
+        for item in derived:
+            self._count_items()
+            timing = ComponentTiming()
+            try:
+                self._derive_controller(item, generated, timing)
+                print(f"  ✓ {item['name']} (derived)")
+            except Exception as e:
+                print(f"  ↷ {item['name']}: cannot derive ({e}); migrating directly")
+                try:
+                    self._migrate_controller(item['id'], timing=timing)
+                    print(f"  ✓ {item['name']}")
+                except Exception as e:
+                    print(f"  ✗ {item['name']}: {e}")
+                    self._log_migration(item['id'], 'controller', 'FAILED', error_message=str(e), timing=timing)
+        stats = self.output_writer.flush()
+        print(f"  Output: {stats['written']} written, {stats['unchanged']} unchanged, {stats['failed']} failed")
+    
+    def _migrate_controller(self, component_id: str, context: Optional[Dict] = None,
+                            timing: Optional[ComponentTiming] = None):
+        timing = timing or ComponentTiming()
+        with timing.phase('context'):
+            component = self.oracle.vector_store.get_component_by_id(component_id, include_metadata=False)
+            if not component:
+                raise ValueError(f"Component {component_id} not found")
+            if context is None:
+                context = self._build_migration_context(component_id)
+        with timing.phase('generation'):
+            java_code = self._generate_java_controller(component, context, timing)
+        self._save_generated_code('controller', component['component_name'], java_code, {
+            'component_id': component_id, 'component_type': 'controller', 'source_path': component['file_path'],
+            'timing': timing
+        })
+        return java_code
+    
+    def _derive_controller(self, item: Dict, generated: Dict[str, str], timing: Optional[ComponentTiming] = None):
+        timing = timing or ComponentTiming()
+        representative_id = item['cluster']['representative_id']
+        with timing.phase('context'):
+            base_code = generated.get(representative_id) or self.oracle.run_ledger.latest_generated_code(representative_id)
+        if not base_code:
+            raise ValueError(f"representative {representative_id} has no generated code")
+        conflict = substitution_conflict(base_code, item['cluster']['substitutions'])
+        if conflict:
+            raise ValueError(conflict)
+        with timing.phase('generation'):
+            java_code = apply_substitutions(base_code, item['cluster']['substitutions'])
+        timing.tier = 'derived'
+        self._save_generated_code('controller', item['name'], java_code, {
+            'component_id': item['id'], 'component_type': 'controller', 'source_path': item['file_path'],
+            'derived_from': representative_id, 'timing': timing
+        })
+    
+    def _migration_log_params(self, component_id: str, component_type: str, status: str,
+                              generated_code: Optional[str] = None, error_message: Optional[str] = None,
+                              output_path: Optional[str] = None, content_hash: Optional[str] = None,
+                              derived_from: Optional[str] = None, timing: Optional[ComponentTiming] = None,
+                              end_time=None, write_ms: float = 0.0) -> Dict:
+        return {'id': component_id, 'type': component_type, 'status': status, 'code': generated_code,
+                'error': error_message, 'output_path': output_path, 'content_hash': content_hash,
+                'derived_from': derived_from, 'run_id': self.run_id,
+                **(timing or ComponentTiming()).log_params(end_time, write_ms)}
+    
+    def _log_migration(self, component_id: str, component_type: str, status: str, **details):
+        self.oracle.execute_update(INSERT_MIGRATION_LOG, self._migration_log_params(component_id, component_type, status, **details),
+                                   TIMING_BINDS)
+    
+    def _record_outputs(self, results: List[Dict]):
+        logs, mappings = [], []
+        for result in results:
+            context = result['context']
+            status = 'FAILED' if result['status'] == 'FAILED' else 'SUCCESS'
+            logs.append(self._migration_log_params(
+                context['component_id'], context['component_type'], status,
+                generated_code=context['generated_code'], error_message=result.get('error'),
+                output_path=result['path'], content_hash=result['content_hash'],
+                derived_from=context.get('derived_from'), timing=context.get('timing'),
+                end_time=result.get('finished_at'), write_ms=result.get('write_ms', 0.0)
+            ))
+            mappings.append({'old_file_path': context['source_path'], 'new_file_path': result['path'],
+                             'component_type': context['component_type'], 'status': status,
+                             'content_hash': result['content_hash']})
+            label = {'WRITTEN': 'Saved', 'UNCHANGED': 'Unchanged'}.get(result['status'], 'Failed')
+            print(f"    {label}: {result['path']}" + (f" ({result['error']})" if result.get('error') else ""))
+        self.oracle.execute_many(INSERT_MIGRATION_LOG, logs, TIMING_BINDS)
+        self.oracle.execute_many(MERGE_FILE_MAPPING, mappings)
+    
+    def _materialize_contexts(self):
+        context_store = self.oracle.context_store
+        generation = self.oracle.get_ingestion_generation()
+        tables = {(t['schema_name'], t['table_name']): t for t in self.oracle.schema_store.iter_all_tables()}
+        resolve_table = NameResolver(tables).resolve
+        procedures_by_table = defaultdict(list)
+        for procedure in self.oracle.schema_store.iter_all_procedures():
+            summary = {'schema_name': procedure['schema_name'], 'proc_name': procedure['proc_name'],
+                       'parameters': procedure['parameters']}
+            for table in dict.fromkeys(resolve_table(t['schema_name'], t['table_name']) for t in procedure['tables']):
+                if table:
+                    procedures_by_table[table].append(summary)
+        usage = defaultdict(list)
+        for row in self.oracle.usage_store.iter_usage(settings.pipeline.table_usage_depth):
+            table = (row['schema_name'], row['table_name'])
+            if table in tables:
+                usage[row['component_id']].append(table)
+        edges = defaultdict(list)
+        for from_id, edge in context_store.iter_edges():
+            edges[from_id].append(edge)
+        
+        def bundles():
+            for component in context_store.iter_components('controller'):
+                related = usage.get(component['id'], [])
+                procedures = {(p['schema_name'], p['proc_name']): p for t in related for p in procedures_by_table.get(t, [])}
+                yield component['id'], {
+                    'component': component, 'dependencies': edges.get(component['id'], []),
+                    'database_schema': [tables[t] for t in related],
+                    'procedures': list(procedures.values()), 'guidelines': self.guidelines['backend'],
+                    'package_base': settings.migration.target_backend_package
+                }
+        
+        count, total_bytes = context_store.write_bundles(bundles(), generation)
+        self._count_items(count)
+        context_store.purge_stale(generation)
+        print(f"✓ Materialized {count} context bundles ({total_bytes / 1024:.1f} KB compressed, generation {generation})")
+    
+    def _build_migration_context(self, component_id: str) -> Dict:
+        dependencies = self.oracle.graph_store.get_dependencies(component_id)
+        related_tables = self.oracle.usage_store.get_component_tables(component_id, settings.pipeline.table_usage_depth)
         return {'dependencies': dependencies, 'guidelines': self.guidelines['backend'], 'database_schema': related_tables, 'package_base': settings.migration.target_backend_package}
     
-    def _generate_java_controller(self, component: Dict, context: Dict) -> str:
-        return self.java_generator.generate_controller(component, context)
+    def _generate_java_controller(self, component: Dict, context: Dict, timing: Optional[ComponentTiming] = None) -> str:
+        java_code, complexity = self.generation_engine.generate(component, context)
+        if timing is not None:
+            timing.tier = complexity.tier
+        print(f"    Generated via {complexity.describe()}")
+        return java_code
     
-    def _save_generated_code(self, component_type: str, component_name: str, code: str):
+    def _output_file(self, component_type: str, component_name: str, code: str) -> Path:
         if component_type == 'controller':
             base_path = Path(settings.migration.target_backend_path)
             package_path = settings.migration.target_backend_package.replace('.', '/')
@@ -193,28 +682,94 @@ class MigrationOrchestrator:
         else:
             output_dir = Path(settings.migration.target_backend_path) / "src" / "main" / "java"
         
-        output_dir.mkdir(parents=True, exist_ok=True)
-        import re
-        class_match = re.search(r'public\s+class\s+(\w+)', code)
+        class_match = JAVA_CLASS_NAME.search(code)
         class_name = class_match.group(1) if class_match else component_name
-        
-        output_file = output_dir / f"{class_name}.java"
-        with open(output_file, 'w') as f:
-            f.write(code)
-        print(f"    Saved: {output_file}")
+        return output_dir / f"{class_name}.java"
+    
+    def _save_generated_code(self, component_type: str, component_name: str, code: str, context: Dict) -> str:
+        output_file = self._output_file(component_type, component_name, code)
+        return self.output_writer.submit(output_file, code, {**context, 'generated_code': code})
     
     def _generate_report(self):
-        results = self.oracle.db.execute_query("""
+        results = self.oracle.execute_query("""
             SELECT component_type, migration_status, COUNT(*) as count
-            FROM migration_logs GROUP BY component_type, migration_status ORDER BY component_type, migration_status
-        """)
-        print("\nMigration Summary:")
+            FROM migration_logs WHERE run_id = :run_id
+            GROUP BY component_type, migration_status ORDER BY component_type, migration_status
+        """, {'run_id': self.run_id})
+        print(f"\nMigration Summary (run {self.run_id}):")
         print("-" * 40)
         for row in results:
             print(f"{row[0]}: {row[1]} = {row[2]}")
+        
+        tiers = self.generation_engine.tier_counts
+        if tiers:
+            print("\nGeneration Tiers:")
+            print("-" * 40)
+            for tier in ('template', 'small', 'large'):
+                print(f"{tier}: {tiers.get(tier, 0)}")
+        
+        stats = self.oracle.pool_stats()
+        print("\nOracle Pool:")
+        print("-" * 40)
+        print(f"open={stats['pool_open']} busy={stats['pool_busy']} max={stats['pool_max']} "
+              f"acquires={stats['acquire_count']} wait avg={stats['acquire_wait_avg_ms']}ms max={stats['acquire_wait_max_ms']}ms "
+              f"cursor reuses={stats['cursor_reuses']}")
+        for stage, round_trips in sorted(stats['round_trips_by_stage'].items()):
+            print(f"{stage}: {round_trips} round-trips, {stats['statements_by_stage'].get(stage, 0)} statements")
+        
+        self.print_performance_report()
+        
+        stages = metrics.stage_summary()
+        if stages:
+            print("\nStage Throughput:")
+            print("-" * 40)
+            for row in stages:
+                print(f"{row['stage']}: {row['seconds']:.1f}s, {row['items']:g} items ({row['items_per_second']:g}/s), "
+                      f"{row['oracle_round_trips']:g} round-trips")
+    
+    def print_performance_report(self, run_id: Optional[str] = None, baseline_run_id: Optional[str] = None):
+        report = self.oracle.run_report
+        run_id = run_id or self.run_id or report.latest_run()
+        if run_id is None:
+            print("No migration runs recorded")
+            return
+        config = settings.pipeline
+        percentiles = report.type_percentiles(run_id)
+        print(f"\nComponent Timings (run {run_id}):")
+        print("-" * 40)
+        if not percentiles:
+            print("no timed components")
+            return
+        for row in percentiles:
+            print(f"{row['component_type']}: n={row['components']} p50={row['p50_ms']:.0f}ms p95={row['p95_ms']:.0f}ms "
+                  f"p99={row['p99_ms']:.0f}ms max={row['max_ms']:.0f}ms (avg context {row['avg_context_ms']:.0f}ms, "
+                  f"generation {row['avg_generation_ms']:.0f}ms, write {row['avg_write_ms']:.0f}ms)")
+        
+        print("\nSlowest Components:")
+        print("-" * 40)
+        for row in report.slowest_components(run_id, config.report_slowest):
+            print(f"{row['name']} [{row['component_type']}, {row['tier'] or 'n/a'}, {row['status']}]: {row['duration_ms']:.0f}ms "
+                  f"(context {row['context_ms']:.0f}ms, generation {row['generation_ms']:.0f}ms, write {row['write_ms']:.0f}ms)")
+        
+        baseline_run_id = baseline_run_id or report.previous_run(run_id)
+        if baseline_run_id is None:
+            return
+        print(f"\nRegressions vs run {baseline_run_id} (> {config.regression_threshold:.0%} and >= {config.regression_min_ms:.0f}ms slower):")
+        print("-" * 40)
+        type_regressions = report.type_regressions(run_id, baseline_run_id, config.regression_threshold)
+        regressions = report.regressions(run_id, baseline_run_id, config.regression_threshold,
+                                         config.regression_min_ms, config.report_slowest)
+        for row in type_regressions:
+            print(f"{row['component_type']} {row['metric'][:-3]}: {row['baseline_ms']:.0f}ms → {row['duration_ms']:.0f}ms")
+        for row in regressions:
+            tiers = f" (tier {row['baseline_tier']} → {row['tier']})" if row['tier'] != row['baseline_tier'] else ""
+            print(f"{row['name']} [{row['component_type']}]: {row['baseline_ms']:.0f}ms → {row['duration_ms']:.0f}ms{tiers}")
+        if not type_regressions and not regressions:
+            print("none")
     
     def _generate_id(self, text: str) -> str:
         return hashlib.md5(text.encode()).hexdigest()
     
     def close(self):
+        self.output_writer.close()
         self.oracle.close()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agent.core.parsers.csharp_parser import CSharpParser
+
+def synthetic_controller(index: int) -> str:
+    entity = f"Entity{index}"
+    return f'''using System;
+using System.Collections.Generic;
+using Microsoft.AspNetCore.Mvc;
+using Company.App.Services;
+
+namespace Company.App.Controllers
+{{
+    [ApiController]
+    [Route("api/[controller]")]
+    public class {entity}Controller : ControllerBase
+    {{
+        private readonly I{entity}Service _service;
+        private readonly ILogger<{entity}Controller> _logger;
+        
+        public {entity}Controller(I{entity}Service service, ILogger<{entity}Controller> logger)
+        {{
+            _service = service;
+            _logger = logger;
+        }}
+        
+        public string Title {{ get; set; }} = "{entity}";
+        
+        [HttpGet]
+        public ActionResult<IEnumerable<{entity}Dto>> GetAll() => Ok(_service.FindAll());
+        
+        [HttpGet("{{id}}")]
+        public async Task<ActionResult<{entity}Dto>> GetById(int id)
+        {{
+            var item = await _service.FindAsync(id);
+            if (item == null) {{ return NotFound(); }}
+            return Ok(new {entity}Dto {{ Id = item.Id, Name = $"{{item.Name}}" }});
+        }}
+        
+        [HttpPost]
+        public IActionResult Create([FromBody] {entity}Dto dto)
+        {{
+            /* validate {{ braces }} inside comments */
+            var audit = new AuditService("create");
+            _service.Save(dto);
+            return CreatedAtAction(nameof(GetById), new {{ id = dto.Id }}, dto);
+        }}
+    }}
+}}
+'''
+
+def main():
+    if len(sys.argv) > 1:
+        sources = [(str(p), p.read_text(encoding='utf-8', errors='replace')) for p in Path(sys.argv[1]).rglob('*.cs')]
+    else:
+        sources = [(f"Controllers/Entity{i}Controller.cs", synthetic_controller(i)) for i in range(10000)]
+    parser = CSharpParser()
+    started = time.perf_counter()
+    classes = methods = 0
+    for path, content in sources:
+        parsed = parser.parse_code(content, path)
+        classes += len(parsed.classes)
+        methods += sum(len(c.methods) for c in parsed.classes)
+    elapsed = time.perf_counter() - started
+    total_bytes = sum(len(c) for _, c in sources)
+    print(f"Parsed {len(sources)} files ({total_bytes / 1e6:.1f} MB) in {elapsed:.2f}s "
+          f"- {len(sources) / elapsed:.0f} files/s, {classes} classes, {methods} methods")
+
+if __name__ == "__main__":
+    main()
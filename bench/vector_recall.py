@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+import argparse
+import heapq
+import math
+import operator
+import random
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agent.core.storage.quantization import (
+    QUANTIZATION_BINARY, QUANTIZATIONS, EmbeddingCodec, hamming_distance, normalize
+)
+
+def dot(a: Sequence[float], b: Sequence[float]) -> float:
+    return sum(map(operator.mul, a, b))
+
+class LocalVectorIndex:
+    def __init__(self, codec: Optional[EmbeddingCodec] = None):
+        self.codec = codec or EmbeddingCodec()
+        self.ids: List[str] = []
+        self.types: List[Optional[str]] = []
+        self.vectors: List[array] = []
+        self.codes: List = []
+        self.code_norms: List[float] = []
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def add(self, item_id: str, embedding: Sequence[float], component_type: Optional[str] = None):
+        self.ids.append(item_id)
+        self.types.append(component_type)
+        self.vectors.append(normalize(self.codec.full(embedding)))
+        code, norm = self.codec.coarse(embedding), 1.0
+        if self.codec.quantization == QUANTIZATION_BINARY:
+            code = code.tobytes()
+        elif code is not None:
+            norm = math.sqrt(dot(code, code)) or 1.0
+        self.codes.append(code)
+        self.code_norms.append(norm)
+    
+    def search(self, query: Sequence[float], top_k: int = 5, component_type: Optional[str] = None,
+               exact: bool = False) -> List[Tuple[str, float]]:
+        rows = [i for i, t in enumerate(self.types) if component_type is None or t == component_type]
+        if not exact and self.codec.quantized:
+            rows = heapq.nsmallest(self.codec.candidates(top_k), rows, key=self._coarse_scorer(query))
+        full_query = normalize(self.codec.full(query))
+        ranked = heapq.nsmallest(top_k, ((1.0 - dot(full_query, self.vectors[i]), i) for i in rows))
+        return [(self.ids[i], distance) for distance, i in ranked]
+    
+    def _coarse_scorer(self, query: Sequence[float]):
+        code = self.codec.coarse(query)
+        if self.codec.quantization == QUANTIZATION_BINARY:
+            packed = code.tobytes()
+            return lambda i: hamming_distance(packed, self.codes[i])
+        return lambda i: -dot(code, self.codes[i]) / self.code_norms[i]
+
+def recall_at_k(expected: Iterable[str], actual: Iterable[str]) -> float:
+    expected = set(expected)
+    return len(expected & set(actual)) / len(expected) if expected else 1.0
+
+def synthetic_embeddings(count: int, dimension: int, clusters: int, seed: int) -> List[List[float]]:
+    rng = random.Random(seed)
+    centers = [[rng.gauss(0, 1) for _ in range(dimension)] for _ in range(clusters)]
+    return [[c + rng.gauss(0, 0.6) for c in rng.choice(centers)] for _ in range(count)]
+
+def benchmark(embeddings: List[Sequence[float]], queries: List[Sequence[float]], top_k: int,
+              quantizations: Iterable[str], truncate_dimension: int, rerank_factor: int) -> List[Dict]:
+    baseline = LocalVectorIndex()
+    for i, embedding in enumerate(embeddings):
+        baseline.add(str(i), embedding)
+    started = time.perf_counter()
+    expected = [[item for item, _ in baseline.search(q, top_k, exact=True)] for q in queries]
+    exact_ms = (time.perf_counter() - started) * 1000 / max(len(queries), 1)
+    results = []
+    for quantization in quantizations:
+        index = LocalVectorIndex(EmbeddingCodec(quantization, truncate_dimension, rerank_factor))
+        for i, embedding in enumerate(embeddings):
+            index.add(str(i), embedding)
+        started = time.perf_counter()
+        actual = [[item for item, _ in index.search(q, top_k)] for q in queries]
+        elapsed_ms = (time.perf_counter() - started) * 1000 / max(len(queries), 1)
+        recall = sum(recall_at_k(e, a) for e, a in zip(expected, actual)) / max(len(queries), 1)
+        results.append({'quantization': quantization, 'truncate_dimension': truncate_dimension,
+                        'rerank_factor': rerank_factor, f'recall@{top_k}': round(recall, 4),
+                        'query_ms': round(elapsed_ms, 2), 'exact_query_ms': round(exact_ms, 2)})
+    return results
+
+def oracle_recall(queries: int, top_k: int) -> List[Dict]:
+    from agent.config.settings import settings
+    from agent.core.storage.oracle_manager import OracleManager
+    from agent.core.storage.vector_store import similar_code_rows, similar_code_statement
+    
+    oracle = OracleManager(settings.oracle)
+    try:
+        store = oracle.vector_store
+        samples = [s['embedding'] for s in store.iter_clone_sources() if s['embedding'] is not None]
+        samples = random.Random(7).sample(samples, min(queries, len(samples)))
+        recalls, timings = [], {'exact': 0.0, 'quantized': 0.0}
+        for embedding in samples:
+            started = time.perf_counter()
+            query, params = similar_code_statement(list(embedding), top_k, None, 0, False)
+            expected = [r['id'] for r in similar_code_rows(oracle.execute_query(query, params), False)]
+            timings['exact'] += time.perf_counter() - started
+            started = time.perf_counter()
+            actual = [r['id'] for r in store.search_similar_code(list(embedding), top_k, include_metadata=False)]
+            timings['quantized'] += time.perf_counter() - started
+            recalls.append(recall_at_k(expected, actual))
+        count = max(len(samples), 1)
+        return [{'quantization': store.codec.quantization, 'truncate_dimension': store.codec.truncate_dimension,
+                 'rerank_factor': store.codec.rerank_factor, f'recall@{top_k}': round(sum(recalls) / count, 4),
+                 'query_ms': round(timings['quantized'] * 1000 / count, 2),
+                 'exact_query_ms': round(timings['exact'] * 1000 / count, 2)}]
+    finally:
+        oracle.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Recall benchmark for quantized embedding search with exact rerank')
+    parser.add_argument('--count', type=int, default=2000, help='Synthetic vectors to index')
+    parser.add_argument('--dimension', type=int, default=1536)
+    parser.add_argument('--clusters', type=int, default=50)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--quantization', choices=QUANTIZATIONS[1:] + ('all',), default='all')
+    parser.add_argument('--truncate-dimension', type=int, default=0)
+    parser.add_argument('--rerank-factor', type=int, default=8)
+    parser.add_argument('--oracle', action='store_true',
+                        help='Compare the configured OracleVectorStore search against the exact VECTOR_DISTANCE query')
+    args = parser.parse_args()
+    
+    if args.oracle:
+        results = oracle_recall(args.queries, args.top_k)
+    else:
+        embeddings = synthetic_embeddings(args.count + args.queries, args.dimension, args.clusters, seed=13)
+        quantizations = QUANTIZATIONS[1:] if args.quantization == 'all' else (args.quantization,)
+        results = benchmark(embeddings[:args.count], embeddings[args.count:], args.top_k, quantizations,
+                            args.truncate_dimension, args.rerank_factor)
+    for row in results:
+        print('  '.join(f"{key}={value}" for key, value in row.items()))
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,7 @@ CREATE TABLE code_vectors (
     namespace VARCHAR2(500),
     code_content CLOB NOT NULL,
     embedding VECTOR(1536, FLOAT32),
+    embedding_q VECTOR(*, *),
     metadata JSON,
     created_at TIMESTAMP DEFAULT SYSTIMESTAMP,
     updated_at TIMESTAMP DEFAULT SYSTIMESTAMP
@@ -83,11 +84,20 @@ CREATE TABLE db_schema_reference (
     UNIQUE (schema_name, table_name)
 );
 
+CREATE TABLE schema_search_terms (
+    term VARCHAR2(200) NOT NULL,
+    schema_name VARCHAR2(200),
+    table_name VARCHAR2(200) NOT NULL,
+    column_name VARCHAR2(200),
+    weight NUMBER(4, 2) NOT NULL
+);
+
 CREATE TABLE stored_procedures (
     proc_id NUMBER GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
     schema_name VARCHAR2(200),
     proc_name VARCHAR2(200) NOT NULL,
     parameters JSON,
+    referenced_tables JSON,
     definition CLOB NOT NULL,
     created_at TIMESTAMP DEFAULT SYSTIMESTAMP,
     UNIQUE (schema_name, proc_name)
@@ -111,23 +121,102 @@ CREATE TABLE migration_logs (
     error_message CLOB,
     generated_code CLOB,
     output_path VARCHAR2(1000),
+    content_hash VARCHAR2(64),
+    derived_from VARCHAR2(100),
+    run_id VARCHAR2(32),
+    duration_ms NUMBER,
+    context_ms NUMBER,
+    generation_ms NUMBER,
+    write_ms NUMBER,
+    generation_tier VARCHAR2(20),
     FOREIGN KEY (component_id) REFERENCES code_components(id)
 );
 
+CREATE TABLE component_clusters (
+    component_id VARCHAR2(100) PRIMARY KEY,
+    cluster_id VARCHAR2(100) NOT NULL,
+    representative_id VARCHAR2(100) NOT NULL,
+    similarity NUMBER(5, 4),
+    embedding_similarity NUMBER(5, 4),
+    substitutions JSON,
+    created_at TIMESTAMP DEFAULT SYSTIMESTAMP
+);
+
+CREATE INDEX idx_component_clusters_cluster ON component_clusters(cluster_id);
+
+CREATE TABLE component_table_usage (
+    component_id VARCHAR2(100) NOT NULL,
+    schema_name VARCHAR2(200) NOT NULL,
+    table_name VARCHAR2(200) NOT NULL,
+    source VARCHAR2(20) NOT NULL,
+    depth NUMBER DEFAULT 0 NOT NULL,
+    via_component_id VARCHAR2(100),
+    PRIMARY KEY (component_id, schema_name, table_name)
+);
+
+CREATE INDEX idx_component_table_usage_table ON component_table_usage(schema_name, table_name);
+
+CREATE TABLE component_context_bundles (
+    component_id VARCHAR2(100) PRIMARY KEY,
+    generation NUMBER NOT NULL,
+    format_version NUMBER NOT NULL,
+    bundle BLOB NOT NULL,
+    bundle_bytes NUMBER,
+    created_at TIMESTAMP DEFAULT SYSTIMESTAMP
+);
+
+CREATE TABLE migration_runs (
+    run_id VARCHAR2(32) PRIMARY KEY,
+    status VARCHAR2(20) NOT NULL,
+    started_at TIMESTAMP NOT NULL,
+    finished_at TIMESTAMP,
+    repo_slug VARCHAR2(200),
+    branch VARCHAR2(200),
+    source_commit VARCHAR2(64),
+    base_commit VARCHAR2(64),
+    metadata JSON
+);
+
+CREATE TABLE migration_run_stages (
+    run_id VARCHAR2(32) NOT NULL,
+    stage_name VARCHAR2(50) NOT NULL,
+    status VARCHAR2(20) NOT NULL,
+    started_at TIMESTAMP NOT NULL,
+    completed_at TIMESTAMP,
+    PRIMARY KEY (run_id, stage_name),
+    FOREIGN KEY (run_id) REFERENCES migration_runs(run_id) ON DELETE CASCADE
+);
+
 CREATE TABLE file_mappings (
     mapping_id NUMBER GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
     old_file_path VARCHAR2(1000) NOT NULL,
     new_file_path VARCHAR2(1000) NOT NULL,
     component_type VARCHAR2(50),
     migration_status VARCHAR2(50),
-    created_at TIMESTAMP DEFAULT SYSTIMESTAMP
+    content_hash VARCHAR2(64),
+    created_at TIMESTAMP DEFAULT SYSTIMESTAMP,
+    updated_at TIMESTAMP DEFAULT SYSTIMESTAMP
 );
 
+CREATE UNIQUE INDEX idx_file_mappings_new_path ON file_mappings(new_file_path);
+
+CREATE TABLE ingestion_state (
+    state_key VARCHAR2(50) PRIMARY KEY,
+    generation NUMBER DEFAULT 0 NOT NULL,
+    updated_at TIMESTAMP DEFAULT SYSTIMESTAMP
+);
+
+INSERT INTO ingestion_state (state_key, generation) VALUES ('default', 0);
+
 CREATE INDEX idx_code_vectors_type ON code_vectors(component_type);
 CREATE INDEX idx_code_vectors_name ON code_vectors(component_name);
+CREATE INDEX idx_schema_search_terms ON schema_search_terms(term, schema_name, table_name, weight);
 CREATE INDEX idx_components_type ON code_components(type);
 CREATE INDEX idx_migration_logs_status ON migration_logs(migration_status);
 CREATE INDEX idx_migration_logs_component ON migration_logs(component_id);
+CREATE INDEX idx_migration_logs_run ON migration_logs(run_id, migration_status);
+CREATE INDEX idx_migration_runs_status ON migration_runs(status, started_at);
+CREATE INDEX idx_migration_runs_source ON migration_runs(repo_slug, branch, status, finished_at);
 
 CREATE OR REPLACE VIEW v_migration_progress AS
 SELECT component_type, migration_status, COUNT(*) as count,
@@ -135,6 +224,27 @@ SELECT component_type, migration_status, COUNT(*) as count,
 FROM migration_logs
 GROUP BY component_type, migration_status;
 
+CREATE OR REPLACE VIEW v_component_timings AS
+SELECT run_id, component_id, component_type, migration_status, generation_tier, derived_from,
+    start_time, end_time, duration_ms, context_ms, generation_ms, write_ms
+FROM (
+    SELECT l.*, ROW_NUMBER() OVER (PARTITION BY l.run_id, l.component_id ORDER BY l.log_id DESC) as rn
+    FROM migration_logs l
+    WHERE l.run_id IS NOT NULL AND l.duration_ms IS NOT NULL
+)
+WHERE rn = 1;
+
+CREATE OR REPLACE VIEW v_run_timing_percentiles AS
+SELECT run_id, component_type, COUNT(*) as components,
+    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY duration_ms) as p50_ms,
+    PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY duration_ms) as p95_ms,
+    PERCENTILE_CONT(0.99) WITHIN GROUP (ORDER BY duration_ms) as p99_ms,
+    AVG(duration_ms) as avg_ms, MAX(duration_ms) as max_ms,
+    AVG(context_ms) as avg_context_ms, AVG(generation_ms) as avg_generation_ms, AVG(write_ms) as avg_write_ms
+FROM v_component_timings
+WHERE migration_status = 'SUCCESS'
+GROUP BY run_id, component_type;
+
 CREATE OR REPLACE VIEW v_component_dependencies AS
 SELECT c1.name as component_name, c1.type as component_type, c2.name as depends_on,
     c2.type as dependency_type, d.strength